@@ -0,0 +1,76 @@
+import functools
+import inspect
+from typing import Any, Callable
+
+import pydantic_core
+from fastapi.exceptions import ResponseValidationError
+from fastapi.responses import JSONResponse
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import APIRoute
+from pydantic import ValidationError
+
+from app.model import Result
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    项目默认响应类: 由 pydantic-core 直接序列化为 bytes, 替代 stdlib json.dumps
+    - 已序列化的 bytes 原样输出
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return pydantic_core.to_json(content)
+
+
+class ResultRoute(APIRoute):
+    """
+    Result[...] 接口的路由类
+    - 异步接口返回 Result 时, 按 response_model 校验一次后直接序列化为 JSON bytes,
+      不再经过 FastAPI 的 dump_python + JSONResponse(json.dumps) 两次转换
+    - response_model 仍负责过滤与转换返回数据, 校验失败同样抛出 ResponseValidationError
+    - 设置了 response_model_include/exclude 等选项、注入了 Response 参数或非 Result 的接口走 FastAPI 默认流程
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        self._result_model: type[Result] | None = None
+        # include_router 会以已包装的 endpoint 重新创建路由, 先取回原函数避免重复包装
+        if getattr(endpoint, "_result_route_wrapper", False):
+            endpoint = endpoint.__wrapped__
+        if inspect.iscoroutinefunction(endpoint):
+            endpoint = self._wrap_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+        model = self.response_model
+        response_class = self.response_class
+        if isinstance(response_class, DefaultPlaceholder):
+            response_class = response_class.value
+        if (isinstance(model, type) and issubclass(model, Result)
+                and issubclass(response_class, JSONResponse)
+                and self.dependant.response_param_name is None
+                and self.response_model_include is None and self.response_model_exclude is None
+                and not (self.response_model_exclude_unset or self.response_model_exclude_defaults
+                         or self.response_model_exclude_none)):
+            self._result_model = model
+
+    def _wrap_endpoint(self, endpoint: Callable[..., Any]) -> Callable[..., Any]:
+        # functools.wraps 保留 __wrapped__, FastAPI 解析依赖时仍使用原函数签名
+        @functools.wraps(endpoint)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            content = await endpoint(*args, **kwargs)
+            if self._result_model is None or not isinstance(content, Result):
+                return content
+            return self._render(content)
+
+        wrapper._result_route_wrapper = True
+        return wrapper
+
+    def _render(self, content: Result) -> FastJSONResponse:
+        try:
+            value = self._result_model.model_validate(content)
+        except ValidationError as e:
+            raise ResponseValidationError(e.errors(include_url=False), body=content)
+        # 与 model_dump_json 相同的序列化器, 直接输出 bytes
+        return FastJSONResponse(pydantic_core.to_json(value, by_alias=self.response_model_by_alias),
+                                status_code=self.status_code or 200)
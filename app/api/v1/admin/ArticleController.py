@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, Query, status, UploadFile, File
 from pathlib import Path
 
+from app.api.routing import ResultRoute
 from app.model import Result
 from starlette.responses import FileResponse
 from app.model.common import PaginatedResponse
@@ -10,12 +11,14 @@ from app.model.vo.post import PostEditVO, PostTableVO
 from app.services.post import PostService, get_post_service
 from app.utils.upload import save_blog
 
-router = APIRouter(prefix="/articles", tags=["管理端文章接口"])
+router = APIRouter(prefix="/articles", tags=["管理端文章接口"], route_class=ResultRoute)
 
 
 @router.get("/pagination", response_model=Result[PaginatedResponse[PostTableVO]])
-async def paginated_article_table_info(page: int = Query(1, ge=1), size: int = Query(10, ge=1, le=50), category_id: int | None = None, tag_id: int | None = None, service: PostService = Depends(get_post_service)):
-    items, total = await service.paginated_table_post_vo(page, size)
+async def paginated_article_table_info(page: int = Query(1, ge=1), size: int = Query(10, ge=1, le=50), category_id: int | None = None, tag_id: int | None = None,
+                                      title_query: str | None = Query(None, min_length=2, max_length=100, description="按标题模糊查找, 结果按匹配度排序"),
+                                      service: PostService = Depends(get_post_service)):
+    items, total = await service.paginated_table_post_vo(page, size, title_query)
     return Result.success(PaginatedResponse(records=items, total=total, current=page, size=size))
 
 
@@ -1,17 +1,21 @@
+from typing import List
+
 from fastapi import APIRouter, Depends
 
+from app.api.routing import ResultRoute
 from app.model import Result
 from app.model.common import PaginatedResponse
 from app.model.dto.category import CategoryCreate
 from app.model.vo.common import CreateResponse
 from app.services.category import CategoryService, get_category_service
 from app.model.entity import Category
+from app.model.vo import CategoryVO
 
 
-router = APIRouter(prefix="/categories", tags=["管理端分类接口"]) 
+router = APIRouter(prefix="/categories", tags=["管理端分类接口"], route_class=ResultRoute) 
 
 
-@router.get("")
+@router.get("", response_model=Result[List[CategoryVO]])
 async def list_categories(service: CategoryService = Depends(get_category_service)):
     items = await service.list_all()
     return Result.success(items)
@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+
+from app.api.routing import ResultRoute
+from app.model import Result
+from app.utils.metrics import collect_metrics
+
+
+router = APIRouter(prefix="/metrics", tags=["管理端运行指标接口"], route_class=ResultRoute)
+
+
+@router.get("", response_model=Result[dict])
+async def get_metrics():
+    """获取当前 worker 的进程内运行指标(缓存命中率等)"""
+    return Result.success(collect_metrics())
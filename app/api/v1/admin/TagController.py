@@ -1,6 +1,9 @@
 from datetime import datetime, timezone
+from typing import List
+
 from fastapi import APIRouter, Depends
 
+from app.api.routing import ResultRoute
 from app.core.biz_constants import BizMsg
 from app.model import Result
 from app.model.common import PaginatedResponse
@@ -9,12 +12,13 @@ from app.model.dto.tag import TagCreate, TagUpdate
 from app.model.vo.common import CreateResponse
 from app.services.tag import TagService, get_tag_service
 from app.model.entity import Tag
+from app.model.vo import TagVO
 
 
-router = APIRouter(prefix="/tags", tags=["管理端标签接口"]) 
+router = APIRouter(prefix="/tags", tags=["管理端标签接口"], route_class=ResultRoute) 
 
 
-@router.get("")
+@router.get("", response_model=Result[List[TagVO]])
 async def list_tags(service: TagService = Depends(get_tag_service)):
     items = await service.list_all()
     return Result.success(items)
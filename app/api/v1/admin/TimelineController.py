@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends
 
+from app.api.routing import ResultRoute
 from app.core.biz_constants import BizMsg
 from app.model import Result
 from app.model.dto.common import BatchDelete
@@ -9,7 +10,7 @@ from app.model.vo.common import CreateResponse
 from app.services import TimelineService, get_timeline_service
 
 
-router = APIRouter(prefix="/timeline", tags=["管理端时间轴接口"])
+router = APIRouter(prefix="/timeline", tags=["管理端时间轴接口"], route_class=ResultRoute)
 
 
 @router.get("", response_model=Result[list[Timeline]])
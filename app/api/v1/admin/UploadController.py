@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, File, UploadFile, status
 from typing import TypedDict
 
+from app.api.routing import ResultRoute
 from app.model import Result
 from app.utils.upload import upload_image_to_qiniu
 
 
-router = APIRouter(prefix="/upload", tags=["管理端上传接口"])
+router = APIRouter(prefix="/upload", tags=["管理端上传接口"], route_class=ResultRoute)
 
 
 class UploadResponse(TypedDict):
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from app.api.routing import ResultRoute
 from app.handler.exception_handlers import AuthenticationException
 from app.core import settings
 from app.model.common import Result
@@ -9,7 +10,7 @@ from app.utils.user_context import get_user_context
 from app.core import BizCode, BizMsg
 
 # admin路由添加鉴权拦截
-router = APIRouter(prefix="/users", tags=["管理端用户接口"])
+router = APIRouter(prefix="/users", tags=["管理端用户接口"], route_class=ResultRoute)
 
 @router.get("/pagination", response_model=Result[PaginatedResponse])
 async def paginate_users_info(current: int = Query(1, ge=1), size: int = Query(10, ge=1, le=10), 
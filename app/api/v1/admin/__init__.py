@@ -5,6 +5,7 @@ from .CategoryController import router as category_router
 from .TagController import router as tag_router
 from .TimelineController import router as timeline_router
 from .UploadController import router as upload_router
+from .MetricsController import router as metrics_router
 
 
 
@@ -15,3 +16,4 @@ admin_router.include_router(category_router)
 admin_router.include_router(tag_router)
 admin_router.include_router(timeline_router)
 admin_router.include_router(upload_router)
+admin_router.include_router(metrics_router)
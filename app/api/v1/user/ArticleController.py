@@ -1,27 +1,47 @@
-from fastapi import APIRouter, Depends, Query, status
+from typing import List
 
+from fastapi import APIRouter, Depends, Query, Request, status
+
+from app.api.routing import ResultRoute
 from app.model import Result
-from app.model.common import PaginatedResponse
-from app.model.vo.post import PostCardVO, U_PostInfo
+from app.model.common import CursorPaginatedResponse, PaginatedResponse
+from app.model.vo.post import PostCardVO, SearchCardVO, U_PostInfo
 from app.services.post import PostService, get_post_service
+from app.utils.rate_limit import get_client_ip
+from app.utils.user_context import get_user_context
+
 
+router = APIRouter(prefix="/articles", tags=["用户端文章接口"], route_class=ResultRoute)
 
-router = APIRouter(prefix="/articles", tags=["用户端文章接口"])
 
+CURSOR_QUERY = Query(None, description="游标分页: 传空字符串获取第一页, 之后传上一页返回的 next_cursor; 不传则使用页码分页")
 
-@router.get("/pagination", response_model=Result[PaginatedResponse[PostCardVO]])
+
+@router.get("/pagination", response_model=Result[PaginatedResponse[PostCardVO] | CursorPaginatedResponse[PostCardVO]])
 async def paginated_article_cards(page: int = Query(1, ge=1), size: int = Query(10, ge=1, le=50), 
                                     category_id: int | None = None, tag_id: int | None = None, 
+                                    cursor: str | None = CURSOR_QUERY,
                                     service: PostService = Depends(get_post_service)):
+    if cursor is not None:
+        return Result.success(await service.cursor_card_info(size, cursor, category_id, tag_id))
     pagevo = await service.paginated_card_info(page, size, category_id, tag_id)
     return Result.success(pagevo)
 
 
+@router.get("/search", response_model=Result[PaginatedResponse[SearchCardVO]])
+async def search_articles(q: str = Query(..., min_length=1, max_length=100, description="搜索关键词"),
+                          page: int = Query(1, ge=1), size: int = Query(10, ge=1, le=50),
+                          service: PostService = Depends(get_post_service)):
+    return Result.success(await service.search_cards(q, page, size))
+
+
 @router.get("/{post_id}/body", response_model=Result[str])
 async def get_article_body(post_id: int, service: PostService = Depends(get_post_service)):
     body_text = await service.get_content(post_id)
     if not body_text:
         return Result.failure(message="文章不存在或内容缺失", code=status.HTTP_404_NOT_FOUND)
+    # 每次阅读正文计一次阅读数, 只写 Redis, 由后台任务批量写回数据库
+    await service.record_view(post_id)
     return Result.success(body_text)
 
 @router.get("/{post_id}/info", response_model=Result[U_PostInfo])
@@ -32,15 +52,29 @@ async def get_article_info_by_id(post_id: int, service: PostService = Depends(ge
     return Result.success(data)
 
 
-@router.get("/category/{category_id}", response_model=Result[PaginatedResponse[PostCardVO]])
+@router.get("/{post_id}/related", response_model=Result[List[PostCardVO]])
+async def get_related_articles(post_id: int, service: PostService = Depends(get_post_service)):
+    return Result.success(await service.get_related(post_id))
+
+
+@router.get("/category/{category_id}", response_model=Result[PaginatedResponse[PostCardVO] | CursorPaginatedResponse[PostCardVO]])
 async def list_articles_by_category(category_id: int, page: int = Query(1, ge=1), size: int = Query(10, ge=1, le=15), 
+                                    cursor: str | None = CURSOR_QUERY,
                                     service: PostService = Depends(get_post_service)):
+    if cursor is not None:
+        return Result.success(await service.cursor_card_info(size, cursor, category_id=category_id))
     items = await service.paginated_card_info(page, size, category_id=category_id)
     return Result.success(items)
 
 @router.post("/{post_id}/likes")
-async def like(post_id: int, service: PostService = Depends(get_post_service)):
-    ok = await service.increment_like_count(post_id)
-    if not ok:
-        return Result.failure(message="点赞失败", code=status.HTTP_404_NOT_FOUND)
-    return Result.success()
+async def like(post_id: int, request: Request, service: PostService = Depends(get_post_service)):
+    # 登录用户按用户去重, 匿名访客按 IP 去重
+    ctx = get_user_context()
+    if ctx:
+        voter, user_id = f"u:{ctx.user_id}", int(ctx.user_id)
+    else:
+        voter, user_id = f"ip:{get_client_ip(request)}", None
+    liked = await service.like_post(post_id, voter, user_id)
+    if liked is None:
+        return Result.failure(message="文章不存在", code=status.HTTP_404_NOT_FOUND)
+    return Result.success({"liked": liked})
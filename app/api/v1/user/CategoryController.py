@@ -1,19 +1,23 @@
+from typing import List
+
 from fastapi import APIRouter, Depends
 
+from app.api.routing import ResultRoute
 from app.model import Result
 from app.services.category import CategoryService, get_category_service
+from app.model.vo import CategoryCardVO, CategoryVO
 
 
-router = APIRouter(prefix="/category", tags=["博客分类"])
+router = APIRouter(prefix="/category", tags=["博客分类"], route_class=ResultRoute)
 
 
-@router.get("")
+@router.get("", response_model=Result[List[CategoryVO]])
 async def list_categories(service: CategoryService = Depends(get_category_service)):
     items = await service.list_all()
     return Result.success(items)
 
 
-@router.get("/card")
+@router.get("/card", response_model=Result[List[CategoryCardVO]])
 async def list_category_cards(service: CategoryService = Depends(get_category_service)):
     items = await service.list_cards()
     return Result.success(items)
\ No newline at end of file
@@ -1,13 +1,17 @@
+from typing import List
+
 from fastapi import APIRouter, Depends
 
+from app.api.routing import ResultRoute
 from app.model import Result
 from app.services.tag import TagService, get_tag_service
+from app.model.vo import TagVO
 
 
-router = APIRouter(prefix="/tags", tags=["用户端标签接口"])
+router = APIRouter(prefix="/tags", tags=["用户端标签接口"], route_class=ResultRoute)
 
 
-@router.get("")
+@router.get("", response_model=Result[List[TagVO]])
 async def list_tags(service: TagService = Depends(get_tag_service)):
     items = await service.list_all()
     return Result.success(items)
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends
 
+from app.api.routing import ResultRoute
 from app.model import Result
 from app.model.entity import Timeline
 from app.services import TimelineService, get_timeline_service
 
 
-router = APIRouter(prefix="/timeline", tags=["用户端时间轴接口"])
+router = APIRouter(prefix="/timeline", tags=["用户端时间轴接口"], route_class=ResultRoute)
 
 
 @router.get("", response_model=Result[list[Timeline]])
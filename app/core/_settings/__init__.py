@@ -4,4 +4,10 @@ from .jwt_setting import JWTSettings
 from .log_setting import LogSettings
 from .app_setting import AppSettings
 from .qiniu_setting import QiniuSettings
+from .cache_setting import CacheSettings
+from .counter_setting import CounterSettings
+from .password_setting import PasswordSettings
+from .rate_limit_setting import RateLimitSettings, RouteBudget
+from .search_setting import SearchSettings
+from .related_setting import RelatedSettings
 from .base_setting import BaseAppSettings
@@ -7,6 +7,8 @@ class AppSettings(BaseAppSettings):
 
     SENSITIVE_WORDS: list[str] = ["你妈死了"]
     SUPER_ADMIN_USER_ID: int = 1
+    # 可信反向代理地址(IP 或 CIDR), 直连地址属于其中时才按 X-Forwarded-For 解析客户端 IP; 环境变量以 JSON 传入
+    TRUSTED_PROXIES: list[str] = []
 
     model_config = {
         **BaseAppSettings.model_config,
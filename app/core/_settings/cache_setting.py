@@ -0,0 +1,31 @@
+from app.core._settings.base_setting import BaseAppSettings
+
+
+class CacheSettings(BaseAppSettings):
+    # 文章正文进程内缓存容量上限(字节), 按 utf-8 编码后的长度计算
+    CONTENT_MAX_BYTES: int = 32 * 1024 * 1024
+
+    # --- Service 读方法两级缓存(进程内 LRU + Redis) ---
+    # Redis 缓存键前缀
+    KEY_PREFIX: str = "cache:"
+    # 表版本号 hash 的键, 写事务提交后递增对应表的版本号, 使依赖该表的缓存失效
+    GENERATION_KEY: str = "cache:generations"
+    # Redis 缓存默认过期时间(秒), 写入会通过表版本号立即失效, 过期时间仅作兜底
+    DEFAULT_TTL_SECONDS: int = 600
+    # 进程内缓存过期时间(秒), 不超过对应的 Redis 过期时间
+    LOCAL_TTL_SECONDS: float = 300
+    # 失效广播未订阅(收不到其他 worker 的写入事件)时, 进程内缓存条目的最长使用时间(秒)
+    LOCAL_FALLBACK_TTL_SECONDS: float = 5
+    # 跨 worker 失效广播的 Redis pub/sub 频道
+    INVALIDATION_CHANNEL: str = "cache:invalidation"
+    # 失效广播订阅断开后的重试间隔(秒)
+    INVALIDATION_RETRY_SECONDS: float = 1
+    # 进程内缓存最大条目数
+    LOCAL_MAX_ENTRIES: int = 1024
+    # 按缓存命名空间覆盖 Redis 过期时间, 例如 {"post:u_info": 30}, 环境变量以 JSON 传入
+    TTL_OVERRIDES: dict[str, int] = {}
+
+    model_config = {
+        **BaseAppSettings.model_config,
+        "env_prefix": "CACHE_",
+    }
@@ -0,0 +1,33 @@
+from app.core._settings.base_setting import BaseAppSettings
+
+
+class CounterSettings(BaseAppSettings):
+    # 计数写回数据库的间隔(秒)
+    FLUSH_INTERVAL_SECONDS: float = 10
+    # 待写回的阅读数增量(Redis Hash: post_id -> delta)
+    VIEW_PENDING_KEY: str = "counter:post:views:pending"
+    # 正在写回的阅读数增量快照, 写回失败时保留以便下次重试
+    VIEW_FLUSHING_KEY: str = "counter:post:views:flushing"
+    # 阅读数快照的批次号, 随快照一起删除; 数据库记录已写回的批次号, 同一快照不会重复累加
+    VIEW_BATCH_ID_KEY: str = "counter:post:views:flushing:batch"
+    # 数据库中已写回批次号的保留天数
+    BATCH_RETENTION_DAYS: int = 7
+    # 写回锁(SET NX EX), 多个 worker 同一时刻只有一个写回; 过期时间应大于单次写回耗时
+    FLUSH_LOCK_KEY: str = "counter:flush:lock"
+    FLUSH_LOCK_TTL_SECONDS: int = 60
+    # 点赞去重集合前缀(Redis Set: 每篇文章一个, 成员为点赞者标识)
+    LIKE_VOTERS_KEY_PREFIX: str = "counter:post:likes:voters:"
+    # 点赞去重集合的过期时间(秒), 每次有效点赞时续期; 过期后重复点赞只会短暂多计待写回增量,
+    # 写回时 likes 表唯一索引去重并重新统计 like_count
+    LIKE_VOTERS_TTL_SECONDS: int = 30 * 24 * 3600
+    # 待写回的点赞数增量(Redis Hash: post_id -> delta), 仅用于读取时展示
+    LIKE_PENDING_KEY: str = "counter:post:likes:pending"
+    LIKE_PENDING_FLUSHING_KEY: str = "counter:post:likes:pending:flushing"
+    # 待写回的点赞流水(Redis List: "post_id|voter|timestamp")
+    LIKE_LOG_KEY: str = "counter:post:likes:log"
+    LIKE_LOG_FLUSHING_KEY: str = "counter:post:likes:log:flushing"
+
+    model_config = {
+        **BaseAppSettings.model_config,
+        "env_prefix": "COUNTER_",
+    }
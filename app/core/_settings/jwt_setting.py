@@ -7,6 +7,10 @@ class JWTSettings(BaseAppSettings):
     REFRESH_TOKEN_EXPIRE_MINUTES: int
     ALGORITHM: str
     JWT_REVOKE_PREFIX: str = "revoked:jwt:"
+    # 已验签令牌进程内缓存的最大条目数
+    TOKEN_CACHE_MAX_ENTRIES: int = 4096
+    # 本地撤销镜像条目数达到该值后, 每次新增时清理已过期的条目
+    REVOKED_MIRROR_PURGE_SIZE: int = 1024
 
     model_config = {
         **BaseAppSettings.model_config,
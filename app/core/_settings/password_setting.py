@@ -0,0 +1,18 @@
+from app.core._settings.base_setting import BaseAppSettings
+
+
+class PasswordSettings(BaseAppSettings):
+    # 密码哈希/校验线程池的线程数, argon2 计算期间释放 GIL, 可真正并行
+    WORKERS: int = 2
+    # 排队 + 执行中的密码运算上限, 超出时直接返回 503, 避免登录洪峰堆积
+    MAX_PENDING: int = 16
+    # argon2 参数, 默认 RFC 9106 低内存推荐值, 可用 scripts/tune_argon2.py 按部署机器测出
+    ARGON2_TIME_COST: int = 3
+    # 单位 KiB
+    ARGON2_MEMORY_COST: int = 64 * 1024
+    ARGON2_PARALLELISM: int = 4
+
+    model_config = {
+        **BaseAppSettings.model_config,
+        "env_prefix": "PASSWORD_",
+    }
@@ -0,0 +1,39 @@
+from pydantic import BaseModel
+
+from app.core._settings.base_setting import BaseAppSettings
+
+
+class RouteBudget(BaseModel):
+    """令牌桶预算: 每秒补充 rate 个令牌, 桶容量 burst(允许的突发请求数)"""
+    rate: float
+    burst: int
+
+
+class RateLimitSettings(BaseAppSettings):
+    # --- 登录限流(滑动窗口, 超出后返回 429) ---
+    # 滑动窗口长度(秒)
+    LOGIN_WINDOW_SECONDS: int = 300
+    # 窗口内同一用户名允许的登录尝试次数
+    LOGIN_MAX_PER_USERNAME: int = 10
+    # 窗口内同一客户端 IP 允许的登录尝试次数
+    LOGIN_MAX_PER_IP: int = 30
+    # 登录限流 Redis 键前缀
+    LOGIN_KEY_PREFIX: str = "ratelimit:login:"
+
+    # --- 全局限流中间件(令牌桶, 按客户端 IP + 路由前缀计数) ---
+    ENABLED: bool = True
+    # 路由前缀 -> 预算, 按最长前缀匹配, 未匹配的路径不限流; 环境变量以 JSON 传入
+    ROUTE_BUDGETS: dict[str, RouteBudget] = {
+        "/api/v1/auth": RouteBudget(rate=1, burst=10),
+        "/api/v1/admin": RouteBudget(rate=20, burst=60),
+        "/api/v1": RouteBudget(rate=10, burst=40),
+    }
+    # 令牌桶 Redis 键前缀
+    BUCKET_KEY_PREFIX: str = "ratelimit:bucket:"
+    # Redis 不可用时退回进程内令牌桶, 最多保留的桶数
+    LOCAL_MAX_BUCKETS: int = 10000
+
+    model_config = {
+        **BaseAppSettings.model_config,
+        "env_prefix": "RATE_LIMIT_",
+    }
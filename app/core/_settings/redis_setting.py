@@ -7,6 +7,15 @@ class RedisSettings(BaseAppSettings):
     DB: int = 0
     PASSWORD: str | None = None
     POOL_SIZE: int = 8
+    # 单次读写超时(秒)
+    SOCKET_TIMEOUT_SECONDS: float = 0.5
+    # 连接/超时错误的重试次数
+    RETRIES: int = 1
+    # 单次调用(含重试)的总耗时上限(秒), 超时计为一次失败
+    COMMAND_TIMEOUT_SECONDS: float = 1.0
+    # 熔断器: 连续失败次数达到阈值后打开, 冷却期内直接拒绝调用, 冷却后放行一个探测请求
+    BREAKER_FAILURE_THRESHOLD: int = 5
+    BREAKER_COOLDOWN_SECONDS: float = 10
 
     model_config = {
         **BaseAppSettings.model_config,
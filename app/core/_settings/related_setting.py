@@ -0,0 +1,19 @@
+from app.core._settings.base_setting import BaseAppSettings
+
+
+class RelatedSettings(BaseAppSettings):
+    # 每篇文章保留的相关文章数
+    TOP_K: int = 6
+    # 全量重新计算的间隔(秒), 多个 worker 每个周期只有一个计算
+    REBUILD_INTERVAL_SECONDS: int = 600
+    # 包含文章数超过该值的标签/分类不参与候选生成(仍计入相似度)
+    MAX_FEATURE_POSTS: int = 1000
+    # 计算结果(Redis Hash: post_id -> 逗号分隔的相关文章 id)
+    REDIS_KEY: str = "related:posts"
+    # 计算锁
+    LOCK_KEY: str = "related:posts:lock"
+
+    model_config = {
+        **BaseAppSettings.model_config,
+        "env_prefix": "RELATED_",
+    }
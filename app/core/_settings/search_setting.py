@@ -0,0 +1,42 @@
+from app.core._settings.base_setting import BaseAppSettings
+
+
+class SearchSettings(BaseAppSettings):
+    # 索引文件路径, 为空时使用 resources/search/posts.idx
+    INDEX_PATH: str = ""
+    # 启动时索引文件不存在则在后台全量构建
+    BUILD_ON_STARTUP: bool = True
+    # BM25 参数
+    BM25_K1: float = 1.2
+    BM25_B: float = 0.75
+    # 字段权重: 标题/摘要中的词频乘以权重后计入(简化的 BM25F)
+    TITLE_WEIGHT: int = 5
+    SUMMARY_WEIGHT: int = 2
+    # 单次查询最多累加的倒排条目数(决定最坏查询延迟), 按查询词项平均分配;
+    # 倒排按影响值倒序存储, 超出预算时只舍弃贡献最小的条目
+    MAX_POSTINGS_PER_QUERY: int = 20000
+    # 单次查询最多使用的词项数
+    MAX_QUERY_TERMS: int = 16
+    # 单次查询最多返回的结果数(分页深度上限)
+    MAX_RESULTS: int = 500
+    # 搜索结果摘要片段的字数
+    SNIPPET_CHARS: int = 120
+    # 管理端标题模糊查找的最低得分(标题包含的查询三元组比例)
+    TITLE_MIN_SCORE: float = 0.3
+    # 文章写入后延迟多久批量写入增量段(合并短时间内的连续编辑)
+    DELTA_APPLY_DELAY_SECONDS: float = 0.5
+    # 未合并的变更(增量段文章 + 墓碑)达到该数量时在后台重建基础索引
+    MERGE_MIN_CHANGES: int = 200
+    # 存在未合并变更且距上次构建超过该时间时在后台重建基础索引
+    MERGE_MAX_AGE_SECONDS: int = 3600
+    # 合并条件的检查间隔
+    MERGE_CHECK_INTERVAL_SECONDS: int = 30
+    # 合并锁: 多个 worker 中只有取得锁的一个构建并写入索引文件, 其余 worker 在下次检查时重新加载该文件
+    MERGE_LOCK_KEY: str = "search:merge:lock"
+    # 合并锁过期时间(秒), 应大于一次全量构建的耗时; 持有锁的 worker 异常退出后由其他 worker 接手
+    MERGE_LOCK_TTL_SECONDS: int = 600
+
+    model_config = {
+        **BaseAppSettings.model_config,
+        "env_prefix": "SEARCH_",
+    }
@@ -1,14 +1,18 @@
 class BizCode:
     SUCCESS = 200
     ERROR = 500
+    INVALID_CURSOR = 40001
     TOKEN_EXPIRED = 40101
     TOKEN_INVALID = 40102
     TOKEN_REVOKED = 40103
     TOKEN_REQUIRED = 40104
     FORBIDDEN = 40300
     VALIDATION_ERROR = 42200
+    TOO_MANY_REQUESTS = 42900
     USER_NOT_FOUND = 40401
     ARTICLE_NOT_FOUND = 40402
+    ARTICLE_EXISTS = 40901
+    SERVICE_BUSY = 50301
 
 class BizMsg:
     SUCCESS = "success"
@@ -21,4 +25,8 @@ class BizMsg:
     VALIDATION_ERROR = "validation failed"
     DB_RECORD_NOT_FOUND = "数据库记录未找到, 请联系管理员确认id是否正确"
     USER_NOT_FOUND = "用户未找到"
-    ARTICLE_NOT_FOUND = "文章未找到"
\ No newline at end of file
+    ARTICLE_NOT_FOUND = "文章未找到"
+    ARTICLE_EXISTS = "同名文章已存在"
+    INVALID_CURSOR = "无效的分页游标"
+    SERVICE_BUSY = "服务繁忙, 请稍后重试"
+    TOO_MANY_REQUESTS = "请求过于频繁, 请稍后重试"
\ No newline at end of file
@@ -6,6 +6,12 @@ from ._settings import (
     RedisSettings,
     LogSettings,
     QiniuSettings,
+    CacheSettings,
+    CounterSettings,
+    PasswordSettings,
+    RateLimitSettings,
+    SearchSettings,
+    RelatedSettings,
     BaseAppSettings
 )
 
@@ -18,5 +24,11 @@ class Settings(BaseAppSettings):
     db: DatabaseSettings = Field(default_factory=DatabaseSettings)
     log: LogSettings = Field(default_factory=LogSettings)
     qiniu: QiniuSettings = Field(default_factory=QiniuSettings)
+    cache: CacheSettings = Field(default_factory=CacheSettings)
+    counter: CounterSettings = Field(default_factory=CounterSettings)
+    password: PasswordSettings = Field(default_factory=PasswordSettings)
+    rate_limit: RateLimitSettings = Field(default_factory=RateLimitSettings)
+    search: SearchSettings = Field(default_factory=SearchSettings)
+    related: RelatedSettings = Field(default_factory=RelatedSettings)
 
 settings = Settings()
@@ -2,17 +2,39 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 import logging
 
+from app.core import settings
+from app.db.invalidation import InvalidationBus
 from app.db.redis import RedisClientManager
 from app.db.session import close_db
+from app.services.counter import CounterFlusher
+from app.services.related import RelatedPostsBuilder
+from app.services.search import search_indexer
+from app.utils.cryptpwd import shutdown_password_pool
 from app.utils.logger import cleanup_logging
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # 应用启动：初始化 Redis 连接
     await RedisClientManager.init()
+    # 订阅跨 worker 失效广播
+    InvalidationBus.start()
+    # 启动计数写回后台任务
+    counter_flusher = CounterFlusher(settings.counter.FLUSH_INTERVAL_SECONDS)
+    counter_flusher.start()
+    # 加载搜索索引并启动增量更新与合并任务, 索引文件不存在时在后台构建
+    search_indexer.start()
+    # 定期预计算相关文章
+    related_builder = RelatedPostsBuilder(settings.related.REBUILD_INTERVAL_SECONDS)
+    related_builder.start()
     yield
-    # 应用关闭：释放 Redis 连接
+    # 应用关闭：停止后台任务并做最后一次写回
+    await counter_flusher.stop()
+    await search_indexer.stop()
+    await related_builder.stop()
+    await InvalidationBus.stop()
+    # 释放 Redis 连接
     await RedisClientManager.close()
     await close_db()
+    shutdown_password_pool()
     # 清理日志记录器
     cleanup_logging()
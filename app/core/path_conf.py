@@ -4,8 +4,18 @@ BASE_DIR: Path = Path(__file__).resolve().parent.parent.parent
 
 BLOG_DIR: Path = BASE_DIR / "resources" / "blogs"
 
+SEARCH_DIR: Path = BASE_DIR / "resources" / "search"
+
 AVATAR_DIR: Path = BASE_DIR / "resources" / "avatar"
 
 DEFAULT_AVATAR_PATH: str = str(AVATAR_DIR / "default.jpg")
 
-LOG_DIR: Path = BASE_DIR / "logs"
\ No newline at end of file
+LOG_DIR: Path = BASE_DIR / "logs"
+
+
+def resolve_content_path(path: str | Path) -> Path:
+    """文章正文路径: 相对路径以 BLOG_DIR 为根"""
+    path = Path(path)
+    if not path.is_absolute():
+        path = BLOG_DIR / path
+    return path.resolve()
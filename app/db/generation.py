@@ -0,0 +1,117 @@
+import uuid
+from typing import Iterable
+
+from redis.exceptions import RedisError
+
+from app.core import settings
+from app.db.invalidation import InvalidationBus
+from app.db.redis import RedisClientManager
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 表写入事件的主题: {"table": 表名, "generation": 新版本号, "epoch": 版本号纪元}
+TABLE_TOPIC = "table"
+
+
+class TableGenerations:
+    """
+    表版本号(generation): 每张表在 Redis hash 中维护一个递增计数
+    - 每次写事务提交后, 对涉及的表各 HINCRBY 一次, 失效代价 O(1), 无需扫描缓存键
+    - 缓存条目记录写入时所依赖表的版本号, 读取时版本号不一致即视为过期
+    - 进程内同时保存一份已知的最大版本号, 供进程内缓存校验, 本进程的写入立即可见,
+      其他进程的写入通过 InvalidationBus 广播的事件同步
+    - hash 中另存一个随机纪元(EPOCH_FIELD), hash 丢失(Redis 重启或被清空)后版本号从头计数, 纪元随之改变;
+      观察到新纪元时丢弃已知版本号, 并递增本进程纪元, 之前记录的进程内条目全部失效
+    - Redis 不可用时不自行递增版本号, 只把表记为待补发: 补发成功之前依赖这些表的进程内条目不会命中,
+      Redis 恢复后(下次写入、读取依赖这些表的缓存或失效广播重新订阅时)补发 HINCRBY 与广播
+    """
+
+    EPOCH_FIELD = "_epoch"
+
+    _local: dict[str, int] = {}
+    _remote_epoch: str | None = None
+    _epoch: int = 0
+    _dirty: set[str] = set()
+
+    @classmethod
+    def local(cls, tables: Iterable[str]) -> tuple[int, ...]:
+        """本进程已知的表版本号, 首位为本进程纪元"""
+        return cls._epoch, *(cls._local.get(table, 0) for table in tables)
+
+    @classmethod
+    def dirty(cls, tables: Iterable[str]) -> bool:
+        """是否有表在 Redis 不可用期间写入过、尚未补发版本号递增"""
+        return not cls._dirty.isdisjoint(tables)
+
+    @classmethod
+    def observe(cls, tables: Iterable[str], generations: Iterable[int], epoch: str | None) -> None:
+        """记录从 Redis 读到或经广播收到的表版本号: 同一纪元内只增不减, 纪元变化时先丢弃已知版本号"""
+        if epoch != cls._remote_epoch:
+            cls._remote_epoch = epoch
+            cls._local = {}
+            cls._epoch += 1
+        for table, generation in zip(tables, generations):
+            if generation > cls._local.get(table, 0):
+                cls._local[table] = generation
+
+    @classmethod
+    async def fetch(cls, tables: tuple[str, ...]) -> tuple[int, ...] | None:
+        """读取 Redis 中的表版本号, Redis 不可用时返回 None"""
+        if not tables:
+            return ()
+        try:
+            epoch, *values = await RedisClientManager.get_client().hmget(
+                settings.cache.GENERATION_KEY, (cls.EPOCH_FIELD, *tables))
+        except (RedisError, RuntimeError) as e:
+            logger.warning(f"读取表版本号失败: {e}")
+            return None
+        generations = tuple(int(value or 0) for value in values)
+        cls.observe(tables, generations, epoch)
+        return generations
+
+    @classmethod
+    async def bump(cls, tables: Iterable[str]) -> bool:
+        """
+        递增表版本号并广播失效事件, 在写事务提交后调用; 之前未能写入 Redis 的表一并补发
+
+        :return: 是否已写入 Redis; Redis 不可用时记为待补发, 其他进程的缓存依赖过期时间兜底
+        """
+        tables = sorted(set(tables) | cls._dirty)
+        if not tables:
+            return True
+        key = settings.cache.GENERATION_KEY
+        try:
+            async with RedisClientManager.get_client().pipeline(transaction=True) as pipe:
+                pipe.hsetnx(key, cls.EPOCH_FIELD, uuid.uuid4().hex)
+                for table in tables:
+                    pipe.hincrby(key, table, 1)
+                pipe.hget(key, cls.EPOCH_FIELD)
+                _, *generations, epoch = await pipe.execute()
+        except (RedisError, RuntimeError) as e:
+            logger.warning(f"递增表版本号 {tables} 失败, 待 Redis 恢复后补发: {e}")
+            cls._dirty.update(tables)
+            return False
+        cls._dirty.difference_update(tables)
+        cls.observe(tables, generations, epoch)
+        await InvalidationBus.publish(TABLE_TOPIC, *(
+            {"table": table, "generation": generation, "epoch": epoch}
+            for table, generation in zip(tables, generations)))
+        return True
+
+    @classmethod
+    async def resync(cls) -> None:
+        """重新订阅后补发待补发的递增, 并全量同步版本号, 弥补断开期间丢失的事件"""
+        if cls._dirty:
+            await cls.bump(())
+        generations = await RedisClientManager.get_client().hgetall(settings.cache.GENERATION_KEY)
+        epoch = generations.pop(cls.EPOCH_FIELD, None)
+        cls.observe(generations.keys(), (int(g) for g in generations.values()), epoch)
+
+    @classmethod
+    def _on_event(cls, event: dict) -> None:
+        cls.observe((event["table"],), (event["generation"],), event.get("epoch"))
+
+
+InvalidationBus.subscribe(TABLE_TOPIC, TableGenerations._on_event)
+InvalidationBus.on_resync(TableGenerations.resync)
@@ -0,0 +1,122 @@
+import asyncio
+import json
+from typing import Any, Awaitable, Callable
+
+from redis.exceptions import RedisError
+
+from app.core import settings
+from app.db.redis import RedisClientManager
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+EventHandler = Callable[[dict[str, Any]], None]
+ResyncHandler = Callable[[], Awaitable[None]]
+
+
+class InvalidationBus:
+    """
+    跨 worker 失效广播(Redis pub/sub):
+    - 写操作提交后发布 {"topic": ..., ...} 事件, 所有 worker(包括自身)收到后清理本地状态
+    - 订阅断开期间可能丢失事件, 重新订阅成功后调用 resync 回调, 由各方自行从 Redis 重新同步
+    - 订阅不健康时, 本地缓存应退回较短的过期时间
+    """
+
+    _handlers: dict[str, list[EventHandler]] = {}
+    _resync_handlers: list[ResyncHandler] = []
+    _task: asyncio.Task | None = None
+    _healthy: bool = False
+
+    @classmethod
+    def subscribe(cls, topic: str, handler: EventHandler) -> None:
+        """注册事件处理函数, 处理函数在事件循环中同步执行, 不应阻塞"""
+        cls._handlers.setdefault(topic, []).append(handler)
+
+    @classmethod
+    def on_resync(cls, handler: ResyncHandler) -> None:
+        """注册(重新)订阅成功后的同步回调"""
+        cls._resync_handlers.append(handler)
+
+    @classmethod
+    def healthy(cls) -> bool:
+        """当前是否处于订阅状态(能及时收到其他 worker 的失效事件)"""
+        return cls._healthy
+
+    @classmethod
+    async def publish(cls, topic: str, *events: dict[str, Any]) -> None:
+        """在一次往返内发布同一主题的若干事件, Redis 不可用时仅记录日志"""
+        if not events:
+            return
+        try:
+            async with RedisClientManager.get_client().pipeline(transaction=False) as pipe:
+                for event in events:
+                    pipe.publish(settings.cache.INVALIDATION_CHANNEL,
+                                 json.dumps({"topic": topic, **event}, separators=(",", ":")))
+                await pipe.execute()
+        except (RedisError, RuntimeError) as e:
+            logger.warning(f"发布失效事件 {topic} 失败: {e}")
+
+    @classmethod
+    def dispatch(cls, message: str) -> None:
+        try:
+            event = json.loads(message)
+        except ValueError:
+            logger.warning(f"忽略无法解析的失效事件: {message!r}")
+            return
+        for handler in cls._handlers.get(event.get("topic"), ()):
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error(f"处理失效事件 {event.get('topic')} 失败: {e}")
+
+    @classmethod
+    def start(cls) -> None:
+        if cls._task is None:
+            cls._task = asyncio.create_task(cls._run(), name="invalidation-bus")
+
+    @classmethod
+    async def stop(cls) -> None:
+        if cls._task is None:
+            return
+        cls._task.cancel()
+        try:
+            await cls._task
+        except asyncio.CancelledError:
+            pass
+        cls._task = None
+        cls._healthy = False
+
+    @classmethod
+    async def _resync(cls) -> bool:
+        ok = True
+        for handler in cls._resync_handlers:
+            try:
+                await handler()
+            except Exception as e:
+                logger.error(f"失效广播重新同步失败: {e}")
+                ok = False
+        return ok
+
+    @classmethod
+    async def _run(cls) -> None:
+        retry_delay = settings.cache.INVALIDATION_RETRY_SECONDS
+        while True:
+            try:
+                async with RedisClientManager.get_client().pubsub() as pubsub:
+                    await pubsub.subscribe(settings.cache.INVALIDATION_CHANNEL)
+                    # 先订阅再同步, 同步期间到达的事件缓存在连接中, 同步完成后才视为健康
+                    if not await cls._resync():
+                        raise RuntimeError("重新同步失败")
+                    cls._healthy = True
+                    while True:
+                        # 带超时轮询, 避免空闲时被连接的 socket_timeout 判定为读超时
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                        if message is not None:
+                            cls.dispatch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except (RedisError, RuntimeError, OSError) as e:
+                logger.warning(f"失效广播订阅断开, {retry_delay} 秒后重试: {e}")
+            finally:
+                cls._healthy = False
+            await asyncio.sleep(retry_delay)
@@ -1,10 +1,118 @@
+import asyncio
+import time
+
 import redis.asyncio as redis
-from redis.asyncio.client import Redis
-from typing import Optional
+from redis.asyncio.client import Pipeline, Redis
+from typing import Any, Optional
 from app.core import settings
 from redis.retry import Retry
 from redis.backoff import ExponentialBackoff
-from redis.exceptions import (TimeoutError, ConnectionError)
+from redis.exceptions import (TimeoutError, ConnectionError, RedisError)
+
+from app.utils.metrics import register_metrics
+
+
+class RedisUnavailableError(ConnectionError):
+    """熔断器打开期间直接拒绝 Redis 调用"""
+
+
+class CircuitBreaker:
+    """
+    熔断器:
+    - closed: 正常放行, 连续失败达到阈值后转为 open
+    - open: 直接拒绝, 冷却时间过后转为 half_open
+    - half_open: 只放行一个探测请求, 成功则恢复 closed, 失败则重新 open
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int, cooldown_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self.stats_counter = {"opened": 0, "rejected": 0}
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown_seconds:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.stats_counter["rejected"] += 1
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._probing = False
+        self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.stats_counter["opened"] += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release_probe(self) -> None:
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == self.OPEN and time.monotonic() - self.opened_at < self.cooldown_seconds
+
+    def stats(self) -> dict[str, Any]:
+        return {"state": self.state, "failures": self.failures, **self.stats_counter}
+
+
+breaker = CircuitBreaker(settings.redis.BREAKER_FAILURE_THRESHOLD, settings.redis.BREAKER_COOLDOWN_SECONDS)
+register_metrics("redis_breaker", breaker.stats)
+
+
+async def _guarded(call):
+    """经熔断器与单次调用超时执行一次 Redis 调用(命令或管道)"""
+    if not breaker.allow():
+        raise RedisUnavailableError("Redis circuit breaker is open")
+    try:
+        async with asyncio.timeout(settings.redis.COMMAND_TIMEOUT_SECONDS):
+            result = await call()
+    except asyncio.TimeoutError as e:
+        breaker.record_failure()
+        raise TimeoutError(f"Redis call exceeded {settings.redis.COMMAND_TIMEOUT_SECONDS}s") from e
+    except (ConnectionError, TimeoutError, OSError):
+        breaker.record_failure()
+        raise
+    except RedisError:
+        # 命令错误(如脚本错误)说明 Redis 正常响应, 不计入失败
+        breaker.record_success()
+        raise
+    except BaseException:
+        # 调用被取消, 释放探测名额
+        breaker.release_probe()
+        raise
+    breaker.record_success()
+    return result
+
+
+class GuardedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        return await _guarded(lambda: super(GuardedPipeline, self).execute(raise_on_error))
+
+
+class GuardedRedis(Redis):
+    """所有命令与管道都经过熔断器, 并受 REDIS_COMMAND_TIMEOUT_SECONDS 限制总耗时(含重试)"""
+
+    async def execute_command(self, *args, **options):
+        return await _guarded(lambda: super(GuardedRedis, self).execute_command(*args, **options))
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> GuardedPipeline:
+        return GuardedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
 
 
 class RedisClientManager:
@@ -13,6 +121,7 @@ class RedisClientManager:
     - 单例连接池
     - 自动初始化/关闭
     - 获取共享 Redis 客户端
+    - 命令经熔断器执行, Redis 故障时快速失败, 调用方按各自的降级逻辑处理
     """
     _redis_client: Optional[Redis] = None
 
@@ -20,23 +129,25 @@ class RedisClientManager:
     async def init(cls) -> None:
         """初始化连接池（FastAPI startup 调用）"""
         if cls._redis_client is None:
+            # 连接参数须设置在连接池上, 传入 connection_pool 时 Redis() 的连接参数不会生效
             conn_pool = redis.ConnectionPool(
                 max_connections=settings.redis.POOL_SIZE,
+                host=settings.redis.HOST,
+                port=settings.redis.PORT,
+                db=settings.redis.DB,
+                password=settings.redis.PASSWORD,
+                decode_responses=True,  # 自动解码 str
+                # 重试策略: 次数可配置, 指数退避, 总耗时受 REDIS_COMMAND_TIMEOUT_SECONDS 限制
+                retry=Retry(ExponentialBackoff(cap=0.5, base=0.05), retries=settings.redis.RETRIES),
+                retry_on_error=[TimeoutError, ConnectionError, ConnectionResetError],
+                socket_timeout=settings.redis.SOCKET_TIMEOUT_SECONDS,
+                socket_connect_timeout=settings.redis.SOCKET_TIMEOUT_SECONDS,
             )
-            cls._redis_client = redis.Redis(connection_pool=conn_pool,
-                    host=settings.redis.HOST,
-                    port=settings.redis.PORT,
-                    db=settings.redis.DB,
-                    password=settings.redis.PASSWORD,
-                    decode_responses=True,  # 自动解码 str
-                    retry=Retry(ExponentialBackoff(cap=4, base=1), retries=4), # 重试策略: 4次，初始延迟1秒，最大延迟4秒
-                    retry_on_error=[TimeoutError, ConnectionError, ConnectionResetError],
-                    socket_timeout=1.5,  # 1秒socket连接+操作返回总时间超时
-                )
+            cls._redis_client = GuardedRedis(connection_pool=conn_pool)
             # 测试连接
             try:
                 await cls._redis_client.ping()
-            except redis.ConnectionError:
+            except RedisError:
                 raise RuntimeError("Failed to connect to Redis server")
 
     @classmethod
@@ -50,7 +161,7 @@ class RedisClientManager:
     async def close(cls) -> None:
         """关闭连接池（FastAPI shutdown 调用）"""
         if cls._redis_client:
-            await cls._redis_client.close()
+            await cls._redis_client.aclose(close_connection_pool=True)
             cls._redis_client = None
 
 
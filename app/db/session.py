@@ -1,7 +1,9 @@
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Iterable
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine, AsyncEngine
 from app.core import settings
+from app.db.generation import TableGenerations
 
 
 ASYNC_DATABASE_URL = settings.db.ASYNC_DB_URI
@@ -16,6 +18,13 @@ def _ensure_engine() -> AsyncEngine:
     return engine
 
 
+def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """获取会话工厂, 供请求之外的后台任务自行创建会话"""
+    _ensure_engine()
+    assert SessionLocal is not None
+    return SessionLocal
+
+
 # FastAPI 依赖注入：异步会话
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     _ensure_engine()
@@ -24,6 +33,51 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+# session.info 中标记当前会话处于工作单元(单事务)模式的键
+_UOW_KEY = "unit_of_work"
+# session.info 中记录当前事务写过的表, 提交后统一递增版本号
+_DIRTY_TABLES_KEY = "dirty_tables"
+
+
+def in_unit_of_work(session: AsyncSession) -> bool:
+    """当前会话是否处于工作单元模式(此时 Mapper 写操作只 flush 不 commit)"""
+    return bool(session.info.get(_UOW_KEY))
+
+
+def mark_tables_dirty(session: AsyncSession, tables: Iterable[str]) -> None:
+    """记录当前事务写过的表"""
+    session.info.setdefault(_DIRTY_TABLES_KEY, set()).update(tables)
+
+
+async def publish_dirty_tables(session: AsyncSession) -> None:
+    """事务提交后递增写过的表的版本号, 使依赖这些表的缓存失效"""
+    tables = session.info.pop(_DIRTY_TABLES_KEY, None)
+    if tables:
+        await TableGenerations.bump(tables)
+
+
+@asynccontextmanager
+async def unit_of_work(session: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """
+    工作单元: 块内所有 Mapper 写操作共用一个事务, 正常退出时统一提交一次, 异常时整体回滚
+    - 支持嵌套, 内层直接复用外层事务, 由最外层负责提交
+    """
+    if in_unit_of_work(session):
+        yield session
+        return
+    session.info[_UOW_KEY] = True
+    try:
+        yield session
+        await session.commit()
+    except BaseException:
+        await session.rollback()
+        session.info.pop(_DIRTY_TABLES_KEY, None)
+        raise
+    finally:
+        session.info.pop(_UOW_KEY, None)
+    await publish_dirty_tables(session)
+
+
 async def close_db() -> None:
     """关闭数据库连接"""
     global engine
@@ -10,10 +10,12 @@ from app.core import BizCode, BizMsg
 logger = get_logger(__name__)
 
 class CattleBlogException(Exception):
-    def __init__(self, msg: str, status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR, biz_code: int = BizCode.ERROR):
+    def __init__(self, msg: str, status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR, biz_code: int = BizCode.ERROR,
+                 headers: dict[str, str] | None = None):
         self.msg = msg
         self.status_code = status_code
         self.biz_code = biz_code
+        self.headers = headers
         super().__init__(self.msg)
 
 
@@ -27,6 +29,27 @@ class ArticleNotFoundException(CattleBlogException):
         super().__init__(msg, status.HTTP_404_NOT_FOUND, BizCode.ARTICLE_NOT_FOUND)
 
 
+class ArticleExistsException(CattleBlogException):
+    def __init__(self, msg: str = BizMsg.ARTICLE_EXISTS):
+        super().__init__(msg, status.HTTP_409_CONFLICT, BizCode.ARTICLE_EXISTS)
+
+
+class InvalidCursorException(CattleBlogException):
+    def __init__(self, msg: str = BizMsg.INVALID_CURSOR):
+        super().__init__(msg, status.HTTP_400_BAD_REQUEST, BizCode.INVALID_CURSOR)
+
+
+class ServiceBusyException(CattleBlogException):
+    def __init__(self, msg: str = BizMsg.SERVICE_BUSY):
+        super().__init__(msg, status.HTTP_503_SERVICE_UNAVAILABLE, BizCode.SERVICE_BUSY)
+
+
+class TooManyRequestsException(CattleBlogException):
+    def __init__(self, retry_after: int, msg: str = BizMsg.TOO_MANY_REQUESTS):
+        super().__init__(msg, status.HTTP_429_TOO_MANY_REQUESTS, BizCode.TOO_MANY_REQUESTS,
+                         headers={"Retry-After": str(retry_after)})
+
+
 class AuthenticationException(CattleBlogException):
     def __init__(self, msg: str = BizMsg.TOKEN_INVALID, biz_code: int = BizCode.TOKEN_INVALID):
         super().__init__(msg, status.HTTP_401_UNAUTHORIZED, biz_code=BizCode.VALIDATION_ERROR)
@@ -49,7 +72,8 @@ def register_exception_handlers(app: FastAPI):
                 "code": exc.biz_code,
                 "msg": exc.msg,
                 "data": None
-            }
+            },
+            headers=exc.headers,
         )
     
     @app.exception_handler(RequestValidationError)
@@ -1,31 +1,56 @@
+import re
 from typing import Optional, Iterable
 
-from fastapi import Request
-
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.responses import JSONResponse, Response
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.core import BizCode, BizMsg
-from app.model import Result
+from app.model import JwtPayload, Result
 from app.model.orm.field_enum import Role
 from app.utils.auth_utils import JwtUtil
 from app.utils.user_context import UserContext, set_user_context, clear_user_context
 
 
-def _starts_with(path: str, prefixes: Iterable[str]) -> bool:
-    return any(path.startswith(p) for p in prefixes)
+def _compile_prefixes(prefixes: Iterable[str]) -> re.Pattern:
+    """将前缀列表编译为一个正则, 一次 match 完成所有前缀的匹配; 空列表不匹配任何路径"""
+    alternatives = "|".join(re.escape(p) for p in sorted(set(prefixes), key=len, reverse=True))
+    return re.compile(alternatives or r"(?!)")
+
+
+def _reject(status_code: int, msg: str, code: int) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content=Result.failure(msg=msg, code=code).model_dump())
+
+
+def _extract_token(scope: Scope) -> Optional[str]:
+    """从 Authorization 请求头提取令牌, 未携带时返回 None"""
+    auth = Headers(scope=scope).get("authorization")
+    if not auth:
+        return None
+    if auth.startswith("Bearer "):
+        # 从Authorization字段中提取令牌
+        return auth.split(" ", 1)[1].strip()
+    # 非Bearer格式, 认为直接传递了令牌
+    return auth
+
 
+class AuthMiddleware:
+    """
+    鉴权中间件(纯 ASGI 实现)
+    - 不经过 BaseHTTPMiddleware 的任务与内存流包装, 流式响应体原样透传
+    - 各类路径前缀预编译为正则, 每个请求只做常数次匹配
+    """
 
-class AuthMiddleware(BaseHTTPMiddleware):
     def __init__(
         self,
-        app,
+        app: ASGIApp,
         admin_prefixes: Optional[list[str]] = None,
         protected_prefixes: Optional[list[str]] = None,
         public_paths: Optional[list[str]] = None,
         protected_post_prefixes: Optional[list[str]] = None,
+        optional_post_prefixes: Optional[list[str]] = None,
     ) -> None:
-        super().__init__(app)
+        self.app = app
         self.admin_prefixes = admin_prefixes or ["/api/v1/admin"]
         # 需要登录但非管理员的路径前缀或具体路径
         self.protected_prefixes = protected_prefixes or [
@@ -37,56 +62,74 @@ class AuthMiddleware(BaseHTTPMiddleware):
         self.protected_post_prefixes = protected_post_prefixes or [
             "/api/v1/users/comment",
         ]
+        # 仅在 POST 时可选登录的路径前缀(如点赞): 携带有效令牌时设置用户上下文, 未携带或无效时按匿名访客处理
+        self.optional_post_prefixes = optional_post_prefixes or [
+            "/api/v1/articles",
+        ]
         # 明确公开路径（优先级最高）
         self.public_paths = public_paths or [
             "/api/v1/auth/login",
             "/api/v1/auth/refresh"
         ]
+        self._public_paths = frozenset(self.public_paths)
+        self._admin_re = _compile_prefixes(self.admin_prefixes)
+        self._protected_re = _compile_prefixes(self.protected_prefixes)
+        self._protected_post_re = _compile_prefixes(self.protected_post_prefixes)
+        self._optional_post_re = _compile_prefixes(self.optional_post_prefixes)
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        path = request.url.path
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
+        path: str = scope["path"]
         # 公开路径直接放行
-        if path in self.public_paths:
-            return await call_next(request)
+        if path in self._public_paths:
+            await self.app(scope, receive, send)
+            return
 
-        require_admin = _starts_with(path, self.admin_prefixes)
-        require_user = _starts_with(path, self.protected_prefixes)
-        if request.method.upper() == "POST" and _starts_with(path, self.protected_post_prefixes):
-            require_user = True
+        require_admin = self._admin_re.match(path) is not None
+        require_user = (self._protected_re.match(path) is not None
+                        or (scope["method"] == "POST" and self._protected_post_re.match(path) is not None))
 
-        # 不需要鉴权的路径直接放行
+        # 不需要鉴权的路径直接放行, 可选登录的路径尽量解析令牌
         if not require_admin and not require_user:
-            return await call_next(request)
+            if scope["method"] == "POST" and self._optional_post_re.match(path) is not None:
+                await self._call_with_optional_user(scope, receive, send)
+            else:
+                await self.app(scope, receive, send)
+            return
 
-        # 获取请求头中的Authorization字段
-        auth = request.headers.get("Authorization")
-        if not auth:
+        token = _extract_token(scope)
+        if not token:
             # 未提供令牌
-            return JSONResponse(status_code=401, content=Result.failure(
-                                        msg=BizMsg.TOKEN_REQUIRED, code=BizCode.TOKEN_REQUIRED).model_dump())
-
-        if auth.startswith("Bearer "):
-            # 从Authorization字段中提取令牌
-            token = auth.split(" ", 1)[1].strip()
-        else:
-            # 非Bearer格式, 认为直接传递了令牌
-            token = auth
+            await _reject(401, BizMsg.TOKEN_REQUIRED, BizCode.TOKEN_REQUIRED)(scope, receive, send)
+            return
 
         payload = await JwtUtil.get_payload(token)
         if not payload:
             # 令牌无效
-            return JSONResponse(status_code=401, content=Result.failure(
-                                        msg=BizMsg.TOKEN_INVALID, code=BizCode.TOKEN_INVALID).model_dump())
-        JwtUtil.logger.info(f"成功解析令牌 当前用户:{payload.user_id}, 权限级别: {payload.role}")
+            await _reject(401, BizMsg.TOKEN_INVALID, BizCode.TOKEN_INVALID)(scope, receive, send)
+            return
+        JwtUtil.logger.debug(f"成功解析令牌 当前用户:{payload.user_id}, 权限级别: {payload.role}")
         # 管理员校验
         if require_admin and payload.role not in [Role.ADMIN.value, Role.SUPER.value]:
-            return JSONResponse(
-                content=Result.failure(msg=BizMsg.FORBIDDEN, code=BizCode.FORBIDDEN).model_dump(),
-                status_code=403,
-            )
+            await _reject(403, BizMsg.FORBIDDEN, BizCode.FORBIDDEN)(scope, receive, send)
+            return
+
+        await self._call_as_user(scope, receive, send, payload, token)
+
+    async def _call_with_optional_user(self, scope: Scope, receive: Receive, send: Send) -> None:
+        token = _extract_token(scope)
+        payload = await JwtUtil.get_payload(token) if token else None
+        if not payload:
+            await self.app(scope, receive, send)
+            return
+        await self._call_as_user(scope, receive, send, payload, token)
 
-        # 设置上下文并继续处理
+    async def _call_as_user(self, scope: Scope, receive: Receive, send: Send, payload: JwtPayload,
+                            token: str) -> None:
+        # 设置上下文并继续处理; 与路由处理在同一任务中执行, 处理函数可直接读取
         set_user_context(UserContext(
             user_id=payload.user_id,
             username=payload.username,
@@ -94,7 +137,6 @@ class AuthMiddleware(BaseHTTPMiddleware):
             token=token
         ))
         try:
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send)
         finally:
-            clear_user_context()
\ No newline at end of file
+            clear_user_context()
@@ -0,0 +1,69 @@
+import math
+import re
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import BizCode, BizMsg, settings
+from app.core._settings import RouteBudget
+from app.model import Result
+from app.utils.rate_limit import resolve_client_ip, token_bucket_take
+
+
+class RateLimitMiddleware:
+    """
+    全局限流中间件(令牌桶, 纯 ASGI 实现)
+    - 按 客户端 IP(经可信代理的 X-Forwarded-For 解析) + 最长匹配的路由前缀 计数, 各前缀的预算见 RATE_LIMIT_ROUTE_BUDGETS
+    - 每个请求一次 Redis 往返, Redis 不可用时退回进程内令牌桶
+    - 响应附带 RateLimit-Limit / RateLimit-Remaining / RateLimit-Reset 头, 超限时返回 429 与 Retry-After
+    """
+
+    def __init__(self, app: ASGIApp, budgets: Optional[dict[str, RouteBudget]] = None) -> None:
+        self.app = app
+        self.budgets = budgets or settings.rate_limit.ROUTE_BUDGETS
+        # 按前缀长度倒序组成分组正则, 第一个命中的分组即为最长前缀;
+        # 前缀只匹配完整的路径段, /api/v1/admin 不会匹配 /api/v1/administrator
+        self._prefixes = sorted(self.budgets, key=len, reverse=True)
+        self._prefix_re = re.compile("|".join(
+            f"({re.escape(p)})" if p.endswith("/") else f"({re.escape(p)})(?=/|$)" for p in self._prefixes
+        ) or r"(?!)")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.rate_limit.ENABLED:
+            await self.app(scope, receive, send)
+            return
+        match = self._prefix_re.match(scope["path"])
+        if match is None:
+            await self.app(scope, receive, send)
+            return
+
+        prefix = self._prefixes[match.lastindex - 1]
+        budget = self.budgets[prefix]
+        client_ip = resolve_client_ip(scope)
+        allowed, tokens = await token_bucket_take(
+            f"{settings.rate_limit.BUCKET_KEY_PREFIX}{prefix}:{client_ip}", budget.rate, budget.burst)
+        headers = {
+            "RateLimit-Limit": str(budget.burst),
+            "RateLimit-Remaining": str(max(int(tokens), 0)),
+            # 令牌补满所需的秒数
+            "RateLimit-Reset": str(math.ceil((budget.burst - tokens) / budget.rate)),
+        }
+
+        if not allowed:
+            headers["Retry-After"] = str(max(math.ceil((1 - tokens) / budget.rate), 1))
+            response = JSONResponse(
+                status_code=429,
+                content=Result.failure(msg=BizMsg.TOO_MANY_REQUESTS, code=BizCode.TOO_MANY_REQUESTS).model_dump(),
+                headers=headers,
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
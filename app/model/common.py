@@ -40,4 +40,11 @@ class PaginatedResponse(BaseModel, Generic[T]):
     total: int
     current: int
     size: int
-    records: list[T]
\ No newline at end of file
+    records: list[T]
+
+
+class CursorPaginatedResponse(BaseModel, Generic[T]):
+    """游标分页响应 vo, next_cursor 为空表示没有下一页"""
+    size: int
+    records: list[T]
+    next_cursor: Optional[str] = None
@@ -1,7 +1,7 @@
 from datetime import datetime, date as pydate
 from typing import Optional
 from .field_enum import PostStatus, Role, TimelineEvent
-from sqlalchemy import DateTime, Integer, String, Text, Enum, JSON
+from sqlalchemy import DateTime, Integer, String, Text, Enum, JSON, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 from app.core import settings, path_conf
@@ -83,6 +83,26 @@ class PostTag(Base):
     tag_id: Mapped[int] = mapped_column(Integer, primary_key=True)  # 逻辑外键
 
 
+class Like(Base):
+    """点赞流水(持久化日志), like_count 由其重新统计"""
+    __tablename__ = "likes"
+    __table_args__ = (UniqueConstraint("post_id", "voter", name="uq_likes_post_voter"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    post_id: Mapped[int] = mapped_column(Integer, nullable=False)  # 逻辑外键
+    voter: Mapped[str] = mapped_column(String(64), nullable=False)
+    user_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # 逻辑外键
+    create_time: Mapped[datetime] = mapped_column(DateTime(timezone=False), default=func.now())
+
+
+class CounterBatch(Base):
+    """已写回的计数批次, 与计数更新在同一事务中写入, 保证同一批次只写回一次"""
+    __tablename__ = "counter_batches"
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    create_time: Mapped[datetime] = mapped_column(DateTime(timezone=False), default=func.now(), index=True)
+
+
 class Timeline(Base):
     __tablename__ = "timeline"
 
@@ -3,3 +3,9 @@ from pydantic import BaseModel
 
 class CreateResponse(BaseModel):
     id: int
+
+
+class ProfileInfo(BaseModel):
+    category_count: int
+    tag_count: int
+    post_count: int
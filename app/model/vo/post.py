@@ -1,7 +1,29 @@
 from datetime import datetime
-from typing import List
+from typing import Annotated, List
 
-from pydantic import BaseModel, field_serializer
+from pydantic import BaseModel, BeforeValidator
+
+
+def _split_csv(value):
+    """数据库聚合得到的逗号分隔字符串 -> 列表, None -> 空列表, 已是列表则原样返回"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return value.split(",") if value else []
+    return value
+
+
+def _split_csv_or_none(value):
+    """同 _split_csv, 但保留 None"""
+    if value is None:
+        return None
+    return _split_csv(value)
+
+
+# 以列表形式存储与序列化, 同时兼容逗号分隔字符串输入, 保证 VO 可以 JSON 往返(缓存)
+CsvStrList = Annotated[List[str], BeforeValidator(_split_csv)]
+CsvIntList = Annotated[List[int], BeforeValidator(_split_csv)]
+OptionalCsvIntList = Annotated[List[int] | None, BeforeValidator(_split_csv_or_none)]
 
 
 class PostSimpleBaseVO(BaseModel):
@@ -13,20 +35,8 @@ class PostSimpleBaseVO(BaseModel):
     title: str
     summary: str | None = ''
     author_name: str
-    tag_names: str | None = None
-    category_names: str | None = None
-
-    @field_serializer("tag_names")
-    def serialize_tag_names(self, tag_names: str | None) -> List[str]:
-        if tag_names is None:
-            return []
-        return tag_names.split(",")
-    
-    @field_serializer("category_names")
-    def serialize_category_names(self, category_names: str | None) -> List[str]:
-        if category_names is None:
-            return []
-        return category_names.split(",")
+    tag_names: CsvStrList = []
+    category_names: CsvStrList = []
 
 
 class PostDetailBase(BaseModel):
@@ -37,38 +47,11 @@ class PostDetailBase(BaseModel):
     title: str
     summary: str | None = ''
     author_name: str
-    tag_ids: str | None = None
-    category_ids: str | None = None
-    tag_names: str | None = None
-    category_names: str | None = None
+    tag_ids: CsvIntList = []
+    category_ids: CsvIntList = []
+    tag_names: CsvStrList = []
+    category_names: CsvStrList = []
 
-    @field_serializer("category_ids")
-    def serialize_category_ids(self, category_ids: str | None) -> List[int]:
-        if category_ids is None:
-            return []
-        if category_ids.find(',') == -1:
-            return [int(category_ids)]
-        return [int(id) for id in category_ids.split(",")]
-    
-    @field_serializer("tag_ids")
-    def serialize_tag_ids(self, tag_ids: str | None) -> List[int]:
-        if tag_ids is None:
-            return []
-        if tag_ids.find(',') == -1:
-            return [int(tag_ids)]
-        return [int(id) for id in tag_ids.split(",")]
-
-    @field_serializer("tag_names")
-    def serialize_tag_names(self, tag_names: str | None) -> List[str]:
-        if tag_names is None:
-            return []
-        return tag_names.split(",")
-    
-    @field_serializer("category_names")
-    def serialize_category_names(self, category_names: str | None) -> List[str]:
-        if category_names is None:
-            return []
-        return category_names.split(",")
 
 class PostCardVO(PostSimpleBaseVO):
     """用户端前端卡片展示所需信息
@@ -78,54 +61,31 @@ class PostCardVO(PostSimpleBaseVO):
     update_time: datetime
     view_count: int
     like_count: int
-    category_ids: str | None = None
-
-    @field_serializer("category_ids")
-    def serialize_category_ids(self, category_ids: str | None) -> List[int]:
-        if category_ids is None:
-            return []
-        return [int(id) for id in category_ids.split(",")]
+    category_ids: CsvIntList = []
 
     class Config:
         from_attributes = True
 
 
+class SearchCardVO(PostCardVO):
+    """搜索结果卡片: 附带命中摘要片段(html 转义后以 <mark> 标出命中词)"""
+    snippet: str = ""
+
+
 class U_PostInfo(BaseModel):
     """用户端文章详情页的文章基本信息
     """
     id: int
     title: str
     author_name: str
-    tag_names: str | None = None
-    category_names: str | None = None
+    tag_names: CsvStrList = []
+    category_names: CsvStrList = []
     create_time: datetime | None
     update_time: datetime | None
     view_count: int | None
     like_count: int | None
-    category_ids: str | None = None
+    category_ids: OptionalCsvIntList = None
 
-    @field_serializer("category_ids")
-    def serialize_category_ids(self, category_ids: str | None) -> List[int]:
-        if category_ids is None:
-            return None
-        if category_ids.find(',') == -1:
-            return [int(category_ids)]
-        return [int(id) for id in category_ids.split(",")]
-
-    @field_serializer("tag_names")
-    def serialize_tag_names(self, tag_names: str | None) -> List[str]:
-        if tag_names is None:
-            return []
-        return tag_names.split(",")
-    
-    @field_serializer("category_names")
-    def serialize_category_names(self, category_names: str | None) -> List[str]:
-        if category_names is None:
-            return []
-        return category_names.split(",")
-
-    
-    
 
 class U_PostDetailVO(PostSimpleBaseVO):
     """用户端前端文章全文阅读页展示所需信息
@@ -136,15 +96,7 @@ class U_PostDetailVO(PostSimpleBaseVO):
     update_time: datetime
     view_count: int
     like_count: int
-    category_ids: str | None = None
-
-    @field_serializer("category_ids")
-    def serialize_category_ids(self, category_ids: str | None) -> List[int]:
-        if category_ids is None:
-            return None
-        if category_ids.find(',') == -1:
-            return [int(category_ids)]
-        return [int(id) for id in category_ids.split(",")]
+    category_ids: OptionalCsvIntList = None
 
     model_config = {
         "from_attributes": True,
@@ -179,7 +131,7 @@ class PostTableVO(PostDetailBase):
     post_status: str| None = None
     create_time: datetime | None = None
     update_time: datetime | None = None
-    
+
     model_config = {
         "from_attributes": True,
     }
@@ -1,6 +1,7 @@
-from typing import Generic, List, Optional, Type, TypeVar
+import functools
+from typing import Any, Generic, Iterable, List, Optional, Sequence, Type, TypeVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from sqlalchemy import CursorResult, func, select, update, Column, delete
 from sqlalchemy.engine.result import Result
 from sqlalchemy.engine.row import Row
@@ -8,10 +9,18 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import load_only
 
 
+from app.db.session import in_unit_of_work, mark_tables_dirty, publish_dirty_tables
 from app.model import Base
 
 # 定义类型变量
 TableType = TypeVar("TableType", bound=Base)
+VOType = TypeVar("VOType", bound=BaseModel)
+
+
+@functools.cache
+def list_adapter(vo_type: type[VOType]) -> TypeAdapter[list[VOType]]:
+    """list[VO] 的 TypeAdapter, 按 VO 类型缓存, 校验器与序列化器只构建一次"""
+    return TypeAdapter(list[vo_type])
 
 
 class BaseMapper(Generic[TableType]):
@@ -28,6 +37,20 @@ class BaseMapper(Generic[TableType]):
         """
         self.entity_model = entity_model
 
+    async def _commit(self, session: AsyncSession, *tables: str) -> None:
+        """
+        提交写操作: 处于工作单元模式时仅 flush, 由工作单元统一提交; 否则立即提交
+        - 提交后递增写过的表的版本号并广播失效事件, 工作单元模式下推迟到工作单元提交后
+
+        :param tables: 本次写操作涉及的表名, 默认为当前 Mapper 对应的表
+        """
+        mark_tables_dirty(session, tables or (self.entity_model.__tablename__,))
+        if in_unit_of_work(session):
+            await session.flush()
+        else:
+            await session.commit()
+            await publish_dirty_tables(session)
+
     async def create(self, session: AsyncSession, data: dict | BaseModel) -> int:
         """
         创建新记录
@@ -48,7 +71,7 @@ class BaseMapper(Generic[TableType]):
         session.add(obj)
         await session.flush()
         obj_id = obj.id
-        await session.commit()
+        await self._commit(session)
         return obj_id
 
     async def get_by_id(self, session: AsyncSession, id: int) -> Optional[TableType]:
@@ -131,7 +154,7 @@ class BaseMapper(Generic[TableType]):
     async def update(self, session: AsyncSession, id: int, obj_update: dict) -> int | None:
         statement = update(self.entity_model).where(self.entity_model.id == id).values(**obj_update)  # type: ignore
         result: CursorResult = await session.execute(statement)
-        await session.commit()
+        await self._commit(session)
         return result.rowcount
 
     async def delete(self, session: AsyncSession, id: int) -> bool:
@@ -148,7 +171,7 @@ class BaseMapper(Generic[TableType]):
         db_obj = await self.get_by_id(session, id)
         if db_obj:
             await session.delete(db_obj)
-            await session.commit()
+            await self._commit(session)
             return True
         return False
     
@@ -169,7 +192,7 @@ class BaseMapper(Generic[TableType]):
                 if hasattr(self.entity_model, field):
                     statement = statement.where(getattr(self.entity_model, field) == value)
         result: CursorResult = await session.execute(statement)
-        await session.commit()
+        await self._commit(session)
         return result.rowcount
 
     async def delete_by_filters(self, session: AsyncSession, **filters) -> bool:
@@ -188,7 +211,7 @@ class BaseMapper(Generic[TableType]):
             if hasattr(self.entity_model, field):
                 statement = statement.where(getattr(self.entity_model, field) == value)
         result: CursorResult = await session.execute(statement)
-        await session.commit()
+        await self._commit(session)
         return result.rowcount > 0
 
     async def exists(self, session: AsyncSession, **filters) -> bool:
@@ -264,6 +287,14 @@ class BaseMapper(Generic[TableType]):
         result = await session.execute(statement)
         return list(result.scalars().all())
 
+    @staticmethod
+    def rows_to_vos(rows: Sequence[Any], vo_type: type[VOType]) -> list[VOType]:
+        """
+        查询结果行 -> VO 列表: 整个列表一次批量校验, 按属性读取列值, 不构造中间 dict
+        - 查询列应与 VO 字段同名, 通常由 select_fields 生成
+        """
+        return list_adapter(vo_type).validate_python(rows, from_attributes=True)
+
     @staticmethod
     def select_fields(sqlalchemy_model: type[Base], fields: type[BaseModel] | set[str]) -> list[Column]:
         """
@@ -4,7 +4,7 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.model.orm.models import Category, PostCategory
-from app.model.vo import CategoryCardVO
+from app.model.vo import CategoryCardVO, CategoryVO
 from .base import BaseMapper
 
 
@@ -12,11 +12,11 @@ class CategoryMapper(BaseMapper[Category]):
     def __init__(self):
         super().__init__(Category)
 
-    async def list_all(self, session: AsyncSession) -> List[Category]:
+    async def list_all(self, session: AsyncSession) -> List[CategoryVO]:
         result = await session.execute(
-                                select(*Category.__table__.columns)
+                                select(*self.select_fields(Category, CategoryVO))
                                 .order_by(Category.create_time.desc()))
-        return [dict(row) for row in result.mappings()]
+        return self.rows_to_vos(result.all(), CategoryVO)
 
     async def list_cards(self, session: AsyncSession) -> List[CategoryCardVO]:
         stmt = select(*self.select_fields(Category, CategoryCardVO), 
@@ -25,7 +25,7 @@ class CategoryMapper(BaseMapper[Category]):
                         .join(PostCategory, Category.id == PostCategory.category_id, isouter=True) \
                         .group_by(Category.id)
         result = await session.execute(stmt)
-        return [CategoryCardVO(**dict(row)) for row in result.mappings()]
+        return self.rows_to_vos(result.all(), CategoryCardVO)
 
 
 
@@ -1,28 +1,80 @@
+from datetime import datetime
 from typing import Iterable, List, Optional, Tuple
 
-from sqlalchemy import RowMapping, delete, insert, select, func, literal_column
+from sqlalchemy import CursorResult, Row, RowMapping, and_, case, delete, insert, or_, select, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.model.common import Base
 from app.model.vo.post import PostCardVO, PostInfoWithPath, PostTableVO, U_PostInfo
-from app.model.orm.models import Category, Post, PostCategory, PostTag, Tag
+from app.model.orm.models import Category, CounterBatch, Like, Post, PostCategory, PostTag, Tag
 from .base import BaseMapper
 
 
 class PostMapper(BaseMapper[Post]):
+    """
+    文章 Mapper
+
+    涉及分类/标签的查询采用两阶段策略:
+    1. 只在 posts 表上完成筛选、排序与分页, 得到本页文章
+    2. 对本页文章 id 分别执行一次分类、一次标签的 IN 查询, 在 Python 中拼装
+    避免 posts × post_categories × post_tags 的笛卡尔展开以及 GROUP BY + DISTINCT 聚合
+    """
+
+    # 计数列(view_count, like_count)的逻辑表名: 计数写回只递增它的版本号,
+    # 每个写回周期都会发生, 不应使依赖 posts 表的缓存(文章详情、统计信息等)失效
+    COUNTERS = "posts:counters"
+
     def __init__(self):
         super().__init__(Post)
-    
-    def __aggregate_expr(self, table: Base, column_name: str, order_by: str = "id"):
-        return literal_column(f"{table.__tablename__}.{column_name} ORDER BY {table.__tablename__}.{order_by}").distinct()
 
-    def __post_aggregate_exprs(self) -> Iterable[str]:
-        return [self.__aggregate_expr(table, column_name, order_by) for table, column_name, order_by in [
-            (PostCategory, "category_id", "category_id"),
-            (Category, "name", "id"),
-            (PostTag, "tag_id", "tag_id"),
-            (Tag, "name", "id")
-        ]]
+    @staticmethod
+    def __filter_stmt(stmt, category_id: Optional[int] = None, tag_id: Optional[int] = None):
+        if category_id is not None:
+            stmt = stmt.where(Post.id.in_(select(PostCategory.post_id).where(PostCategory.category_id == category_id)))
+        if tag_id is not None:
+            stmt = stmt.where(Post.id.in_(select(PostTag.post_id).where(PostTag.tag_id == tag_id)))
+        return stmt
+
+    def __card_stmt(self, category_id: Optional[int] = None, tag_id: Optional[int] = None):
+        """文章卡片查询语句(仅 posts 表), 按 (create_time, id) 倒序排列"""
+        stmt = (select(*self.select_fields(Post, PostCardVO))
+                .order_by(Post.create_time.desc(), Post.id.desc()))
+        return self.__filter_stmt(stmt, category_id, tag_id)
+
+    async def _attach_relations(self, session: AsyncSession, rows: List[dict]) -> List[dict]:
+        """
+        为文章行补充分类/标签信息(tag_names, category_names, tag_ids, category_ids)
+
+        与原 aggregate_strings 结果格式保持一致: 按 id 升序、逗号分隔, 无关联时为 None
+        """
+        if not rows:
+            return rows
+        post_ids = [r["id"] for r in rows]
+        relations: dict[int, dict[str, list[str]]] = {
+            pid: {"tag_ids": [], "tag_names": [], "category_ids": [], "category_names": []} for pid in post_ids
+        }
+        category_stmt = (select(PostCategory.post_id, Category.id, Category.name)
+                         .join(Category, Category.id == PostCategory.category_id)
+                         .where(PostCategory.post_id.in_(post_ids))
+                         .order_by(PostCategory.post_id, Category.id))
+        for post_id, category_id, name in (await session.execute(category_stmt)).all():
+            relations[post_id]["category_ids"].append(str(category_id))
+            relations[post_id]["category_names"].append(name)
+        tag_stmt = (select(PostTag.post_id, Tag.id, Tag.name)
+                    .join(Tag, Tag.id == PostTag.tag_id)
+                    .where(PostTag.post_id.in_(post_ids))
+                    .order_by(PostTag.post_id, Tag.id))
+        for post_id, tag_id, name in (await session.execute(tag_stmt)).all():
+            relations[post_id]["tag_ids"].append(str(tag_id))
+            relations[post_id]["tag_names"].append(name)
+        for row in rows:
+            for key, values in relations[row["id"]].items():
+                row[key] = ",".join(values) if values else None
+        return rows
+
+    async def _count_posts(self, session: AsyncSession, category_id: Optional[int] = None,
+                           tag_id: Optional[int] = None) -> int:
+        stmt = self.__filter_stmt(select(func.count()).select_from(Post), category_id, tag_id)
+        return int((await session.execute(stmt)).scalar() or 0)
 
     async def paginate_cards(
         self,
@@ -32,31 +84,74 @@ class PostMapper(BaseMapper[Post]):
         category_id: Optional[int] = None,
         tag_id: Optional[int] = None,
     ) -> Tuple[List[dict], int]:
-        c_id_expr, c_name_expr, t_id_expr, t_name_expr = self.__post_aggregate_exprs()
-        stmt = (select(*self.select_fields(Post, PostCardVO),
-                        func.aggregate_strings(t_name_expr, ",").label("tag_names"),
-                        func.aggregate_strings(c_name_expr, ",").label("category_names"),
-                        func.aggregate_strings(t_id_expr, ",").label("tag_ids"),
-                        func.aggregate_strings(c_id_expr, ",").label("category_ids")
-                ).select_from(Post)
-                .join(PostCategory, PostCategory.post_id == Post.id, isouter=True)
-                .join(Category, Category.id == PostCategory.category_id, isouter=True)
-                .join(PostTag, PostTag.post_id == Post.id, isouter=True)
-                .join(Tag, Tag.id == PostTag.tag_id, isouter=True)
-                .group_by(Post.id)
-                .order_by(Post.create_time.desc())
-                .offset((current - 1) * size)
-                .limit(size)
-            )
-        if category_id is not None:
-            stmt = stmt.where(Category.id == category_id)
-            total_stmt = select(func.count(PostCategory.post_id)).select_from(PostCategory).where(PostCategory.category_id == category_id)
-        else:
-            total_stmt = select(func.count()).select_from(Post)
-        total = int((await session.execute(total_stmt)).scalar() or 0)
-        rows = (await session.execute(stmt)).mappings().all()
-        return [dict(r) for r in rows], total
+        stmt = self.__card_stmt(category_id, tag_id).offset((current - 1) * size).limit(size)
+        total = await self._count_posts(session, category_id, tag_id)
+        rows = [dict(r) for r in (await session.execute(stmt)).mappings().all()]
+        return await self._attach_relations(session, rows), total
+
+    async def paginate_cards_after(
+        self,
+        session: AsyncSession,
+        size: int,
+        after: Optional[Tuple[datetime, int]] = None,
+        category_id: Optional[int] = None,
+        tag_id: Optional[int] = None,
+    ) -> Tuple[List[dict], Optional[Tuple[datetime, int]]]:
+        """
+        游标(keyset)分页查询文章卡片, 每页开销与页码深度无关
+
+        :param after: 上一页最后一条记录的排序键 (create_time, id), 为 None 时从第一页开始
+        :return: (数据列表, 下一页起点排序键), 没有下一页时排序键为 None
+        """
+        stmt = self.__card_stmt(category_id, tag_id)
+        if after is not None:
+            create_time, post_id = after
+            stmt = stmt.where(or_(Post.create_time < create_time,
+                                  and_(Post.create_time == create_time, Post.id < post_id)))
+        # 多取一条用于判断是否存在下一页
+        rows = (await session.execute(stmt.limit(size + 1))).mappings().all()
+        items = await self._attach_relations(session, [dict(r) for r in rows[:size]])
+        if len(rows) <= size:
+            return items, None
+        return items, (items[-1]["create_time"], items[-1]["id"])
     
+    async def list_cards_by_ids(self, session: AsyncSession, post_ids: List[int]) -> List[dict]:
+        """按给定 id 顺序返回文章卡片, 不存在的 id 忽略"""
+        if not post_ids:
+            return []
+        stmt = select(*self.select_fields(Post, PostCardVO)).where(Post.id.in_(post_ids))
+        rows = {r["id"]: dict(r) for r in (await session.execute(stmt)).mappings().all()}
+        return await self._attach_relations(session, [rows[i] for i in post_ids if i in rows])
+
+    async def list_search_sources(self, session: AsyncSession, post_ids: Optional[List[int]] = None) -> List[Row]:
+        """全文检索的数据来源: (id, title, summary, content_file_path), 可限定文章 id"""
+        stmt = select(Post.id, Post.title, Post.summary, Post.content_file_path).order_by(Post.id)
+        if post_ids is not None:
+            stmt = stmt.where(Post.id.in_(post_ids))
+        return list((await session.execute(stmt)).all())
+
+    async def list_feature_pairs(self, session: AsyncSession) -> Tuple[List[Row], List[Row]]:
+        """全部 (post_id, tag_id) 与 (post_id, category_id) 关联, 用于计算相关文章"""
+        tags = (await session.execute(select(PostTag.post_id, PostTag.tag_id))).all()
+        categories = (await session.execute(select(PostCategory.post_id, PostCategory.category_id))).all()
+        return list(tags), list(categories)
+
+    async def list_titles(self, session: AsyncSession) -> List[Row]:
+        """(id, title), 用于加载标题三元组索引"""
+        stmt = select(Post.id, Post.title)
+        return list((await session.execute(stmt)).all())
+
+    async def list_update_times(self, session: AsyncSession) -> List[Row]:
+        """(id, update_time), 用于核对搜索索引与数据库的差异"""
+        stmt = select(Post.id, Post.update_time)
+        return list((await session.execute(stmt)).all())
+
+    async def get_counters(self, session: AsyncSession, post_id: int) -> Optional[Tuple[int, int]]:
+        """(view_count, like_count), 文章不存在时返回 None"""
+        stmt = select(Post.view_count, Post.like_count).where(Post.id == post_id)
+        row = (await session.execute(stmt)).one_or_none()
+        return tuple(row) if row else None
+
     async def get_content_path(self, session: AsyncSession, post_id: int) -> Optional[str]:
         stmt = select(Post.content_file_path).where(Post.id == post_id)
         row: RowMapping = (await session.execute(stmt)).mappings().one_or_none()
@@ -64,79 +159,46 @@ class PostMapper(BaseMapper[Post]):
             return None
         return row["content_file_path"]
 
+    async def __get_one_with_relations(self, session: AsyncSession, post_id: int, fields) -> dict | None:
+        stmt = select(*self.select_fields(Post, fields)).where(Post.id == post_id)
+        row: RowMapping = (await session.execute(stmt)).mappings().one_or_none()
+        if not row:
+            return None
+        return (await self._attach_relations(session, [dict(row)]))[0]
+
     async def get_post_info_with_path(self, session: AsyncSession, post_id: int) -> PostInfoWithPath | None:
-        c_id_expr, c_name_expr, t_id_expr, t_name_expr = self.__post_aggregate_exprs()
-        stmt = (select(*self.select_fields(Post, PostInfoWithPath),
-                func.aggregate_strings(t_name_expr, ",").label("tag_names"),
-                func.aggregate_strings(c_name_expr, ",").label("category_names"),
-                func.aggregate_strings(t_id_expr, ",").label("tag_ids"),
-                func.aggregate_strings(c_id_expr, ",").label("category_ids"),
-            )
-            .select_from(Post)
-            .join(PostCategory, PostCategory.post_id == Post.id, isouter=True)
-            .join(Category, Category.id == PostCategory.category_id, isouter=True)
-            .join(PostTag, PostTag.post_id == Post.id, isouter=True)
-            .join(Tag, Tag.id == PostTag.tag_id, isouter=True)
-            .where(Post.id == post_id)
-            .group_by(Post.id)
-            .order_by(Post.create_time.desc())
-        )
-        row: RowMapping = (await session.execute(stmt)).mappings().one()
+        row = await self.__get_one_with_relations(session, post_id, PostInfoWithPath)
         if not row:
             return None
-        return PostInfoWithPath(**dict(row))
+        return PostInfoWithPath(**row)
     
     async def get_u_post_info(self, session: AsyncSession, post_id: int) -> U_PostInfo | None:
         """获取用户端文章详情页的文章基本信息
         """
-        c_id_expr, c_name_expr, t_id_expr, t_name_expr = self.__post_aggregate_exprs()
-        stmt = (select(*self.select_fields(Post, U_PostInfo),
-                func.aggregate_strings(t_name_expr, ",").label("tag_names"),
-                func.aggregate_strings(c_name_expr, ",").label("category_names"),
-                func.aggregate_strings(t_id_expr, ",").label("tag_ids"),
-                func.aggregate_strings(c_id_expr, ",").label("category_ids"),
-        )
-        .select_from(Post)
-        .join(PostCategory, PostCategory.post_id == Post.id, isouter=True)
-        .join(Category, Category.id == PostCategory.category_id, isouter=True)
-        .join(PostTag, PostTag.post_id == Post.id, isouter=True)
-        .join(Tag, Tag.id == PostTag.tag_id, isouter=True)
-        .where(Post.id == post_id)
-        .group_by(Post.id)
-        .order_by(Post.create_time.desc())
-        )
-        row: RowMapping = (await session.execute(stmt)).mappings().one_or_none()
+        row = await self.__get_one_with_relations(session, post_id, U_PostInfo)
         if not row:
             return None
-        return U_PostInfo(**dict(row))
+        return U_PostInfo(**row)
 
-    async def paginated_table_post_vo(self, session: AsyncSession, current: int, size: int) -> list[PostTableVO] | None:
+    async def paginated_table_post_vo(self, session: AsyncSession, current: int, size: int) -> Tuple[list[PostTableVO], int]:
         """获取文章表格展示信息VO, 包含分类、标签等关联信息, 不包含文章内容, """
-        # 获取 Post 表的所有列
-        colmuns = self.select_fields(Post, PostTableVO)
-        c_id_expr, c_name_expr, t_id_expr, t_name_expr = self.__post_aggregate_exprs()
-        stmt = (select(*colmuns,
-                func.aggregate_strings(t_name_expr, ",").label("tag_names"),
-                func.aggregate_strings(c_name_expr, ",").label("category_names"),
-                func.aggregate_strings(t_id_expr, ",").label("tag_ids"),
-                func.aggregate_strings(c_id_expr, ",").label("category_ids"),
-        )
-        .select_from(Post)
-        .join(PostCategory, PostCategory.post_id == Post.id, isouter=True)
-        .join(Category, Category.id == PostCategory.category_id, isouter=True)
-        .join(PostTag, PostTag.post_id == Post.id, isouter=True)
-        .join(Tag, Tag.id == PostTag.tag_id, isouter=True)
-        .group_by(Post.id)
-        .order_by(Post.create_time.desc())
-        .offset((current - 1) * size)
-        .limit(size)
-        )
-        total = int((await session.execute(select(func.count()).select_from(Post))).scalar() or 0)
-        # print("生成的sql: \n", stmt)
-        rows: list[RowMapping] = (await session.execute(stmt)).mappings().all()
-        if not rows:
-            return None
-        return [PostTableVO(**dict(r)) for r in rows], total
+        stmt = (select(*self.select_fields(Post, PostTableVO))
+                .order_by(Post.create_time.desc(), Post.id.desc())
+                .offset((current - 1) * size)
+                .limit(size))
+        total = await self._count_posts(session)
+        rows = [dict(r) for r in (await session.execute(stmt)).mappings().all()]
+        rows = await self._attach_relations(session, rows)
+        return [PostTableVO(**r) for r in rows], total
+
+    async def list_table_post_vo_by_ids(self, session: AsyncSession, post_ids: List[int]) -> list[PostTableVO]:
+        """按给定 id 顺序返回文章表格展示信息, 不存在的 id 忽略"""
+        if not post_ids:
+            return []
+        stmt = select(*self.select_fields(Post, PostTableVO)).where(Post.id.in_(post_ids))
+        rows = {r["id"]: dict(r) for r in (await session.execute(stmt)).mappings().all()}
+        rows = await self._attach_relations(session, [rows[i] for i in post_ids if i in rows])
+        return [PostTableVO(**r) for r in rows]
 
     async def get_categories(self, session: AsyncSession, post_id: int) -> List[Category]:
         stmt = select(Category).where(Category.id.in_(select(PostCategory.category_id).where(PostCategory.post_id == post_id)))
@@ -152,33 +214,125 @@ class PostMapper(BaseMapper[Post]):
         """为文章新增分类关联：幂等插入，不负责删除。"""
         if category_ids:
             await session.execute(insert(PostCategory).values([{"post_id": post_id, "category_id": cid} for cid in category_ids]))
-            await session.commit()
+            await self._commit(session, PostCategory.__tablename__)
 
     async def remove_categories(self, session: AsyncSession, post_id: int) -> None:
         """删除文章的所有分类关联。"""
         await session.execute(delete(PostCategory).where(PostCategory.post_id == post_id))
-        await session.commit()
+        await self._commit(session, PostCategory.__tablename__)
 
     async def add_tags(self, session: AsyncSession, post_id: int, tag_ids: Iterable[int]) -> None:
         """为文章新增标签关联：幂等插入，不负责删除。"""
         if tag_ids:
             await session.execute(insert(PostTag).values([{"post_id": post_id, "tag_id": tid} for tid in tag_ids]))
-            await session.commit()
+            await self._commit(session, PostTag.__tablename__)
 
     async def remove_tags(self, session: AsyncSession, post_id: int) -> None:
         """删除文章的所有标签关联。"""
         await session.execute(delete(PostTag).where(PostTag.post_id == post_id))
-        await session.commit()
+        await self._commit(session, PostTag.__tablename__)
+
+    async def __sync_relation(self, session: AsyncSession, model: type[PostCategory] | type[PostTag],
+                              column, post_id: int, desired_ids: Iterable[int]) -> Tuple[set[int], set[int]]:
+        desired = set(desired_ids)
+        current = set((await session.execute(select(column).where(model.post_id == post_id))).scalars())
+        added, removed = desired - current, current - desired
+        if removed:
+            await session.execute(delete(model).where(model.post_id == post_id, column.in_(removed)))
+        if added:
+            await session.execute(insert(model).values([{"post_id": post_id, column.key: rid} for rid in sorted(added)]))
+        if added or removed:
+            await self._commit(session, model.__tablename__)
+        return added, removed
+
+    async def sync_categories(self, session: AsyncSession, post_id: int,
+                              category_ids: Iterable[int]) -> Tuple[set[int], set[int]]:
+        """
+        将文章的分类关联同步为 category_ids: 只插入新增的、删除移除的, 无变化时不执行写操作
+
+        :return: (新增的分类id集合, 移除的分类id集合)
+        """
+        return await self.__sync_relation(session, PostCategory, PostCategory.category_id, post_id, category_ids)
+
+    async def sync_tags(self, session: AsyncSession, post_id: int,
+                        tag_ids: Iterable[int]) -> Tuple[set[int], set[int]]:
+        """
+        将文章的标签关联同步为 tag_ids: 只插入新增的、删除移除的, 无变化时不执行写操作
+
+        :return: (新增的标签id集合, 移除的标签id集合)
+        """
+        return await self.__sync_relation(session, PostTag, PostTag.tag_id, post_id, tag_ids)
+
+    async def add_counter_deltas(self, session: AsyncSession, column_name: str, deltas: dict[int, int],
+                                 batch_id: str, purge_before: Optional[datetime] = None) -> int:
+        """
+        批量累加计数列(如 view_count), 一条 UPDATE ... CASE 完成所有文章的写回
+        - 显式保留 update_time, 计数变化不应视为文章内容更新
+        - 只递增 COUNTERS 的版本号, 不使依赖 posts 表的缓存失效
+        - 批次号与计数更新在同一事务中写入 counter_batches, 同一批次重复写回时(如上次提交成功但
+          未能删除 Redis 快照)批次号已存在, 不再累加
+
+        :param column_name: Post 计数列名
+        :param deltas: post_id -> 增量
+        :param batch_id: 本批增量的唯一标识
+        :param purge_before: 顺带清理早于该时间的批次号
+        :return: 受影响的行数, 批次已写回过时为 0
+        """
+        if not deltas:
+            return 0
+        claimed: CursorResult = await session.execute(
+            insert(CounterBatch).values(id=batch_id)
+            .prefix_with("IGNORE", dialect="mysql").prefix_with("OR IGNORE", dialect="sqlite"))
+        if not claimed.rowcount:
+            await session.rollback()
+            return 0
+        if purge_before is not None:
+            await session.execute(delete(CounterBatch).where(CounterBatch.create_time < purge_before))
+        column = getattr(Post, column_name)
+        stmt = (update(Post)
+                .where(Post.id.in_(list(deltas)))
+                .values({column: column + case(deltas, value=Post.id, else_=0),
+                         Post.update_time: Post.update_time}))
+        result: CursorResult = await session.execute(stmt)
+        await self._commit(session, self.COUNTERS)
+        return result.rowcount
+
+    async def append_likes(self, session: AsyncSession, likes: List[dict]) -> int:
+        """
+        批量写入点赞流水, 并按流水重新统计相关文章的 like_count
+        - 忽略不存在的文章与重复点赞(唯一索引 post_id + voter)
+        - like_count 以流水为准重新统计, 因此重复写回不会导致计数偏大
+        - 只递增 likes 与 COUNTERS 的版本号, 不使依赖 posts 表的缓存失效
+
+        :param likes: 点赞流水字典列表(post_id, voter, user_id, create_time)
+        :return: 更新了点赞数的文章数
+        """
+        post_ids = {like["post_id"] for like in likes}
+        if not post_ids:
+            return 0
+        existing = set((await session.execute(select(Post.id).where(Post.id.in_(post_ids)))).scalars())
+        rows = [like for like in likes if like["post_id"] in existing]
+        if not rows:
+            return 0
+        await session.execute(insert(Like).prefix_with("IGNORE", dialect="mysql")
+                              .prefix_with("OR IGNORE", dialect="sqlite"), rows)
+        like_count = select(func.count()).select_from(Like).where(Like.post_id == Post.id).scalar_subquery()
+        await session.execute(update(Post).where(Post.id.in_(existing))
+                              .values({Post.like_count: like_count, Post.update_time: Post.update_time}))
+        await self._commit(session, Like.__tablename__, self.COUNTERS)
+        return len(existing)
 
     async def remove_categories_batch(self, session: AsyncSession, post_ids: Iterable[int]) -> None:
         """批量删除文章的所有分类关联。"""
+        post_ids = list(post_ids)
         await session.execute(delete(PostCategory).where(PostCategory.post_id.in_(post_ids)))
-        await session.commit()
+        await self._commit(session, PostCategory.__tablename__)
     
     async def remove_tags_batch(self, session: AsyncSession, post_ids: Iterable[int]) -> None:
         """批量删除文章的所有标签关联。"""
+        post_ids = list(post_ids)
         await session.execute(delete(PostTag).where(PostTag.post_id.in_(post_ids)))
-        await session.commit()
+        await self._commit(session, PostTag.__tablename__)
 
 
 _post_mapper = PostMapper()
@@ -4,6 +4,7 @@ from sqlalchemy import select, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.model.orm.models import Tag
+from app.model.vo import TagVO
 from .base import BaseMapper
 
 
@@ -11,9 +12,9 @@ class TagMapper(BaseMapper[Tag]):
     def __init__(self):
         super().__init__(Tag)
 
-    async def list_all(self, session: AsyncSession) -> List[Tag]:
-        result = await session.execute(select(Tag).order_by(Tag.create_time.desc()))
-        return list(result.scalars().all())
+    async def list_all(self, session: AsyncSession) -> List[TagVO]:
+        result = await session.execute(select(*self.select_fields(Tag, TagVO)).order_by(Tag.create_time.desc()))
+        return self.rows_to_vos(result.all(), TagVO)
 
 
 _tag_mapper = TagMapper()
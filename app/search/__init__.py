@@ -0,0 +1,6 @@
+from app.search.delta import DeltaSegment
+from app.search.engine import SearchEngine, search_engine
+from app.search.index import SearchDocument, SearchIndex, build_index
+from app.search.snippet import compact_text, make_snippet
+from app.search.trigram import TitleIndex, title_index
+from app.search.tokenizer import strip_markdown, tokenize
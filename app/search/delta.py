@@ -0,0 +1,94 @@
+"""
+内存增量段: 保存基础索引构建之后新增或修改的文章, 查询时与 mmap 加载的基础索引合并排序
+
+增量段规模受合并策略限制(通常几十到几百篇), 不做影响值预计算与截断, 查询时按基础索引的
+统计量(文档数、平均文档长度、文档频率)现算 BM25 得分, 与基础索引的得分可以直接比较
+"""
+import heapq
+from collections import Counter
+from operator import itemgetter
+from typing import Iterable
+
+from app.search.index import MAX_PREFIX_EXPANSIONS, SearchIndex, bm25_idf
+from app.search.tokenizer import is_cjk_char
+
+
+class DeltaSegment:
+    """
+    - 倒排为 词项 -> {文章 id: 词频}, 另按首字记录中日韩二元组, 供单字查询扩展
+    - 每篇文章记录写入序号, 基础索引重建后丢弃序号不晚于重建快照的文章
+    """
+
+    def __init__(self):
+        # 文章 id -> (写入序号, 文档长度, 词频, 摘要片段原文)
+        self._docs: dict[int, tuple[int, int, Counter, str]] = {}
+        self._postings: dict[str, dict[int, int]] = {}
+        self._prefixes: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, post_id: int) -> bool:
+        return post_id in self._docs
+
+    def __iter__(self):
+        return iter(self._docs)
+
+    def add(self, post_id: int, tf: Counter, text: str, seq: int) -> None:
+        """写入(或替换)一篇文章"""
+        self.remove(post_id)
+        self._docs[post_id] = (seq, sum(tf.values()), tf, text)
+        for term, count in tf.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                if len(term) == 2 and is_cjk_char(term[0]):
+                    self._prefixes.setdefault(term[0], set()).add(term)
+            postings[post_id] = count
+
+    def remove(self, post_id: int) -> None:
+        entry = self._docs.pop(post_id, None)
+        if entry is None:
+            return
+        for term in entry[2]:
+            postings = self._postings[term]
+            del postings[post_id]
+            if postings:
+                continue
+            del self._postings[term]
+            bigrams = self._prefixes.get(term[0])
+            if bigrams is not None:
+                bigrams.discard(term)
+                if not bigrams:
+                    del self._prefixes[term[0]]
+
+    def text(self, post_id: int) -> str:
+        return self._docs[post_id][3]
+
+    def discard_until(self, seq: int) -> None:
+        """丢弃写入序号不晚于 seq 的文章(已包含在新的基础索引中)"""
+        for post_id in [post_id for post_id, entry in self._docs.items() if entry[0] <= seq]:
+            self.remove(post_id)
+
+    def _lookup(self, term: str) -> list[str]:
+        if not is_cjk_char(term):
+            return [term] if term in self._postings else []
+        # 单字扩展: 取增量段内文档频率最高的若干个二元组(不逐个查询基础索引, 避免大量二分查找)
+        bigrams = self._prefixes.get(term, ())
+        return heapq.nlargest(MAX_PREFIX_EXPANSIONS, bigrams, key=lambda t: len(self._postings[t]))
+
+    def search(self, terms: Iterable[str], limit: int, base: SearchIndex) -> tuple[int, list[tuple[int, float]]]:
+        """
+        :return: (命中文章数, [(文章 id, 得分)] 按得分倒序, 最多 limit 条)
+        """
+        n_docs = base.n_docs + len(self._docs)
+        k1, b, avg_len = base.k1, base.b, base.avg_len or 1.0
+        scores: dict[int, float] = {}
+        matched = {t for term in dict.fromkeys(terms) for t in self._lookup(term)}
+        for term in matched:
+            postings = self._postings[term]
+            weight = bm25_idf(n_docs, base.df(term) + len(postings)) * (k1 + 1)
+            for post_id, tf in postings.items():
+                norm = k1 * (1 - b + b * self._docs[post_id][1] / avg_len)
+                scores[post_id] = scores.get(post_id, 0.0) + weight * tf / (tf + norm)
+        return len(scores), heapq.nlargest(limit, scores.items(), key=itemgetter(1))
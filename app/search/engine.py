@@ -0,0 +1,201 @@
+import heapq
+import time
+from operator import itemgetter
+from pathlib import Path
+from typing import Iterable
+
+from app.core import path_conf, settings
+from app.search.delta import DeltaSegment
+from app.search.index import SearchDocument, SearchIndex, build_index, term_frequencies
+from app.search.snippet import make_snippet
+from app.search.tokenizer import tokenize
+from app.utils.logger import get_logger
+from app.utils.metrics import register_metrics
+
+logger = get_logger(__name__)
+
+
+def default_index_path() -> Path:
+    return Path(settings.search.INDEX_PATH) if settings.search.INDEX_PATH else path_conf.SEARCH_DIR / "posts.idx"
+
+
+class SearchEngine:
+    """
+    进程内全文检索: 查询为纯 CPU 计算, 直接在事件循环中执行
+    - 基础索引: mmap 加载的只读索引文件, 由全量构建(合并)产生
+    - 增量: 之后写入的文章进入内存增量段, 删除或被替换的文章在基础索引中记为墓碑, 查询时排除
+    - 每次增量变更分配递增的写入序号; 重建开始时记下序号, 完成后只保留之后的增量与墓碑
+    - 除 build 外的方法都应在事件循环中调用
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._index: SearchIndex | None = None
+        self._delta = DeltaSegment()
+        # 文章 id -> 写入序号; 以及对应的基础索引文档下标
+        self._tombstones: dict[int, int] = {}
+        self._excluded: set[int] = set()
+        self._seq = 0
+        self._stats = {"queries": 0, "total_ms": 0.0, "max_ms": 0.0, "builds": 0, "delta_writes": 0}
+
+    @property
+    def ready(self) -> bool:
+        return self._index is not None
+
+    @property
+    def seq(self) -> int:
+        """最近一次增量变更的写入序号"""
+        return self._seq
+
+    @property
+    def unmerged(self) -> int:
+        """尚未合并进基础索引的变更数(增量段文章 + 墓碑)"""
+        return len(self._delta) + len(self._tombstones)
+
+    @property
+    def built_at(self) -> float | None:
+        """基础索引的构建时间(unix 时间戳)"""
+        return self._index.built_at if self._index else None
+
+    def known_ids(self) -> set[int]:
+        """当前可被检索到的文章 id"""
+        ids = set(self._delta)
+        if self._index is not None:
+            ids.update(post_id for post_id in self._index.post_ids if post_id not in self._tombstones)
+        return ids
+
+    def load(self) -> bool:
+        """加载索引文件, 文件不存在或格式不符时返回 False"""
+        try:
+            index = SearchIndex(self.path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"加载搜索索引 {self.path} 失败: {e}")
+            return False
+        self._swap(index)
+        logger.info(f"已加载搜索索引: {index.n_docs} 篇文章, {index.n_terms} 个词项, {index.size_bytes} 字节")
+        return True
+
+    def load_newer(self) -> SearchIndex | None:
+        """索引文件已被替换(通常由其他 worker 合并写入)且比当前基础索引新时, 返回加载的新索引, 否则返回 None"""
+        try:
+            index = SearchIndex(self.path)
+        except (OSError, ValueError):
+            return None
+        if self._index is not None and index.built_at <= self._index.built_at:
+            index.close()
+            return None
+        return index
+
+    def build(self, documents: Iterable[SearchDocument]) -> SearchIndex:
+        """全量构建索引文件并加载(CPU 与磁盘密集, 应在线程中执行), 不修改当前状态"""
+        cfg = settings.search
+        begin = time.perf_counter()
+        n_docs = build_index(documents, self.path, k1=cfg.BM25_K1, b=cfg.BM25_B,
+                             title_weight=cfg.TITLE_WEIGHT, summary_weight=cfg.SUMMARY_WEIGHT)
+        logger.info(f"搜索索引构建完成: {n_docs} 篇文章, 耗时 {time.perf_counter() - begin:.2f}s")
+        return SearchIndex(self.path)
+
+    def install(self, index: SearchIndex, since: int) -> None:
+        """
+        切换到新构建的基础索引
+
+        :param since: 开始读取构建数据前的写入序号, 之后的增量与墓碑继续保留
+        """
+        self._delta.discard_until(since)
+        self._tombstones = {post_id: seq for post_id, seq in self._tombstones.items() if seq > since}
+        self._stats["builds"] += 1
+        self._swap(index)
+
+    def rebuild(self, documents: Iterable[SearchDocument]) -> int:
+        """同步构建并切换, 用于脚本与测试; 服务中由 SearchIndexer 在线程中构建"""
+        since = self._seq
+        index = self.build(documents)
+        self.install(index, since)
+        return index.n_docs
+
+    def upsert(self, doc: SearchDocument) -> None:
+        """新增或替换一篇文章, 立即可被检索"""
+        cfg = settings.search
+        self._seq += 1
+        tf = term_frequencies(doc, cfg.TITLE_WEIGHT, cfg.SUMMARY_WEIGHT)
+        self._delta.add(doc.post_id, tf, doc.snippet_source(), self._seq)
+        self._tombstone(doc.post_id)
+
+    def remove(self, post_id: int) -> None:
+        self._seq += 1
+        self._delta.remove(post_id)
+        self._tombstone(post_id)
+
+    def _tombstone(self, post_id: int) -> None:
+        self._stats["delta_writes"] += 1
+        self._tombstones[post_id] = self._seq
+        doc = self._index.doc_index(post_id) if self._index is not None else None
+        if doc is not None:
+            self._excluded.add(doc)
+
+    def _swap(self, index: SearchIndex) -> None:
+        old, self._index = self._index, index
+        self._excluded = {doc for post_id in self._tombstones if (doc := index.doc_index(post_id)) is not None}
+        if old is not None:
+            old.close()
+
+    def search(self, query: str, limit: int) -> tuple[int, list[tuple[int, float]]]:
+        """
+        :return: (命中文章数, [(文章 id, 得分)] 按得分倒序); 索引未就绪时返回空结果
+            命中文章数只统计 MAX_POSTINGS_PER_QUERY 预算内累加到的文章, 倒排被截断时小于实际命中数
+        """
+        index = self._index
+        if index is None:
+            return 0, []
+        begin = time.perf_counter()
+        terms = tokenize(query)[:settings.search.MAX_QUERY_TERMS]
+        limit = min(limit, settings.search.MAX_RESULTS)
+        total, hits = index.search(terms, limit, settings.search.MAX_POSTINGS_PER_QUERY, self._excluded)
+        if self._delta:
+            # 增量段中的文章在基础索引中均已记为墓碑, 两部分结果不重叠
+            delta_total, delta_hits = self._delta.search(terms, limit, index)
+            total += delta_total
+            hits = heapq.nlargest(limit, hits + delta_hits, key=itemgetter(1))
+        elapsed_ms = (time.perf_counter() - begin) * 1000
+        self._stats["queries"] += 1
+        self._stats["total_ms"] += elapsed_ms
+        self._stats["max_ms"] = max(self._stats["max_ms"], elapsed_ms)
+        return total, hits
+
+    def snippets(self, query: str, post_ids: Iterable[int]) -> dict[int, str]:
+        """
+        为一页结果生成摘要片段, 原文取自索引(基础索引的 mmap 或增量段), 不读取正文文件
+
+        :return: 文章 id -> html 片段, 命中词以 <mark> 包裹; 已不在索引中的文章不返回
+        """
+        index = self._index
+        if index is None:
+            return {}
+        terms = tokenize(query)[:settings.search.MAX_QUERY_TERMS]
+        width = settings.search.SNIPPET_CHARS
+        result = {}
+        for post_id in post_ids:
+            if post_id in self._delta:
+                text = self._delta.text(post_id)
+            elif post_id not in self._tombstones and (doc := index.doc_index(post_id)) is not None:
+                text = index.text(doc)
+            else:
+                continue
+            result[post_id] = make_snippet(text, terms, width)
+        return result
+
+    def stats(self) -> dict:
+        index = self._index
+        return {
+            **self._stats,
+            "ready": index is not None,
+            "docs": index.n_docs if index else 0,
+            "terms": index.n_terms if index else 0,
+            "index_bytes": index.size_bytes if index else 0,
+            "delta_docs": len(self._delta),
+            "tombstones": len(self._tombstones),
+        }
+
+
+search_engine = SearchEngine(default_index_path())
+register_metrics("search", search_engine.stats)
@@ -0,0 +1,278 @@
+"""
+倒排索引的构建与只读加载
+
+文件格式(小端序, 各段按 8 字节对齐), 加载时整体 mmap, 各段以 memoryview 直接访问, 不做反序列化:
+    header          魔数、文档数、词项数、倒排条目数、文档下标宽度、影响值量化比例、
+                    平均文档长度、BM25 参数 k1/b、构建时间、各段偏移
+    post_ids        uint32[n_docs]          文档下标 -> 文章 id
+    term_offsets    uint32[n_terms + 1]     词项在 term_blob 中的起止位置
+    term_blob       按 utf-8 字节序排列的词项
+    posting_offsets uint32[n_terms + 1]     词项的倒排条目在 postings 中的起止位置
+    posting_docs    uint16/uint32[n_postings]  文档下标, 文档数不超过 65535 时使用 uint16
+    posting_impacts uint8[n_postings]       量化后的 BM25 得分贡献
+    text_offsets    uint64[n_docs + 1]      文档在 text_blob 中的起止位置
+    text_blob       各文档的纯文本(utf-8, 已归一化并合并空白), 用于生成结果摘要片段, 查询不需要读取正文文件
+
+每个倒排条目直接存储该词项对该文档的 BM25 得分贡献(影响值, idf 与长度归一化已计入),
+同一词项的条目按影响值倒序排列: 查询只需累加, 条目数超出查询预算时只舍弃贡献最小的部分
+"""
+import heapq
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from operator import itemgetter
+from pathlib import Path
+from typing import AbstractSet, Iterable
+
+from app.search.snippet import compact_text
+from app.search.tokenizer import is_cjk_char, tokenize
+
+MAGIC = b"CBSRCH03"
+# 魔数, 文档数, 词项数, 倒排条目数, 文档下标宽度(字节), 影响值量化比例, 平均文档长度, k1, b, 构建时间, 8 个段偏移
+_HEADER = struct.Struct("<8sIIIIddddd8Q")
+_ALIGN = 8
+# 单字查询扩展为以该字开头的二元组时, 最多使用的二元组数(按文档频率取最高的若干个)
+MAX_PREFIX_EXPANSIONS = 8
+
+
+@dataclass(slots=True)
+class SearchDocument:
+    post_id: int
+    title: str
+    summary: str
+    body: str
+
+    def snippet_source(self) -> str:
+        """摘要片段的原文: 正文为空(读取失败)时退回摘要"""
+        return compact_text(self.body or self.summary)
+
+
+def term_frequencies(doc: SearchDocument, title_weight: int, summary_weight: int) -> Counter:
+    tf = Counter(tokenize(doc.body))
+    for weight, text in ((title_weight, doc.title), (summary_weight, doc.summary)):
+        for term, count in Counter(tokenize(text)).items():
+            tf[term] += count * weight
+    return tf
+
+
+def bm25_idf(n_docs: int, df: int) -> float:
+    return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+
+def build_index(documents: Iterable[SearchDocument], path: Path, *, k1: float, b: float,
+                title_weight: int, summary_weight: int) -> int:
+    """
+    全量构建索引并原子替换 path 处的文件(先写临时文件再 rename)
+
+    :return: 文档数
+    """
+    built_at = time.time()
+    post_ids = array("I")
+    doc_lens: list[int] = []
+    text_offsets, text_blob = array("Q", [0]), bytearray()
+    # 词项 -> 交错存放的 (文档下标, 词频)
+    postings: dict[str, array] = {}
+    for doc in documents:
+        doc_index = len(post_ids)
+        post_ids.append(doc.post_id)
+        tf = term_frequencies(doc, title_weight, summary_weight)
+        doc_lens.append(sum(tf.values()))
+        text_blob += doc.snippet_source().encode()
+        text_offsets.append(len(text_blob))
+        for term, count in tf.items():
+            entries = postings.get(term)
+            if entries is None:
+                entries = postings[term] = array("I")
+            entries.append(doc_index)
+            entries.append(count)
+
+    n_docs = len(post_ids)
+    avg_len = (sum(doc_lens) / n_docs) if n_docs else 0.0
+    norms = [k1 * (1 - b + b * length / avg_len) if avg_len else k1 for length in doc_lens]
+    # 影响值上界: df = 1 时的 idf 乘以词频饱和上限 (k1 + 1), 线性量化到 1..255
+    max_impact = bm25_idf(n_docs, 1) * (k1 + 1) if n_docs else 1.0
+    scale = max_impact / 255
+
+    doc_code = "H" if n_docs <= 0xFFFF else "I"
+    term_offsets, posting_offsets = array("I", [0]), array("I", [0])
+    term_blob = bytearray()
+    posting_docs, posting_impacts = array(doc_code), array("B")
+    for encoded, term in sorted((term.encode(), term) for term in postings):
+        entries = postings.pop(term)
+        docs, tfs = entries[::2], entries[1::2]
+        df = len(docs)
+        # 影响值 = idf * tf * (k1 + 1) / (tf + norm), 量化后至少为 1
+        weight = bm25_idf(n_docs, df) * (k1 + 1) / scale
+        if df == 1:
+            posting_docs.append(docs[0])
+            posting_impacts.append(round(weight * tfs[0] / (tfs[0] + norms[docs[0]])) or 1)
+        else:
+            impacts = [round(weight * tf / (tf + norms[d])) or 1 for d, tf in zip(docs, tfs)]
+            order = sorted(range(df), key=impacts.__getitem__, reverse=True)
+            posting_docs.extend([docs[i] for i in order])
+            posting_impacts.extend([impacts[i] for i in order])
+        term_blob += encoded
+        term_offsets.append(len(term_blob))
+        posting_offsets.append(len(posting_docs))
+
+    sections = [post_ids, term_offsets, bytes(term_blob), posting_offsets, posting_docs, posting_impacts,
+                text_offsets, bytes(text_blob)]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # 多个 worker 可能同时构建, 临时文件按进程区分
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(b"\0" * _HEADER.size)
+        offsets = []
+        for section in sections:
+            f.write(b"\0" * (-f.tell() % _ALIGN))
+            offsets.append(f.tell())
+            if isinstance(section, array) and sys.byteorder == "big":
+                section.byteswap()
+            f.write(section if isinstance(section, bytes) else section.tobytes())
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, n_docs, len(term_offsets) - 1, len(posting_docs),
+                             posting_docs.itemsize, scale, avg_len, k1, b, built_at, *offsets))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return n_docs
+
+
+class SearchIndex:
+    """mmap 加载的只读索引, 查询过程中不产生对索引数据的拷贝"""
+
+    def __init__(self, path: Path):
+        if sys.byteorder != "little":
+            raise RuntimeError("search index requires a little-endian host")
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.n_docs, self.n_terms, n_postings, doc_width, self.scale, self.avg_len, self.k1, self.b,
+         self.built_at, *offsets) = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a search index")
+        view = memoryview(self._mmap)
+        (docs_at, term_offsets_at, blob_at, posting_offsets_at, posting_docs_at, impacts_at,
+         text_offsets_at, text_at) = offsets
+        self.post_ids = view[docs_at:docs_at + 4 * self.n_docs].cast("I")
+        self._term_offsets = view[term_offsets_at:term_offsets_at + 4 * (self.n_terms + 1)].cast("I")
+        self._term_blob = view[blob_at:blob_at + self._term_offsets[self.n_terms]]
+        self._posting_offsets = view[posting_offsets_at:posting_offsets_at + 4 * (self.n_terms + 1)].cast("I")
+        self._posting_docs = view[posting_docs_at:posting_docs_at + doc_width * n_postings].cast(
+            "H" if doc_width == 2 else "I")
+        self._posting_impacts = view[impacts_at:impacts_at + n_postings]
+        self._text_offsets = view[text_offsets_at:text_offsets_at + 8 * (self.n_docs + 1)].cast("Q")
+        self._text_blob = view[text_at:text_at + self._text_offsets[self.n_docs]]
+        self.size_bytes = len(self._mmap)
+        self._doc_indices: dict[int, int] | None = None
+
+    def _term_at(self, i: int) -> bytes:
+        return self._term_blob[self._term_offsets[i]:self._term_offsets[i + 1]].tobytes()
+
+    def _bisect(self, key: bytes) -> int:
+        """第一个不小于 key 的词项下标"""
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _df(self, term_id: int) -> int:
+        return self._posting_offsets[term_id + 1] - self._posting_offsets[term_id]
+
+    def text(self, doc: int) -> str:
+        """文档的纯文本(摘要片段原文)"""
+        return str(self._text_blob[self._text_offsets[doc]:self._text_offsets[doc + 1]], "utf-8")
+
+    def df(self, term: str) -> int:
+        """词项的文档频率, 不存在时为 0"""
+        key = term.encode()
+        i = self._bisect(key)
+        return self._df(i) if i < self.n_terms and self._term_at(i) == key else 0
+
+    def doc_index(self, post_id: int) -> int | None:
+        """文章 id -> 文档下标, 首次调用时建立映射"""
+        if self._doc_indices is None:
+            self._doc_indices = {post_id: i for i, post_id in enumerate(self.post_ids)}
+        return self._doc_indices.get(post_id)
+
+    def lookup(self, term: str) -> list[int]:
+        """
+        词项 -> 词项下标列表
+        - 中日韩单字(查询只有一个字或被标点隔开时出现)扩展为以该字开头的二元组中文档频率最高的若干个
+        """
+        key = term.encode()
+        i = self._bisect(key)
+        if not is_cjk_char(term):
+            return [i] if i < self.n_terms and self._term_at(i) == key else []
+        end = i
+        while end < self.n_terms and self._term_at(end).startswith(key):
+            end += 1
+        return heapq.nlargest(MAX_PREFIX_EXPANSIONS, range(i, end), key=self._df)
+
+    def _plan(self, terms: Iterable[str], budget: int) -> list[tuple[int, int]]:
+        """
+        为每个查询词项分配要累加的倒排区间 [start, end)
+        - 总条目数不超过 budget, 按查询词项平均分配, 倒排较短的词项用不完的份额留给其余词项
+        - 单字扩展出的多个二元组共用该字的份额
+        """
+        groups = [ids for term in dict.fromkeys(terms) if (ids := self.lookup(term))]
+        groups.sort(key=lambda ids: sum(map(self._df, ids)))
+        ranges, seen = [], set()
+        for i, ids in enumerate(groups):
+            share = budget // (len(groups) - i)
+            ids = sorted(set(ids) - seen, key=self._df)
+            seen.update(ids)
+            for j, term_id in enumerate(ids):
+                n = min(self._df(term_id), share // (len(ids) - j))
+                start = self._posting_offsets[term_id]
+                ranges.append((start, start + n))
+                share -= n
+                budget -= n
+        return ranges
+
+    def search(self, terms: Iterable[str], limit: int, budget: int,
+               exclude: AbstractSet[int] = frozenset()) -> tuple[int, list[tuple[int, float]]]:
+        """
+        BM25 检索(任一词项命中即参与排序)
+
+        :param budget: 单次查询最多累加的倒排条目数
+        :param exclude: 不参与排序的文档下标(已删除或已被增量段取代的文章)
+        :return: (预算内累加到的文档数, [(文章 id, 得分)] 按得分倒序, 最多 limit 条)
+        """
+        ranges = self._plan(terms, budget)
+        if not ranges:
+            return 0, []
+        # 最长的倒排直接构造得分表, 其余逐条累加
+        ranges.sort(key=lambda r: r[1] - r[0], reverse=True)
+        docs, impacts = self._posting_docs, self._posting_impacts
+        start, end = ranges[0]
+        scores = dict(zip(docs[start:end], impacts[start:end]))
+        get = scores.get
+        for start, end in ranges[1:]:
+            for doc, impact in zip(docs[start:end], impacts[start:end]):
+                scores[doc] = get(doc, 0) + impact
+        for doc in exclude:
+            scores.pop(doc, None)
+        top = heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+        post_ids, scale = self.post_ids, self.scale
+        return len(scores), [(post_ids[doc], impact * scale) for doc, impact in top]
+
+    def close(self) -> None:
+        """释放 mmap; 仍有查询引用索引数据时由垃圾回收释放"""
+        try:
+            self.post_ids.release()
+            for view in (self._term_offsets, self._term_blob, self._posting_offsets,
+                         self._posting_docs, self._posting_impacts, self._text_offsets, self._text_blob):
+                view.release()
+            self._mmap.close()
+        except BufferError:
+            pass
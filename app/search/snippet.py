@@ -0,0 +1,87 @@
+"""
+搜索结果摘要片段: 在索引保存的纯文本中找出命中词最集中的窗口, 截取并以 <mark> 标出命中词
+"""
+import functools
+import html
+import re
+import unicodedata
+from collections import Counter
+from typing import Iterable
+
+# 单篇文章最多考察的命中位置数, 限制长文高频词的开销
+_MAX_MATCHES = 256
+
+
+def compact_text(text: str) -> str:
+    """保存到索引中的片段原文: NFKC 归一化(与分词一致, 命中位置可直接对应)并合并空白"""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+@functools.lru_cache(maxsize=256)
+def _pattern(terms: tuple[str, ...]) -> re.Pattern:
+    alternatives = []
+    # 同一位置优先匹配较长的词项; 字母数字词项要求完整匹配单词
+    for term in sorted(terms, key=len, reverse=True):
+        escaped = re.escape(term)
+        alternatives.append(rf"(?<![a-z0-9]){escaped}(?![a-z0-9])" if term.isascii() else escaped)
+    # 零宽前瞻使重叠的二元组(连接/接池)都能被找到
+    return re.compile(rf"(?=({'|'.join(alternatives)}))", re.I)
+
+
+def make_snippet(text: str, terms: Iterable[str], width: int) -> str:
+    """
+    :param text: compact_text 处理过的原文
+    :param terms: 查询分词结果
+    :param width: 片段字数
+    :return: html 转义后的片段, 命中词以 <mark> 包裹, 截断处以省略号表示
+    """
+    terms = tuple(sorted(set(terms)))
+    matches = []
+    if terms:
+        for m in _pattern(terms).finditer(text):
+            matches.append((m.start(), m.start() + len(m.group(1)), m.group(1).lower()))
+            if len(matches) >= _MAX_MATCHES:
+                break
+    if not matches:
+        return html.escape(text[:width]) + ("…" if len(text) > width else "")
+
+    # 滑动窗口: 选出在 width 字内覆盖不同词项最多(其次命中次数最多)的一段
+    best, best_key = 0, (0, 0)
+    window: Counter = Counter()
+    left = 0
+    for right, (_, end, term) in enumerate(matches):
+        window[term] += 1
+        while end - matches[left][0] > width:
+            window[matches[left][2]] -= 1
+            if not window[matches[left][2]]:
+                del window[matches[left][2]]
+            left += 1
+        key = (len(window), right - left + 1)
+        if key > best_key:
+            best, best_key = left, key
+
+    # 窗口前留出少量上下文
+    start = max(0, matches[best][0] - width // 5)
+    end = min(len(text), start + width)
+    start = max(0, end - width)
+
+    parts = ["…"] if start else []
+    pos = start
+    for match_start, match_end, _ in matches:
+        if match_end <= pos or match_start >= end:
+            continue
+        match_start = max(match_start, pos)
+        match_end = min(match_end, end)
+        # 与上一个高亮相连或重叠(二元组重叠)时并入同一个 <mark>
+        if match_start == pos and parts and parts[-1] == "</mark>":
+            parts.pop()
+        else:
+            parts.append(html.escape(text[pos:match_start]))
+            parts.append("<mark>")
+        parts.append(html.escape(text[match_start:match_end]))
+        parts.append("</mark>")
+        pos = match_end
+    parts.append(html.escape(text[pos:end]))
+    if end < len(text):
+        parts.append("…")
+    return "".join(parts)
@@ -0,0 +1,47 @@
+import re
+import unicodedata
+from operator import add
+
+# 中日韩文字(假名、CJK 统一表意文字及扩展 A、兼容表意文字、谚文音节)
+_CJK_RANGES = "぀-ヿ㐀-䶿一-鿿豈-﫿가-힯"
+_TOKEN_RE = re.compile(rf"[{_CJK_RANGES}]+|[a-z0-9]+")
+_CJK_CHAR_RE = re.compile(rf"[{_CJK_RANGES}]")
+# 超过该长度的字母数字串(哈希、base64 等)不建立索引
+MAX_TOKEN_LENGTH = 32
+
+# markdown 中不参与检索的部分: 图片/链接只保留文字, 去掉 html 标签与格式符号
+_MD_IMAGE_RE = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+_MD_LINK_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+_MD_SYNTAX_RE = re.compile(r"^[ \t]*(?:#{1,6}|>+|[-*+]|\d+\.)[ \t]+|^[ \t]*(?:`{3,}|~{3,}).*$|\*{1,3}|~~|`+", re.M)
+
+
+def strip_markdown(text: str) -> str:
+    """markdown -> 纯文本(近似), 保留代码块内容与换行"""
+    text = _MD_IMAGE_RE.sub(r"\1", text)
+    text = _MD_LINK_RE.sub(r"\1", text)
+    text = _HTML_TAG_RE.sub(" ", text)
+    return _MD_SYNTAX_RE.sub("", text)
+
+
+def is_cjk_char(token: str) -> bool:
+    return len(token) == 1 and _CJK_CHAR_RE.match(token) is not None
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    分词: NFKC 归一化并转小写后
+    - 中日韩文字的连续片段切分为重叠的二元组("全文检索" -> 全文/文检/检索), 单字片段保留单字
+    - 字母数字串整体作为一个词项
+    索引与查询使用同一分词, 二元组同时起到短语匹配的作用
+    """
+    tokens: list[str] = []
+    for run in _TOKEN_RE.findall(unicodedata.normalize("NFKC", text).lower()):
+        if run.isascii():
+            if len(run) <= MAX_TOKEN_LENGTH:
+                tokens.append(run)
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(map(add, run, run[1:]))
+    return tokens
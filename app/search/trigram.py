@@ -0,0 +1,112 @@
+"""
+文章标题的三元组(trigram)索引: 常驻内存, 供管理端按标题模糊查找, 容忍错别字与漏字
+"""
+import heapq
+import unicodedata
+from collections import Counter
+from typing import Iterable
+
+from app.utils.metrics import register_metrics
+
+
+def normalize_title(title: str) -> str:
+    """NFKC 归一化、转小写并合并空白"""
+    return " ".join(unicodedata.normalize("NFKC", title).lower().split())
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _short_grams(text: str) -> set[str]:
+    """标题中的单字与二元组(不含空白), 供不足三个字的查询使用"""
+    grams = {text[i:i + 2] for i in range(len(text) - 1)} | set(text)
+    return {gram for gram in grams if " " not in gram}
+
+
+class TitleIndex:
+    """
+    - 标题归一化后首尾各补一个空格, 取全部三元组建立倒排: 三元组 -> {文章 id}
+    - 查询取归一化后的三元组(不补空格, 查询可以是标题中间的一段),
+      得分 = 标题包含的查询三元组数 / 查询三元组数, 同分时标题越短(越接近查询)越靠前
+    - 不足三个字的查询没有三元组, 直接查标题中单字与二元组的倒排
+    - 仅在事件循环中读写; load 可在线程中执行, 期间 ready 为 False, 调用方不应读写
+    """
+
+    def __init__(self):
+        # 文章 id -> (归一化标题, 三元组数)
+        self._titles: dict[int, tuple[str, int]] = {}
+        self._grams: dict[str, set[int]] = {}
+        self._short: dict[str, set[int]] = {}
+        self.ready = False
+        self._stats = {"queries": 0}
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def load(self, rows: Iterable[tuple[int, str]]) -> None:
+        """全量加载 (文章 id, 标题), 替换现有内容"""
+        self.ready = False
+        self._titles, self._grams, self._short = {}, {}, {}
+        for post_id, title in rows:
+            self.put(post_id, title)
+        self.ready = True
+
+    def put(self, post_id: int, title: str) -> None:
+        """新增或替换一篇文章的标题"""
+        self.remove(post_id)
+        text = normalize_title(title)
+        grams = trigrams(f" {text} ")
+        self._titles[post_id] = (text, len(grams))
+        for gram in grams:
+            self._grams.setdefault(gram, set()).add(post_id)
+        for gram in _short_grams(text):
+            self._short.setdefault(gram, set()).add(post_id)
+
+    def remove(self, post_id: int) -> None:
+        entry = self._titles.pop(post_id, None)
+        if entry is None:
+            return
+        text = entry[0]
+        for index, keys in ((self._grams, trigrams(f" {text} ")), (self._short, _short_grams(text))):
+            for key in keys:
+                ids = index[key]
+                ids.discard(post_id)
+                if not ids:
+                    del index[key]
+
+    def search(self, query: str, limit: int, min_score: float) -> list[tuple[int, float]]:
+        """
+        :param min_score: 最低得分(命中的查询三元组比例), 0~1
+        :return: [(文章 id, 得分)] 按得分倒序, 最多 limit 条
+        """
+        self._stats["queries"] += 1
+        text = normalize_title(query)
+        grams = trigrams(text)
+        if not grams:
+            return self._search_short(text, limit)
+        counts: Counter = Counter()
+        for gram in grams:
+            ids = self._grams.get(gram)
+            if ids:
+                counts.update(ids)
+        need = min_score * len(grams)
+        titles = self._titles
+        # 排序键: 命中数优先, 同命中数时标题三元组越少越靠前(标题三元组数不超过 1024), 再按 id 倒序
+        ranked = [(count * 1024 - titles[post_id][1], post_id, count)
+                  for post_id, count in counts.items() if count >= need]
+        return [(post_id, count / len(grams)) for _, post_id, count in heapq.nlargest(limit, ranked)]
+
+    def _search_short(self, text: str, limit: int) -> list[tuple[int, float]]:
+        titles = self._titles
+        candidates = self._short.get(text, ())
+        # 标题越短越靠前, 再按 id 倒序
+        ranked = [(titles[post_id][1], -post_id) for post_id in candidates]
+        return [(-neg_id, 1.0) for _, neg_id in heapq.nsmallest(limit, ranked)]
+
+    def stats(self) -> dict:
+        return {**self._stats, "ready": self.ready, "titles": len(self._titles), "trigrams": len(self._grams)}
+
+
+title_index = TitleIndex()
+register_metrics("title_index", title_index.stats)
@@ -3,3 +3,4 @@ from .post import get_post_service, PostService
 from .tag import get_tag_service, TagService
 from .category import get_category_service, CategoryService
 from .timeline import get_timeline_service, TimelineService
+from .common import get_common_service, CommonService
@@ -1,12 +1,204 @@
-from pydantic import BaseModel
+import asyncio
+import functools
+import time
+from collections import OrderedDict
+
+from pydantic import BaseModel, TypeAdapter
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Any, TypeVar, Generic
+from typing import Any, Awaitable, Callable, Iterable, TypeVar, Generic
 
+from app.core import settings
+from app.db.generation import TableGenerations
+from app.db.invalidation import InvalidationBus
+from app.db.redis import RedisClientManager
+from app.db.session import unit_of_work
 from app.utils.logger import get_logger
+from app.utils.metrics import register_metrics
 from app.repository.base import BaseMapper
 
 
 MapperType = TypeVar("MapperType", bound=BaseMapper)
+R = TypeVar("R")
+
+_logger = get_logger(__name__)
+
+
+class LocalCache:
+    """
+    进程内 LRU 缓存, 按条目数限制容量, 每个条目有独立的过期时间
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        # key -> (过期时间戳, 值)
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """返回 (是否命中, 值), 值本身可以是 None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[1]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_local_cache = LocalCache(settings.cache.LOCAL_MAX_ENTRIES)
+# 正在回源的缓存键 -> 回源结果, 同一键的并发未命中只回源一次
+_inflight: dict[str, asyncio.Future] = {}
+_cache_stats = {"local_hits": 0, "redis_hits": 0, "stale": 0, "misses": 0, "joined": 0}
+_MISSING = object()
+register_metrics("service_cache", lambda: {**_cache_stats, "local_entries": len(_local_cache)})
+
+
+def _cache_key(namespace: str, args: tuple, kwargs: dict) -> str:
+    parts = [namespace, *(str(a) for a in args), *(f"{k}={v}" for k, v in sorted(kwargs.items()))]
+    return settings.cache.KEY_PREFIX + ":".join(parts)
+
+
+def _local_entry_valid(entry: tuple[tuple[int, ...], float, Any], tables: tuple[str, ...]) -> bool:
+    """
+    进程内条目有效: 依赖表版本号未变且没有待补发的递增; 失效广播未订阅时还需在较短的兜底时间内
+    """
+    generations, loaded_at, _ = entry
+    if generations != TableGenerations.local(tables) or TableGenerations.dirty(tables):
+        return False
+    return (InvalidationBus.healthy()
+            or time.monotonic() - loaded_at < settings.cache.LOCAL_FALLBACK_TTL_SECONDS)
+
+
+def _stamp(generations: tuple) -> str:
+    return ",".join(map(str, generations))
+
+
+async def _redis_get(key: str, tables: tuple[str, ...]) -> tuple[tuple | None, str | None]:
+    """
+    一次往返读取依赖表的版本号(首位为版本号纪元)与缓存值, Redis 不可用时返回 (None, None)
+    - 依赖表有待补发的递增时先补发, 补发失败则不读取 Redis 中可能已过期的条目
+    """
+    if TableGenerations.dirty(tables) and not await TableGenerations.bump(()):
+        return None, None
+    try:
+        async with RedisClientManager.get_client().pipeline(transaction=False) as pipe:
+            if tables:
+                pipe.hmget(settings.cache.GENERATION_KEY, (TableGenerations.EPOCH_FIELD, *tables))
+            pipe.get(key)
+            results = await pipe.execute()
+    except (RedisError, RuntimeError) as e:
+        _logger.warning(f"读取缓存 {key} 失败: {e}")
+        return None, None
+    if not tables:
+        return (), results[-1]
+    epoch, *values = results[0]
+    generations = tuple(int(g or 0) for g in values)
+    TableGenerations.observe(tables, generations, epoch)
+    return (epoch or "", *generations), results[-1]
+
+
+async def _redis_set(key: str, value: str, ttl: int) -> None:
+    try:
+        await RedisClientManager.get_client().set(key, value, ex=ttl)
+    except (RedisError, RuntimeError) as e:
+        _logger.warning(f"写入缓存 {key} 失败: {e}")
+
+
+def cached(namespace: str, return_type: Any, depends_on: Iterable[str] = (),
+           ttl: int | None = None, local_ttl: float | None = None):
+    """
+    Service 读方法两级缓存装饰器: 进程内 LRU -> Redis -> 数据库
+    - 缓存键由命名空间与方法参数(不含 self)组成
+    - 缓存条目记录所依赖表的版本号, 相关表有写入提交后版本号变化, 条目即失效;
+      其他 worker 的写入经 InvalidationBus 广播, 进程内条目因此可以使用较长的过期时间
+    - 同一键的并发未命中合并为一次回源(single-flight)
+    - Redis 不可用时直接回源, 不影响读取
+
+    :param namespace: 缓存命名空间, 同时作为 CACHE_TTL_OVERRIDES 中的配置名
+    :param return_type: 方法返回值类型, 用于 Redis 中的 JSON 序列化与反序列化
+    :param depends_on: 返回值所依赖的表名
+    :param ttl: Redis 过期时间(秒), 默认 CACHE_DEFAULT_TTL_SECONDS
+    :param local_ttl: 进程内缓存过期时间(秒), 默认 CACHE_LOCAL_TTL_SECONDS
+    """
+    adapter = TypeAdapter(return_type)
+    tables = tuple(depends_on)
+
+    def decorator(func: Callable[..., Awaitable[R]]) -> Callable[..., Awaitable[R]]:
+        async def load(self, key: str, args: tuple, kwargs: dict) -> R:
+            redis_ttl = settings.cache.TTL_OVERRIDES.get(namespace, ttl or settings.cache.DEFAULT_TTL_SECONDS)
+            memory_ttl = min(local_ttl or settings.cache.LOCAL_TTL_SECONDS, redis_ttl)
+            generations, raw = await _redis_get(key, tables)
+            # 版本号须在回源之前读取: 回源期间有写入提交时, 写入的条目带旧版本号, 下次读取即失效
+            local_generations = TableGenerations.local(tables)
+            value = _MISSING
+            if raw is not None:
+                stamp, _, payload = raw.partition("|")
+                if stamp == _stamp(generations):
+                    _cache_stats["redis_hits"] += 1
+                    value = adapter.validate_json(payload)
+                else:
+                    _cache_stats["stale"] += 1
+            if value is _MISSING:
+                _cache_stats["misses"] += 1
+                value = await func(self, *args, **kwargs)
+                if generations is not None:
+                    payload = adapter.dump_json(value).decode()
+                    await _redis_set(key, f"{_stamp(generations)}|{payload}", redis_ttl)
+            _local_cache.set(key, (local_generations, time.monotonic(), value), memory_ttl)
+            return value
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs) -> R:
+            key = _cache_key(namespace, args, kwargs)
+            hit, entry = _local_cache.get(key)
+            if hit and _local_entry_valid(entry, tables):
+                _cache_stats["local_hits"] += 1
+                return entry[2]
+            inflight = _inflight.get(key)
+            if inflight is not None:
+                _cache_stats["joined"] += 1
+                try:
+                    return await asyncio.shield(inflight)
+                except asyncio.CancelledError:
+                    # 回源的请求被取消, 自己重新回源; 若是自身被取消则继续抛出
+                    if not inflight.cancelled():
+                        raise
+                    return await func(self, *args, **kwargs)
+            future = asyncio.get_running_loop().create_future()
+            _inflight[key] = future
+            try:
+                value = await load(self, key, args, kwargs)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except BaseException as e:
+                future.set_exception(e)
+                # 标记异常已被获取, 避免没有等待者时输出警告
+                future.exception()
+                raise
+            else:
+                future.set_result(value)
+                return value
+            finally:
+                _inflight.pop(key, None)
+
+        return wrapper
+
+    return decorator
+
 
 class BaseService(Generic[MapperType]):
     def __init__(self, session: AsyncSession, mapper: MapperType):
@@ -14,9 +206,13 @@ class BaseService(Generic[MapperType]):
         self.mapper = mapper
         self.logger = get_logger(self.__class__.__name__)
 
+    def unit_of_work(self):
+        """开启工作单元: 块内的 Mapper 写操作只 flush, 退出时统一提交一次"""
+        return unit_of_work(self.session)
+
     async def count(self,) -> int:
         return await self.mapper.count(self.session)
-    
+
     async def create(self, entity: dict[str, Any] | BaseModel) -> int:
         obj_id = await self.mapper.create(self.session, entity)
         return obj_id
@@ -32,7 +228,7 @@ class BaseService(Generic[MapperType]):
     async def deleteById(self, id: int) -> bool:
         row_count = await self.mapper.delete(self.session, id)
         return row_count > 0
-    
+
     async def deleteByIds(self, ids: list[int]) -> bool:
         row_count = await self.mapper.delete_batch(self.session, ids)
         return row_count > 0
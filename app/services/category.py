@@ -5,21 +5,23 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repository import CategoryMapper, get_category_mapper
 from app.db.session import get_session
+from app.model.orm.models import Category, PostCategory
 from app.model.vo import CategoryVO, CategoryCardVO
-from app.services.base import BaseService
+from app.services.base import BaseService, cached
 
 
 class CategoryService(BaseService[CategoryMapper]):
     def __init__(self, session: AsyncSession, mapper):
         super().__init__(session, mapper)
 
-    async def list_all(self) -> List[CategoryVO | dict]:
-        items = await self.mapper.list_all(self.session)
-        return [CategoryVO.model_validate(i).model_dump() for i in items]
+    @cached("category:all", List[CategoryVO], depends_on=(Category.__tablename__,))
+    async def list_all(self) -> List[CategoryVO]:
+        return await self.mapper.list_all(self.session)
     
-    async def list_cards(self) -> List[CategoryCardVO | dict]:
-        items = await self.mapper.list_cards(self.session)
-        return [CategoryCardVO.model_validate(i).model_dump() for i in items]
+    @cached("category:cards", List[CategoryCardVO],
+            depends_on=(Category.__tablename__, PostCategory.__tablename__))
+    async def list_cards(self) -> List[CategoryCardVO]:
+        return await self.mapper.list_cards(self.session)
 
     async def paginated_categories(self, current: int, size: int):
         items, total = await self.mapper.paginate(self.session, current, size)
@@ -0,0 +1,41 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_session
+from app.model.orm.models import Category, Post, Tag
+from app.model.vo.common import ProfileInfo
+from app.repository import (
+    CategoryMapper,
+    PostMapper,
+    TagMapper,
+    get_category_mapper,
+    get_post_mapper,
+    get_tag_mapper,
+)
+from app.services.base import BaseService, cached
+
+
+class CommonService(BaseService[PostMapper]):
+    """综合信息(跨分类/标签/文章的统计)"""
+
+    def __init__(self, session: AsyncSession, mapper: PostMapper,
+                 category_mapper: CategoryMapper, tag_mapper: TagMapper):
+        super().__init__(session, mapper)
+        self.category_mapper = category_mapper
+        self.tag_mapper = tag_mapper
+
+    @cached("common:profile", ProfileInfo,
+            depends_on=(Category.__tablename__, Tag.__tablename__, Post.__tablename__))
+    async def get_profile_info(self) -> ProfileInfo:
+        return ProfileInfo(
+            category_count=await self.category_mapper.count(self.session),
+            tag_count=await self.tag_mapper.count(self.session),
+            post_count=await self.mapper.count(self.session),
+        )
+
+
+def get_common_service(session: AsyncSession = Depends(get_session),
+                       mapper: PostMapper = Depends(get_post_mapper),
+                       category_mapper: CategoryMapper = Depends(get_category_mapper),
+                       tag_mapper: TagMapper = Depends(get_tag_mapper)) -> CommonService:
+    return CommonService(session, mapper, category_mapper, tag_mapper)
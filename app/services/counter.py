@@ -0,0 +1,236 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from redis.exceptions import RedisError
+
+from app.core import settings
+from app.db.redis import RedisClientManager
+from app.db.session import get_sessionmaker
+from app.repository import get_post_mapper
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 对每组 (待写回 key, 写回中快照 key): 若快照不存在, 则把待写回 key 整体转为快照
+# 多组 key 在同一脚本内完成, 保证点赞增量与点赞流水的快照一致
+_TAKE_SNAPSHOT_LUA = """
+for i = 1, #KEYS, 2 do
+    if redis.call('EXISTS', KEYS[i + 1]) == 0 and redis.call('EXISTS', KEYS[i]) == 1 then
+        redis.call('RENAME', KEYS[i], KEYS[i + 1])
+    end
+end
+return 1
+"""
+
+# 仍持有写回锁时才释放, 避免释放已过期后被其他 worker 取得的锁
+_RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# 点赞: 去重集合中首次出现的点赞者才累加增量并记录流水, 返回 1 表示本次点赞生效
+# KEYS[1]: 去重集合, KEYS[2]: 待写回增量 hash, KEYS[3]: 待写回流水 list
+# ARGV[1]: post_id, ARGV[2]: 点赞者标识, ARGV[3]: 流水内容, ARGV[4]: 去重集合过期时间(秒)
+_LIKE_LUA = """
+if redis.call('SADD', KEYS[1], ARGV[2]) == 0 then
+    return 0
+end
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('HINCRBY', KEYS[2], ARGV[1], 1)
+redis.call('RPUSH', KEYS[3], ARGV[3])
+return 1
+"""
+
+
+class PostCounter:
+    """
+    文章计数器(写后缓冲):
+    - 请求路径只在 Redis 中累加增量, 不触碰数据库
+    - 后台 CounterFlusher 定期将增量聚合后批量写回 posts 表
+    - 读取时返回 数据库值 + 尚未写回的增量
+    """
+
+    @classmethod
+    async def _take_snapshot(cls, *key_pairs: tuple[str, str]) -> None:
+        client = RedisClientManager.get_client()
+        keys = [key for pair in key_pairs for key in pair]
+        await client.eval(_TAKE_SNAPSHOT_LUA, len(keys), *keys)
+
+    @classmethod
+    async def _pending(cls, post_id: int, pending_key: str, flushing_key: str) -> int:
+        """获取文章尚未写回数据库的增量(含正在写回的快照), Redis 不可用时返回 0"""
+        try:
+            async with RedisClientManager.get_client().pipeline(transaction=False) as pipe:
+                pipe.hget(pending_key, str(post_id))
+                pipe.hget(flushing_key, str(post_id))
+                pending, flushing = await pipe.execute()
+        except (RedisError, RuntimeError) as e:
+            logger.warning(f"读取文章 {post_id} 待写回计数失败: {e}")
+            return 0
+        return int(pending or 0) + int(flushing or 0)
+
+    @classmethod
+    async def record_view(cls, post_id: int) -> None:
+        """记录一次阅读, Redis 不可用时仅记录日志, 不影响正文读取"""
+        try:
+            await RedisClientManager.get_client().hincrby(settings.counter.VIEW_PENDING_KEY, str(post_id), 1)
+        except (RedisError, RuntimeError) as e:
+            logger.warning(f"记录文章 {post_id} 阅读数失败: {e}")
+
+    @classmethod
+    async def pending_views(cls, post_id: int) -> int:
+        return await cls._pending(post_id, settings.counter.VIEW_PENDING_KEY, settings.counter.VIEW_FLUSHING_KEY)
+
+    @classmethod
+    async def like(cls, post_id: int, voter: str, user_id: int | None = None) -> bool:
+        """
+        点赞: 一次 Redis 脚本调用完成去重、计数与流水记录, 调用方负责确认文章存在
+
+        :param voter: 点赞者标识(登录用户 u:<user_id>, 匿名访客 ip:<ip>)
+        :return: 本次点赞是否生效(重复点赞或 Redis 不可用时返回 False)
+        """
+        cfg = settings.counter
+        entry = f"{post_id}|{user_id or ''}|{int(time.time())}|{voter}"
+        try:
+            liked = await RedisClientManager.get_client().eval(
+                _LIKE_LUA, 3,
+                f"{cfg.LIKE_VOTERS_KEY_PREFIX}{post_id}",
+                cfg.LIKE_PENDING_KEY,
+                cfg.LIKE_LOG_KEY,
+                str(post_id), voter, entry, cfg.LIKE_VOTERS_TTL_SECONDS,
+            )
+        except (RedisError, RuntimeError) as e:
+            logger.warning(f"记录文章 {post_id} 点赞失败: {e}")
+            return False
+        return bool(liked)
+
+    @classmethod
+    async def forget(cls, post_ids: list[int]) -> None:
+        """文章删除后清理其点赞去重集合, Redis 不可用时仅记录日志(集合会自然过期)"""
+        if not post_ids:
+            return
+        try:
+            await RedisClientManager.get_client().delete(
+                *(f"{settings.counter.LIKE_VOTERS_KEY_PREFIX}{post_id}" for post_id in post_ids))
+        except (RedisError, RuntimeError) as e:
+            logger.warning(f"清理文章 {post_ids} 点赞去重集合失败: {e}")
+
+    @classmethod
+    async def pending_likes(cls, post_id: int) -> int:
+        return await cls._pending(post_id, settings.counter.LIKE_PENDING_KEY, settings.counter.LIKE_PENDING_FLUSHING_KEY)
+
+    @classmethod
+    async def flush_views(cls) -> int:
+        """
+        将阅读数增量写回数据库, 调用方须持有写回锁(CounterFlusher.flush)
+        - 先把待写回 hash 原子地转为快照, 写回期间的新增量继续累加到新的待写回 hash
+        - 快照首次写回时生成批次号, 数据库在同一事务中记录批次号, 同一快照重试时不会重复累加
+        - 数据库提交成功后才删除快照与批次号, 失败时保留, 下次写回时以原批次号重试
+        :return: 写回的文章数
+        """
+        cfg = settings.counter
+        client = RedisClientManager.get_client()
+        await cls._take_snapshot((cfg.VIEW_PENDING_KEY, cfg.VIEW_FLUSHING_KEY))
+        await client.set(cfg.VIEW_BATCH_ID_KEY, uuid.uuid4().hex, nx=True)
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.hgetall(cfg.VIEW_FLUSHING_KEY)
+            pipe.get(cfg.VIEW_BATCH_ID_KEY)
+            snapshot, batch_id = await pipe.execute()
+        deltas = {int(post_id): int(delta) for post_id, delta in snapshot.items()}
+        if deltas:
+            async with get_sessionmaker()() as session:
+                await get_post_mapper().add_counter_deltas(
+                    session, "view_count", deltas, batch_id,
+                    purge_before=datetime.now() - timedelta(days=cfg.BATCH_RETENTION_DAYS))
+        await client.delete(cfg.VIEW_FLUSHING_KEY, cfg.VIEW_BATCH_ID_KEY)
+        return len(deltas)
+
+    @classmethod
+    async def flush_likes(cls) -> int:
+        """
+        将点赞流水写回 likes 表, 并据此重新统计 like_count, 快照机制同 flush_views
+        - 流水按 (post_id, voter) 去重写入, like_count 按流水重新统计, 重复写回同一快照是幂等的, 无需批次号
+        :return: 写回的点赞流水条数
+        """
+        client = RedisClientManager.get_client()
+        await cls._take_snapshot(
+            (settings.counter.LIKE_PENDING_KEY, settings.counter.LIKE_PENDING_FLUSHING_KEY),
+            (settings.counter.LIKE_LOG_KEY, settings.counter.LIKE_LOG_FLUSHING_KEY),
+        )
+        entries = await client.lrange(settings.counter.LIKE_LOG_FLUSHING_KEY, 0, -1)
+        likes = []
+        for entry in entries:
+            post_id, user_id, ts, voter = entry.split("|", 3)
+            likes.append({
+                "post_id": int(post_id),
+                "voter": voter,
+                "user_id": int(user_id) if user_id else None,
+                "create_time": datetime.fromtimestamp(int(ts)),
+            })
+        if likes:
+            async with get_sessionmaker()() as session:
+                await get_post_mapper().append_likes(session, likes)
+        await client.delete(settings.counter.LIKE_PENDING_FLUSHING_KEY, settings.counter.LIKE_LOG_FLUSHING_KEY)
+        return len(likes)
+
+
+class CounterFlusher:
+    """
+    计数写回后台任务, 由 lifespan 启动与停止
+    - 每个 worker 都会启动, 通过 Redis 锁(SET NX EX)保证同一时刻只有一个 worker 写回快照
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="counter-flusher")
+
+    async def stop(self) -> None:
+        """停止后台任务, 并做最后一次写回"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        cfg = settings.counter
+        token = uuid.uuid4().hex
+        try:
+            client = RedisClientManager.get_client()
+            acquired = await client.set(cfg.FLUSH_LOCK_KEY, token, nx=True, ex=cfg.FLUSH_LOCK_TTL_SECONDS)
+        except (RedisError, RuntimeError) as e:
+            logger.warning(f"获取计数写回锁失败, 将在下次重试: {e}")
+            return
+        if not acquired:
+            # 其他 worker 正在写回
+            return
+        try:
+            for name, flush in (("阅读数", PostCounter.flush_views), ("点赞", PostCounter.flush_likes)):
+                try:
+                    count = await flush()
+                    if count:
+                        logger.debug(f"已写回 {count} 条{name}计数")
+                except Exception as e:
+                    logger.error(f"{name}计数写回失败, 将在下次重试: {e}")
+        finally:
+            try:
+                await client.eval(_RELEASE_LOCK_LUA, 1, cfg.FLUSH_LOCK_KEY, token)
+            except (RedisError, RuntimeError) as e:
+                logger.warning(f"释放计数写回锁失败, 等待其自然过期: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
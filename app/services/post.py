@@ -1,3 +1,6 @@
+import os
+import uuid
+from collections import OrderedDict
 from pathlib import Path
 from typing import Optional, Tuple
 
@@ -8,10 +11,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core import path_conf
 from app.core import settings
 from app.db.session import get_session
-from app.model import PaginatedResponse
+from app.handler.exception_handlers import ArticleExistsException, ServiceBusyException
+from app.model import CursorPaginatedResponse, PaginatedResponse
 from app.model import Post
 from app.model.dto.post import PostCreate, PostUpdate
 from app.model.orm.field_enum import PostStatus
+from app.model.orm.models import Category, Post as PostORM, PostCategory, PostTag, Tag
 from app.model.vo.post import PostEditVO, PostTableVO, U_PostDetailVO, U_PostInfo
 from app.repository import (
     CategoryMapper,
@@ -21,7 +26,70 @@ from app.repository import (
     get_post_mapper,
     get_tag_mapper,
 )
-from app.services.base import BaseService
+from app.search import search_engine, title_index
+from app.services.base import BaseService, cached
+from app.services.counter import PostCounter
+from app.services.related import RelatedPosts
+from app.services.search import publish_post_changes
+from app.utils.metrics import register_metrics
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+class ContentCache:
+    """
+    文章正文进程内 LRU 缓存
+    - 以解析后的绝对路径为键, 以文件 (mtime_ns, size) 校验有效性, 文件被改写后自动失效
+    - 容量按正文字节数计算, 超出上限时淘汰最久未使用的条目
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        # path -> (mtime_ns, size, content)
+        self._entries: OrderedDict[str, tuple[int, int, str]] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, mtime_ns: int, size: int) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != mtime_ns or entry[1] != size:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def put(self, key: str, mtime_ns: int, size: int, content: str) -> None:
+        self.invalidate(key)
+        # 单个正文超过容量上限时不缓存, 避免清空整个缓存
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (mtime_ns, size, content)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+_content_cache = ContentCache(settings.cache.CONTENT_MAX_BYTES)
+register_metrics("content_cache", _content_cache.stats)
 
 
 class PostService(BaseService[PostMapper]):
@@ -32,16 +100,20 @@ class PostService(BaseService[PostMapper]):
         self.tag_mapper = tag_mapper
 
     async def _read_content(self, path: str | Path) -> str | None:
+        """读取文章正文, 文件未变更时直接返回进程内缓存"""
         try:
-            path = Path(path)
-            if not path.is_absolute():
-                path = path_conf.BLOG_DIR / path
-            if path.is_file():
-                async with aiofiles.open(str(path), "r", encoding="utf-8") as f:
-                    content = await f.read()
+            path = path_conf.resolve_content_path(path)
+            key = str(path)
+            stat = os.stat(key)
+            content = _content_cache.get(key, stat.st_mtime_ns, stat.st_size)
+            if content is not None:
+                return content
+            async with aiofiles.open(key, "r", encoding="utf-8") as f:
+                content = await f.read()
         except (FileNotFoundError, PermissionError, IOError) as e:
             self.logger.error(f"读取文章正文文件失败: {e}")
             return None
+        _content_cache.put(key, stat.st_mtime_ns, stat.st_size, content)
         return content
 
     async def paginated_card_info(self, page: int, size: int, category_id: Optional[int] = None,
@@ -49,15 +121,75 @@ class PostService(BaseService[PostMapper]):
         rows, total = await self.mapper.paginate_cards(self.session, page, size, category_id, tag_id)
         return PaginatedResponse(total=total, records=rows, current=page, size=size)
 
-    async def paginated_table_post_vo(self, page: int, size: int) -> Tuple[list[PostTableVO] | None, int]:
-        row, total = await self.mapper.paginated_table_post_vo(self.session, page, size)
-        if not row:
-            return None, 0
-        return row, total
+    async def cursor_card_info(self, size: int, cursor: str | None = None, category_id: Optional[int] = None,
+                               tag_id: Optional[int] = None) -> CursorPaginatedResponse:
+        """游标分页获取文章卡片, cursor 为空时返回第一页"""
+        after = decode_cursor(cursor) if cursor else None
+        rows, next_key = await self.mapper.paginate_cards_after(self.session, size, after, category_id, tag_id)
+        next_cursor = encode_cursor(*next_key) if next_key else None
+        return CursorPaginatedResponse(records=rows, size=size, next_cursor=next_cursor)
+
+    async def search_cards(self, query: str, page: int, size: int) -> PaginatedResponse:
+        """
+        全文检索文章卡片(附带命中摘要片段), 按相关度排序, 最多可翻到 SEARCH_MAX_RESULTS 条
+        - total 为实际可翻到的结果数(不超过 SEARCH_MAX_RESULTS), 与页码无关; 倒排超出
+          SEARCH_MAX_POSTINGS_PER_QUERY 预算时, 未被累加的低相关文章不计入
+        """
+        if not search_engine.ready:
+            raise ServiceBusyException("搜索索引构建中, 请稍后重试")
+        _, hits = search_engine.search(query, settings.search.MAX_RESULTS)
+        post_ids = [post_id for post_id, _ in hits[(page - 1) * size:page * size]]
+        rows = await self.mapper.list_cards_by_ids(self.session, post_ids)
+        # 摘要片段在内存中从索引保存的纯文本截取, 不读取正文文件
+        snippets = search_engine.snippets(query, post_ids)
+        for row in rows:
+            row["snippet"] = snippets.get(row["id"], "")
+        return PaginatedResponse(total=len(hits), records=rows, current=page, size=size)
+
+    async def paginated_table_post_vo(self, page: int, size: int,
+                                      title_query: str | None = None) -> Tuple[list[PostTableVO], int]:
+        if title_query:
+            return await self._search_table_post_vo(title_query, page, size)
+        rows, total = await self.mapper.paginated_table_post_vo(self.session, page, size)
+        return rows, total
+
+    async def _search_table_post_vo(self, title_query: str, page: int, size: int) -> Tuple[list[PostTableVO], int]:
+        """按标题模糊查找(内存三元组索引), 按匹配度排序, 最多可翻到 SEARCH_MAX_RESULTS 条"""
+        if not title_index.ready:
+            raise ServiceBusyException("标题索引加载中, 请稍后重试")
+        hits = title_index.search(title_query, settings.search.MAX_RESULTS, settings.search.TITLE_MIN_SCORE)
+        post_ids = [post_id for post_id, _ in hits[(page - 1) * size:page * size]]
+        rows = await self.mapper.list_table_post_vo_by_ids(self.session, post_ids)
+        return rows, len(hits)
+
+    @cached("post:u_info", U_PostInfo | None,
+            depends_on=(PostORM.__tablename__, PostCategory.__tablename__, PostTag.__tablename__,
+                        Category.__tablename__, Tag.__tablename__))
+    async def _load_u_post_info(self, post_id: int) -> U_PostInfo | None:
+        return await self.mapper.get_u_post_info(self.session, post_id)
+
+    @cached("post:counters", tuple[int, int] | None, depends_on=(PostMapper.COUNTERS,))
+    async def _load_counters(self, post_id: int) -> tuple[int, int] | None:
+        return await self.mapper.get_counters(self.session, post_id)
 
     async def get_u_post_info(self, post_id: int) -> U_PostInfo | None:
-        row = await self.mapper.get_u_post_info(self.session, post_id)
-        return row
+        row = await self._load_u_post_info(post_id)
+        if row is None:
+            return None
+        # 计数每个写回周期都会变化, 单独缓存, 不随文章信息缓存失效;
+        # 阅读数/点赞数 = 数据库值 + Redis 中尚未写回的增量; 缓存对象是共享的, 不能原地修改
+        view_count, like_count = await self._load_counters(post_id) or (row.view_count, row.like_count)
+        return row.model_copy(update={
+            "view_count": (view_count or 0) + await PostCounter.pending_views(post_id),
+            "like_count": (like_count or 0) + await PostCounter.pending_likes(post_id),
+        })
+
+    async def get_related(self, post_id: int) -> list[dict]:
+        """相关文章卡片(后台预计算, 按相似度排序), 尚未计算时为空"""
+        return await self.mapper.list_cards_by_ids(self.session, await RelatedPosts.get(post_id))
+
+    async def record_view(self, post_id: int) -> None:
+        await PostCounter.record_view(post_id)
 
     async def get_article_edit(self, post_id: int) -> PostEditVO | None:
         row = await self.mapper.get_post_info_with_path(self.session, post_id)
@@ -76,14 +208,8 @@ class PostService(BaseService[PostMapper]):
         return U_PostDetailVO(**row.model_dump(), content=content)
 
     async def create_post(self, dto: PostCreate) -> int:
-        # 保存文章正文文件
-        if dto.content is not None:
-            content_file_path = path_conf.BLOG_DIR / f"{dto.title}.md"
-            async with aiofiles.open(str(content_file_path), "w", encoding="utf-8") as f:
-                await f.write(dto.content)
-        else:
-            content_file_path = None
-        # 保存元信息
+        content_file_path = path_conf.BLOG_DIR / f"{dto.title}.md" if dto.content is not None else None
+        # 保存元信息, 文章与分类/标签关联在同一事务内写入
         obj = Post(
             title=dto.title,
             summary=dto.summary,
@@ -92,11 +218,28 @@ class PostService(BaseService[PostMapper]):
             author_id=settings.app.AUTHOR_ID,
             author_name=settings.app.AUTHOR_NAME,
         )
-        obj_id = await self.mapper.create(self.session, obj)
-        await self.mapper.remove_categories(self.session, obj_id)
-        await self.mapper.add_categories(self.session, obj_id, dto.category_ids)
-        await self.mapper.remove_tags(self.session, obj_id)
-        await self.mapper.add_tags(self.session, obj_id, dto.tag_ids)
+        file_created = False
+        try:
+            async with self.unit_of_work():
+                obj_id = await self.mapper.create(self.session, obj)
+                await self.mapper.add_categories(self.session, obj_id, dto.category_ids)
+                await self.mapper.add_tags(self.session, obj_id, dto.tag_ids)
+                # 保存文章正文文件: 以独占方式创建, 同名文件已存在时拒绝而不是覆盖其他文章的正文
+                if content_file_path is not None:
+                    try:
+                        async with aiofiles.open(str(content_file_path), "x", encoding="utf-8") as f:
+                            file_created = True
+                            await f.write(dto.content)
+                    except FileExistsError:
+                        raise ArticleExistsException()
+        except BaseException:
+            # 写入或提交失败时事务已回滚, 删除本次创建的正文文件, 不留下没有数据库记录的文件
+            if file_created:
+                content_file_path.unlink(missing_ok=True)
+            raise
+        if content_file_path is not None:
+            _content_cache.invalidate(str(path_conf.resolve_content_path(content_file_path)))
+        await publish_post_changes([obj_id])
         return obj_id
 
     async def update_post(self, post_id: int, dto: PostUpdate) -> None:
@@ -106,38 +249,71 @@ class PostService(BaseService[PostMapper]):
         # 分离content
         content = update_dict.pop("content", None)
         self.logger.debug(f"更新文章{post_id}")
-        await self.mapper.update(self.session, post_id, update_dict)
-        self.logger.debug(f"post: {post_id}: 删除关联表信息")
-        await self.mapper.remove_categories(self.session, post_id)
-        await self.mapper.remove_tags(self.session, post_id)
-        if rel_categories is not None:
-            await self.mapper.add_categories(self.session, post_id, rel_categories or [])
-        if rel_tags is not None:
-            await self.mapper.add_tags(self.session, post_id, rel_tags or [])
-        # 更新内容
-        self.logger.debug(f"post: {post_id}: 关联表更新完成")
+        staged = None
+        try:
+            async with self.unit_of_work():
+                if update_dict:
+                    await self.mapper.update(self.session, post_id, update_dict)
+                # 仅在请求携带了分类/标签时按差异同步关联表, 未携带则保持不变
+                if rel_categories is not None:
+                    added, removed = await self.mapper.sync_categories(self.session, post_id, rel_categories)
+                    self.logger.debug(f"post: {post_id}: 分类关联 新增{added} 移除{removed}")
+                if rel_tags is not None:
+                    added, removed = await self.mapper.sync_tags(self.session, post_id, rel_tags)
+                    self.logger.debug(f"post: {post_id}: 标签关联 新增{added} 移除{removed}")
+                # 正文先写入临时文件, 写入失败时整个事务回滚
+                if content is not None:
+                    staged = await self._stage_content(post_id, content)
+        except BaseException:
+            if staged is not None:
+                staged[0].unlink(missing_ok=True)
+            raise
+        # 提交成功后再替换正文文件: 提交失败时原正文不变, 读者也不会先于元信息看到新正文
+        if staged is not None:
+            tmp_path, path = staged
+            os.replace(tmp_path, path)
+            _content_cache.invalidate(str(path))
+        # 标题、摘要或正文变化时重新索引
+        if content is not None or update_dict.keys() & {"title", "summary"}:
+            await publish_post_changes([post_id])
+
+    async def _stage_content(self, post_id: int, content: str) -> tuple[Path, Path] | None:
+        """
+        将新正文写入正文文件旁的临时文件, 由调用方在提交后替换
+
+        :return: (临时文件, 正文文件), 文章没有正文文件时返回 None
+        """
         # 1. 查出路径
         content_file_path = await self.mapper.get_content_path(self.session, post_id)
         if not content_file_path:
-            return
-        # 2. 写入内容
-        path = Path(content_file_path)
-        if not path.is_absolute():
-            path = path_conf.BLOG_DIR / path
-        self.logger.debug(f"post: {post_id}: 尝试打开内容文件路径: {path}")
-        async with aiofiles.open(str(path), "w", encoding="utf-8") as f:
-            self.logger.debug(f"post: {post_id}: 尝试保存内容")
-            await f.write(content)
+            return None
+        # 2. 写入临时文件
+        path = path_conf.resolve_content_path(content_file_path)
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        self.logger.debug(f"post: {post_id}: 尝试保存内容到临时文件: {tmp_path}")
+        try:
+            async with aiofiles.open(str(tmp_path), "w", encoding="utf-8") as f:
+                await f.write(content)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return tmp_path, path
 
     async def delete_post(self, post_id: int) -> None:
-        await self.mapper.delete(self.session, post_id)
-        await self.mapper.remove_categories(self.session, post_id)
-        await self.mapper.remove_tags(self.session, post_id)
+        async with self.unit_of_work():
+            await self.mapper.delete(self.session, post_id)
+            await self.mapper.remove_categories(self.session, post_id)
+            await self.mapper.remove_tags(self.session, post_id)
+        await PostCounter.forget([post_id])
+        await publish_post_changes([post_id])
 
     async def delete_posts(self, ids: list[int]) -> int:
-        count = await self.mapper.delete_batch(self.session, ids)
-        await self.mapper.remove_categories_batch(self.session, ids)
-        await self.mapper.remove_tags_batch(self.session, ids)
+        async with self.unit_of_work():
+            count = await self.mapper.delete_batch(self.session, ids)
+            await self.mapper.remove_categories_batch(self.session, ids)
+            await self.mapper.remove_tags_batch(self.session, ids)
+        await PostCounter.forget(ids)
+        await publish_post_changes(ids)
         return count
 
     async def update_status(self, post_id: int, status_value: str) -> bool:
@@ -150,12 +326,14 @@ class PostService(BaseService[PostMapper]):
             return None
         return await self._read_content(path)
 
-    async def increment_like_count(self, post_id: int) -> bool:
-        obj = await self.mapper.get_by_id(self.session, post_id)
-        if not obj:
-            return False
-        await self.mapper.update(self.session, post_id, {"like_count": obj.like_count + 1})
-        return True
+    async def like_post(self, post_id: int, voter: str, user_id: int | None = None) -> bool | None:
+        """
+        点赞文章, 同一点赞者重复点赞返回 False, 文章不存在返回 None
+        - 文章是否存在经两级缓存判断, 缓存命中时只访问 Redis
+        """
+        if await self._load_u_post_info(post_id) is None:
+            return None
+        return await PostCounter.like(post_id, voter, user_id)
 
 
 def get_post_service(
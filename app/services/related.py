@@ -0,0 +1,163 @@
+import asyncio
+import heapq
+import time
+from collections import Counter
+from typing import Iterable
+
+from redis.exceptions import RedisError
+
+from app.core import settings
+from app.db.redis import RedisClientManager
+from app.db.session import get_sessionmaker
+from app.repository import get_post_mapper
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 每条 HSET 写入的字段数
+_WRITE_CHUNK = 1000
+# 参与 Jaccard 计算的候选数(top_k 的倍数)
+_CANDIDATE_FACTOR = 4
+
+
+def compute_related(features: dict[int, set[str]], top_k: int, max_feature_posts: int) -> dict[int, list[int]]:
+    """
+    按标签/分类集合的 Jaccard 相似度计算每篇文章最相近的 top_k 篇
+
+    即稀疏矩阵 A·Aᵀ (A 为 文章 x (标签 ∪ 分类) 的 0/1 关联矩阵) 按行计算:
+    对每篇文章, 沿其特征的倒排累加与其他文章的共同特征数, 再换算为 Jaccard 并取 top_k
+    - 包含文章数超过 max_feature_posts 的特征(如大分类)不参与候选生成, 以免计算量随文章数平方增长;
+      但仍计入候选的共同特征数, 候选不足 top_k 时再从这些特征中按 id 倒序(较新的文章)补足
+    - 只对共同特征数最多的 top_k * _CANDIDATE_FACTOR 个候选计算 Jaccard
+    - 相似度相同时 id 较大(较新)的文章靠前
+
+    :param features: 文章 id -> 特征集合("t:<标签 id>", "c:<分类 id>")
+    :return: 文章 id -> 相关文章 id 列表, 没有相关文章的不包含在内
+    """
+    postings: dict[str, list[int]] = {}
+    for post_id in sorted(features):
+        for feature in features[post_id]:
+            postings.setdefault(feature, []).append(post_id)
+
+    related: dict[int, list[int]] = {}
+    for post_id, own in features.items():
+        counts: Counter = Counter()
+        hot = []
+        for feature in own:
+            members = postings[feature]
+            if len(members) > max_feature_posts:
+                hot.append(feature)
+            else:
+                counts.update(members)
+        counts.pop(post_id, None)
+        if len(counts) > top_k * _CANDIDATE_FACTOR:
+            counts = Counter(dict(counts.most_common(top_k * _CANDIDATE_FACTOR)))
+        if hot:
+            for other in counts:
+                counts[other] += sum(feature in features[other] for feature in hot)
+            # 候选不足时从最小的热门特征中补足
+            smallest = min(hot, key=lambda feature: len(postings[feature]))
+            for other in reversed(postings[smallest]):
+                if len(counts) >= top_k:
+                    break
+                if other != post_id and other not in counts:
+                    counts[other] = len(own & features[other])
+        size = len(own)
+        ranked = [(common / (size + len(features[other]) - common), other) for other, common in counts.items()]
+        top = heapq.nlargest(top_k, ranked)
+        if top:
+            related[post_id] = [other for _, other in top]
+    return related
+
+
+class RelatedPosts:
+    """
+    相关文章推荐(预计算):
+    - 后台任务定期全量计算, 结果写入 Redis hash(post_id -> 逗号分隔的相关文章 id), 先写临时 key 再 RENAME 整体替换
+    - 请求路径只需一次 HGET
+    """
+
+    @classmethod
+    async def get(cls, post_id: int) -> list[int]:
+        """文章的相关文章 id, 尚未计算或 Redis 不可用时返回空列表"""
+        try:
+            value = await RedisClientManager.get_client().hget(settings.related.REDIS_KEY, str(post_id))
+        except (RedisError, RuntimeError) as e:
+            logger.warning(f"读取相关文章失败: {e}")
+            return []
+        return [int(i) for i in value.split(",")] if value else []
+
+    @classmethod
+    async def rebuild(cls) -> int:
+        """从数据库读取全部标签/分类关联并重新计算, 返回有相关文章的文章数"""
+        cfg = settings.related
+        async with get_sessionmaker()() as session:
+            tag_pairs, category_pairs = await get_post_mapper().list_feature_pairs(session)
+        features: dict[int, set[str]] = {}
+        for prefix, pairs in (("t", tag_pairs), ("c", category_pairs)):
+            for post_id, feature_id in pairs:
+                features.setdefault(post_id, set()).add(f"{prefix}:{feature_id}")
+        begin = time.perf_counter()
+        related = await asyncio.to_thread(compute_related, features, cfg.TOP_K, cfg.MAX_FEATURE_POSTS)
+        logger.info(f"相关文章计算完成: {len(features)} 篇文章, 耗时 {time.perf_counter() - begin:.2f}s")
+        await cls._store(related.items())
+        return len(related)
+
+    @classmethod
+    async def _store(cls, items: Iterable[tuple[int, list[int]]]) -> None:
+        key = settings.related.REDIS_KEY
+        tmp_key = f"{key}:building"
+        mapping = {str(post_id): ",".join(map(str, ids)) for post_id, ids in items}
+        client = RedisClientManager.get_client()
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.delete(tmp_key)
+            fields = list(mapping.items())
+            for i in range(0, len(fields), _WRITE_CHUNK):
+                pipe.hset(tmp_key, mapping=dict(fields[i:i + _WRITE_CHUNK]))
+            if mapping:
+                pipe.rename(tmp_key, key)
+            else:
+                pipe.delete(key)
+            await pipe.execute()
+
+
+class RelatedPostsBuilder:
+    """
+    相关文章计算后台任务, 由 lifespan 启动与停止
+    - 多个 worker 通过 Redis 锁(SET NX EX)协调, 每个周期只有一个 worker 计算
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="related-posts-builder")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def build_once(self) -> None:
+        try:
+            # 锁在周期结束前自然过期, 不主动释放, 保证整个集群每个周期最多计算一次
+            acquired = await RedisClientManager.get_client().set(
+                settings.related.LOCK_KEY, "1", nx=True, ex=max(1, int(self.interval * 0.9)))
+            if not acquired:
+                return
+            count = await RelatedPosts.rebuild()
+            logger.debug(f"已写入 {count} 篇文章的相关文章")
+        except Exception as e:
+            logger.error(f"相关文章计算失败, 将在下个周期重试: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            await self.build_once()
+            await asyncio.sleep(self.interval)
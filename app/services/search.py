@@ -0,0 +1,230 @@
+import asyncio
+import time
+from collections import deque
+from typing import Iterable, Iterator
+
+from redis.exceptions import RedisError
+
+from app.core import path_conf, settings
+from app.db.invalidation import InvalidationBus
+from app.db.redis import RedisClientManager
+from app.db.session import get_sessionmaker
+from app.repository import get_post_mapper
+from app.search import SearchDocument, SearchEngine, TitleIndex, search_engine, strip_markdown, title_index
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 文章写入事件的主题: {"ids": 新增/修改/删除的文章 id}
+SEARCH_TOPIC = "search"
+# 核对数据库更新时间时容忍的时钟偏差
+_CLOCK_SKEW_SECONDS = 60
+
+
+def _read_documents(rows: Iterable) -> Iterator[SearchDocument]:
+    """逐篇读取正文并去除 markdown 标记, 在构建线程中惰性执行"""
+    for post_id, title, summary, content_file_path in rows:
+        try:
+            body = path_conf.resolve_content_path(content_file_path).read_text(encoding="utf-8")
+        except OSError as e:
+            logger.warning(f"读取文章 {post_id} 正文失败, 仅索引标题与摘要: {e}")
+            body = ""
+        yield SearchDocument(post_id=post_id, title=title, summary=summary or "", body=strip_markdown(body))
+
+
+class SearchIndexer:
+    """
+    搜索索引后台任务, 由 lifespan 启动与停止
+    - 启动时加载索引文件(不存在时在后台全量构建), 并与数据库核对停机期间的变更; 同时从数据库加载标题三元组索引
+    - 文章写入后 notify 的文章 id 在短暂延迟后批量读取, 写入内存增量段与标题索引或记为删除, 数秒内可被检索
+    - 未合并的变更达到数量或时间阈值时, 在后台线程全量重建基础索引(合并), 单次编辑不会触发重建;
+      多个 worker 经 Redis 锁只由一个构建并写入索引文件, 其余 worker 重新加载该文件
+    - 失效广播重新订阅后再次核对, 弥补断开期间丢失的写入事件
+    """
+
+    def __init__(self, engine: SearchEngine = search_engine, titles: TitleIndex = title_index):
+        self.engine = engine
+        self.titles = titles
+        self._lock = asyncio.Lock()
+        self._pending: set[int] = set()
+        # 标题索引加载完成前变更的文章, 加载后重新读取, 避免被加载时读到的旧标题覆盖
+        self._title_backlog: set[int] = set()
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        # (读取数据库的时间, 写入后的序号), 加载其他 worker 构建的索引时据此判断哪些增量已包含在内
+        self._applied: deque[tuple[float, int]] = deque()
+
+    def start(self) -> None:
+        self.engine.load()
+        self._tasks = [
+            asyncio.create_task(self._apply_loop(), name="search-index-apply"),
+            asyncio.create_task(self._merge_loop(), name="search-index-merge"),
+            asyncio.create_task(self._load_titles(), name="search-title-load"),
+        ]
+        self.schedule_reconcile()
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def notify(self, post_ids: Iterable[int]) -> None:
+        """登记需要重新索引的文章(新增、修改或删除), 在事件循环中调用"""
+        self._pending.update(post_ids)
+        if self._pending:
+            self._wakeup.set()
+
+    def schedule_reconcile(self) -> None:
+        if self._tasks:
+            self._tasks.append(asyncio.create_task(self._reconcile(), name="search-index-reconcile"))
+            self._tasks = [task for task in self._tasks if not task.done()]
+
+    async def rebuild(self) -> int:
+        """从数据库与正文文件全量重建基础索引, 返回索引的文章数"""
+        async with self._lock:
+            since = self.engine.seq
+            async with get_sessionmaker()() as session:
+                rows = await get_post_mapper().list_search_sources(session)
+            index = await asyncio.to_thread(self.engine.build, _read_documents(rows))
+            self.engine.install(index, since)
+            self._forget_applied(since)
+            return index.n_docs
+
+    async def reload(self) -> bool:
+        """
+        加载其他 worker 合并写入的索引文件, 文件不比当前基础索引新时返回 False
+        - 该 worker 读取数据库之前(留出时钟偏差)写入的增量已包含在文件中, 丢弃; 之后的增量继续保留
+        """
+        async with self._lock:
+            index = self.engine.load_newer()
+            if index is None:
+                return False
+            threshold = index.built_at - _CLOCK_SKEW_SECONDS
+            since = max((seq for read_at, seq in self._applied if read_at < threshold), default=0)
+            self.engine.install(index, since)
+            self._forget_applied(since)
+            logger.info(f"已加载其他 worker 构建的搜索索引: {index.n_docs} 篇文章")
+            return True
+
+    async def merge(self) -> None:
+        """其他 worker 已写入更新的索引文件时直接加载; 否则取得合并锁后重建, 锁被占用时等待下次检查"""
+        if await self.reload():
+            return
+        try:
+            # 锁在过期前不主动释放: 其余 worker 在下次检查时加载新文件, 而不是紧接着各自重建
+            acquired = await RedisClientManager.get_client().set(
+                settings.search.MERGE_LOCK_KEY, "1", nx=True, ex=settings.search.MERGE_LOCK_TTL_SECONDS)
+        except (RedisError, RuntimeError) as e:
+            # 临时文件按进程区分且替换是原子的, Redis 不可用时各自构建也不会损坏索引文件
+            logger.warning(f"获取搜索索引合并锁失败, 由本 worker 构建: {e}")
+            acquired = True
+        if acquired:
+            await self.rebuild()
+
+    def _forget_applied(self, since: int) -> None:
+        while self._applied and self._applied[0][1] <= since:
+            self._applied.popleft()
+
+    async def apply(self, post_ids: set[int]) -> None:
+        """重新读取文章并写入增量段与标题索引, 数据库中已不存在的记为删除"""
+        read_at = time.time()
+        async with get_sessionmaker()() as session:
+            rows = await get_post_mapper().list_search_sources(session, sorted(post_ids))
+        documents = await asyncio.to_thread(list, _read_documents(rows))
+        for doc in documents:
+            self.engine.upsert(doc)
+        removed = post_ids - {doc.post_id for doc in documents}
+        for post_id in removed:
+            self.engine.remove(post_id)
+        self._applied.append((read_at, self.engine.seq))
+        if not self.titles.ready:
+            self._title_backlog |= post_ids
+            return
+        for doc in documents:
+            self.titles.put(doc.post_id, doc.title)
+        for post_id in removed:
+            self.titles.remove(post_id)
+
+    async def _load_titles(self) -> None:
+        while True:
+            try:
+                async with get_sessionmaker()() as session:
+                    rows = await get_post_mapper().list_titles(session)
+                break
+            except Exception as e:
+                logger.warning(f"加载标题索引失败, 稍后重试: {e}")
+                await asyncio.sleep(settings.search.MERGE_CHECK_INTERVAL_SECONDS)
+        # 加载期间 ready 为 False, apply 不会写入标题索引, 可以放到线程中执行
+        await asyncio.to_thread(self.titles.load, rows)
+        self.notify(self._title_backlog)
+        self._title_backlog = set()
+        logger.info(f"已加载标题索引: {len(self.titles)} 篇文章")
+
+    async def _apply_loop(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            # 合并短时间内的连续写入
+            await asyncio.sleep(settings.search.DELTA_APPLY_DELAY_SECONDS)
+            self._wakeup.clear()
+            post_ids, self._pending = self._pending, set()
+            try:
+                await self.apply(post_ids)
+            except Exception as e:
+                logger.warning(f"更新搜索索引增量失败, 稍后重试: {e}")
+                self.notify(post_ids)
+                await asyncio.sleep(settings.search.MERGE_CHECK_INTERVAL_SECONDS)
+
+    def _should_merge(self) -> bool:
+        if not self.engine.ready:
+            return settings.search.BUILD_ON_STARTUP
+        unmerged = self.engine.unmerged
+        return bool(unmerged) and (unmerged >= settings.search.MERGE_MIN_CHANGES
+                                   or time.time() - self.engine.built_at >= settings.search.MERGE_MAX_AGE_SECONDS)
+
+    async def _merge_loop(self) -> None:
+        while True:
+            if self._should_merge():
+                try:
+                    await self.merge()
+                except Exception as e:
+                    logger.error(f"搜索索引构建失败: {e}")
+            await asyncio.sleep(settings.search.MERGE_CHECK_INTERVAL_SECONDS)
+
+    async def _reconcile(self) -> None:
+        """基础索引构建之后更新过的、索引中缺失的与数据库中已删除的文章重新索引"""
+        built_at = self.engine.built_at
+        if built_at is None:
+            return
+        try:
+            async with get_sessionmaker()() as session:
+                rows = await get_post_mapper().list_update_times(session)
+        except Exception as e:
+            logger.warning(f"核对搜索索引失败: {e}")
+            return
+        known = self.engine.known_ids()
+        threshold = built_at - _CLOCK_SKEW_SECONDS
+        changed = {post_id for post_id, update_time in rows
+                   if post_id not in known or (update_time is not None and update_time.timestamp() > threshold)}
+        self.notify(changed | (known - {post_id for post_id, _ in rows}))
+
+
+search_indexer = SearchIndexer()
+
+
+async def publish_post_changes(post_ids: Iterable[int]) -> None:
+    """文章写入提交后调用: 本进程立即登记, 并广播给其他 worker"""
+    post_ids = sorted(set(post_ids))
+    if not post_ids:
+        return
+    search_indexer.notify(post_ids)
+    await InvalidationBus.publish(SEARCH_TOPIC, {"ids": post_ids})
+
+
+async def _on_resync() -> None:
+    # 不在此等待数据库查询, 以免数据库故障影响失效广播的健康状态
+    search_indexer.schedule_reconcile()
+
+
+InvalidationBus.subscribe(SEARCH_TOPIC, lambda event: search_indexer.notify(event["ids"]))
+InvalidationBus.on_resync(_on_resync)
@@ -5,17 +5,18 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repository import TagMapper, get_tag_mapper
 from app.db.session import get_session
+from app.model.orm.models import Tag
 from app.model.vo import TagVO
-from app.services.base import BaseService
+from app.services.base import BaseService, cached
 
 
 class TagService(BaseService[TagMapper]):
     def __init__(self, session: AsyncSession, mapper):
         super().__init__(session, mapper)
 
-    async def list_all(self) -> List[TagVO | dict]:
-        items = await self.mapper.list_all(self.session)
-        return [TagVO.model_validate(i).model_dump() for i in items]
+    @cached("tag:all", List[TagVO], depends_on=(Tag.__tablename__,))
+    async def list_all(self) -> List[TagVO]:
+        return await self.mapper.list_all(self.session)
     
     async def paginated_tags(self, current: int, size: int) -> (List[TagVO | dict], int):
         items, total = await self.mapper.paginate(self.session, current, size)
@@ -2,17 +2,18 @@ from fastapi import Depends
 
 from app.db.session import AsyncSession, get_session
 from app.model.entity import Timeline
+from app.model.orm.models import Timeline as TimelineORM
 from app.repository import TimelineMapper, get_timeline_mapper
 
-from .base import BaseService
+from .base import BaseService, cached
 
 class TimelineService(BaseService[TimelineMapper]):
     def __init__(self, session: AsyncSession, mapper):
         super().__init__(session, mapper)
 
-    async def list_all(self) -> list[Timeline | dict]:
-        items = await self.mapper.list_all(self.session)
-        return items
+    @cached("timeline:all", list[Timeline], depends_on=(TimelineORM.__tablename__,))
+    async def list_all(self) -> list[Timeline]:
+        return await self.mapper.list_all(self.session)
 
 
 def get_timeline_service(session: AsyncSession = Depends(get_session), 
@@ -29,7 +29,7 @@ class UserService(BaseService[UserMapper]):
         """
         # 构造user对象
         user = User(**userRegisterDTO.model_dump())
-        user.password_hash = PasswordUtil.get_password_hash(userRegisterDTO.password)
+        user.password_hash = await PasswordUtil.get_password_hash_async(userRegisterDTO.password)
         user.id = await self.mapper.create(self.session, user)
         return user.id
 
@@ -48,7 +48,7 @@ class UserService(BaseService[UserMapper]):
             raise AuthenticationException("用户名或密码错误")
 
         # 验证密码并自动升级哈希
-        ok, new_hash = PasswordUtil.verify_and_upgrade(login_request.password, user.password_hash)
+        ok, new_hash = await PasswordUtil.verify_and_upgrade_async(login_request.password, user.password_hash)
         if not ok:
             self.logger.warning("认证失败：密码错误 username=%s", login_request.username)
             raise AuthenticationException("用户名或密码错误")
@@ -66,11 +66,11 @@ class UserService(BaseService[UserMapper]):
             refreshToken=refresh
         )
 
-    def logout(self, token: str) -> None:
+    async def logout(self, token: str) -> None:
         """
         登出：撤销令牌（加入黑名单直到过期）
         """
-        ok = JwtUtil.revoke_token(token)
+        ok = await JwtUtil.revoke_token(token)
         if ok:
             self.logger.info("用户登出成功，令牌已撤销")
         else:
@@ -85,7 +85,7 @@ class UserService(BaseService[UserMapper]):
         """
         # 创建用户
         user = User(**req.model_dump(exclude={"password"}))
-        user.password_hash = PasswordUtil.get_password_hash(req.password)
+        user.password_hash = await PasswordUtil.get_password_hash_async(req.password)
         await self.mapper.create(self.session, user)
         return user.id
     
@@ -127,16 +127,17 @@ class UserService(BaseService[UserMapper]):
         user = await self.mapper.get_by_id(self.session, user_id)
         if not user:
             raise AuthenticationException("用户不存在")
-        ok, _ = PasswordUtil.verify_and_upgrade(req.old_password, user.password_hash)
+        ok, _ = await PasswordUtil.verify_and_upgrade_async(req.old_password, user.password_hash)
         if not ok:
             raise AuthenticationException("旧密码错误")
-        new_hash = PasswordUtil.get_password_hash(req.new_password)
+        new_hash = await PasswordUtil.get_password_hash_async(req.new_password)
         await self.mapper.update(self.session, user_id, {"password_hash": new_hash})
 
-    def refresh_tokens(self, refresh_token: str) -> UserLoginResponse:
-        access, refresh = JwtUtil.refresh_token_pair(refresh_token)
-        if not access or not refresh:
+    async def refresh_tokens(self, refresh_token: str) -> UserLoginResponse:
+        pair = await JwtUtil.refresh_token_pair(refresh_token)
+        if not pair:
             raise AuthenticationException("刷新令牌无效或已过期")
+        access, refresh = pair
         return UserLoginResponse(token=access, refreshToken=refresh)
 
     async def update_user_status(self, user_id: int, status: UpdateUserStatus) -> UserInfoVO:
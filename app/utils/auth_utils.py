@@ -1,15 +1,24 @@
+import asyncio
+import hashlib
+from collections import OrderedDict
 from datetime import timedelta
 from typing import Optional
 import jwt
+from redis.exceptions import RedisError
 
 from app.core import settings
 import uuid
 import time
 from app.model import JwtPayload
-from app.db.redis import get_redis
+from app.db.invalidation import InvalidationBus
+from app.db.redis import RedisClientManager, breaker
 from app.utils.logger import get_logger
+from app.utils.metrics import register_metrics
 
+# 本进程已知的已撤销令牌 jti -> exp, 经失效广播与其他 worker 保持同步
 _REVOKED_JTIS: dict[str, int] = {}
+# 令牌撤销事件的广播主题: {"jti": ..., "exp": ...}
+REVOKED_TOPIC = "jwt_revoked"
 
 def _now_ts() -> int:
     return int(time.time())
@@ -33,33 +42,172 @@ def _exp_ts(expires_delta: Optional[timedelta], default_minutes: int) -> int:
 def _revoke_key(jti: str) -> str:
     return f"{settings.jwt.JWT_REVOKE_PREFIX}{jti}"
 
-async def _register_jti_revocation(jti: str, exp_ts: int) -> None:
-    ttl = max(exp_ts - _now_ts(), 0)
-    client = await get_redis()
-    if client is not None:
-        try:
-            await client.setex(_revoke_key(jti), ttl, "1")
-        except RuntimeError:
-            expired = [k for k, v in _REVOKED_JTIS.items() if v <= _now_ts()]
-            for k in expired:
-                _REVOKED_JTIS.pop(k, None)
-            _REVOKED_JTIS[jti] = exp_ts
+def _remember_revoked(jti: str, exp_ts: int) -> None:
+    """记录到本地撤销镜像, 顺带清理已过期的条目"""
+    now = _now_ts()
+    if exp_ts <= now:
+        return
+    if len(_REVOKED_JTIS) >= settings.jwt.REVOKED_MIRROR_PURGE_SIZE:
+        for k in [k for k, v in _REVOKED_JTIS.items() if v <= now]:
+            _REVOKED_JTIS.pop(k, None)
+    _REVOKED_JTIS[jti] = exp_ts
+
+def _on_revoked_event(event: dict) -> None:
+    _remember_revoked(event["jti"], int(event["exp"]))
+
+async def _resync_revoked() -> None:
+    """(重新)订阅失效广播后从 Redis 全量加载撤销记录, 弥补断开期间丢失的事件"""
+    client = RedisClientManager.get_client()
+    prefix = settings.jwt.JWT_REVOKE_PREFIX
+    keys = [key async for key in client.scan_iter(match=f"{prefix}*", count=1000)]
+    if not keys:
+        return
+    async with client.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.ttl(key)
+        ttls = await pipe.execute()
+    now = _now_ts()
+    for key, ttl in zip(keys, ttls):
+        if ttl > 0:
+            _remember_revoked(key[len(prefix):], now + ttl)
+
+InvalidationBus.subscribe(REVOKED_TOPIC, _on_revoked_event)
+InvalidationBus.on_resync(_resync_revoked)
+
+# 待写入 Redis 的撤销记录 (jti, exp, 等待写入结果的 future), 同一轮事件循环内的并发撤销合并为一次管道往返
+_pending_revocations: list[tuple[str, int, asyncio.Future]] = []
+_revocation_flush: Optional[asyncio.Task] = None
+
+async def _flush_revocations() -> None:
+    global _revocation_flush
+    # 让出一次事件循环, 收集同一轮内并发提交的撤销
+    await asyncio.sleep(0)
+    batch = list(_pending_revocations)
+    _pending_revocations.clear()
+    _revocation_flush = None
+
+    now = _now_ts()
+    live = [(jti, exp_ts) for jti, exp_ts, _ in batch if exp_ts > now]
+    persisted = False
+    try:
+        if live:
+            async with RedisClientManager.get_client().pipeline(transaction=False) as pipe:
+                for jti, exp_ts in live:
+                    pipe.setex(_revoke_key(jti), exp_ts - now, "1")
+                await pipe.execute()
+            await InvalidationBus.publish(REVOKED_TOPIC, *({"jti": jti, "exp": exp_ts} for jti, exp_ts in live))
+        persisted = True
+    except (RedisError, RuntimeError) as e:
+        JwtUtil.logger.error(f"写入 {len(live)} 条令牌撤销记录失败, 仅在本进程生效: {e}")
+    finally:
+        for _, _, future in batch:
+            if not future.done():
+                future.set_result(persisted)
+
+async def _register_jti_revocation(jti: str, exp_ts: int) -> bool:
+    """
+    撤销 jti 直到 exp_ts: 立即写入本地撤销镜像, 再与并发的撤销合并为一次 SETEX 管道写入 Redis 并广播
+
+    :return: 是否已写入 Redis(为 False 时撤销仅在本进程生效)
+    """
+    global _revocation_flush
+    _remember_revoked(jti, exp_ts)
+    if exp_ts <= _now_ts():
+        return True
+    future = asyncio.get_running_loop().create_future()
+    _pending_revocations.append((jti, exp_ts, future))
+    if _revocation_flush is None or _revocation_flush.done():
+        _revocation_flush = asyncio.create_task(_flush_revocations())
+    return await future
+
+def _revoked_locally(jti: str) -> bool:
+    exp_ts = _REVOKED_JTIS.get(jti)
+    return exp_ts is not None and exp_ts > _now_ts()
+
+async def _claim_jti(jti: str, exp_ts: int) -> bool:
+    """
+    原子地撤销 jti(SET NX EXAT), 返回是否由本次调用撤销, 用于刷新令牌的一次性使用
+    - 并发的重复使用(包括不同 worker)中只有一个调用返回 True
+    - Redis 不可用时退回本地撤销镜像, 此时只在本进程内保证一次性
+    """
+    if _revoked_locally(jti):
+        return False
+    try:
+        claimed = await RedisClientManager.get_client().set(_revoke_key(jti), "1", nx=True, exat=exp_ts)
+    except (RedisError, RuntimeError) as e:
+        JwtUtil.logger.error(f"写入令牌撤销记录失败, 仅在本进程生效: {e}")
+        # 检查与写入之间没有 await, 本进程内的并发调用不会同时通过
+        if _revoked_locally(jti):
+            return False
+        _remember_revoked(jti, exp_ts)
+        return True
+    _remember_revoked(jti, exp_ts)
+    if not claimed:
+        return False
+    await InvalidationBus.publish(REVOKED_TOPIC, {"jti": jti, "exp": exp_ts})
+    return True
 
 async def is_token_revoked(jti: str) -> bool:
-    start = time.perf_counter()
-    client = await get_redis()
-    end = time.perf_counter()
-    JwtUtil.logger.debug(f"获取 Redis 客户端耗时: {end - start:.6f} 秒")
-    if client is not None:
-        try:
-            revoked = bool(await client.exists(_revoke_key(jti)))
-            return revoked
-        except RuntimeError:
-            JwtUtil.logger.error(f"redis操作失败")
-            exp_ts = _REVOKED_JTIS.get(jti)
-            return exp_ts is not None and exp_ts > _now_ts()
+    """
+    令牌是否已撤销
+    - 先查本地撤销镜像; 失效广播处于订阅状态时镜像与 Redis 一致, 未命中即可判定未撤销, 无需网络往返
+    - 未订阅时回退到 Redis EXISTS, Redis 不可用或熔断时以本地镜像为准
+    """
+    if _revoked_locally(jti):
+        return True
+    if InvalidationBus.healthy():
+        return False
+    if breaker.is_open:
+        # Redis 熔断期间不再等待网络超时, 以本地镜像为准
+        return False
+    try:
+        return bool(await RedisClientManager.get_client().exists(_revoke_key(jti)))
+    except (RedisError, RuntimeError) as e:
+        JwtUtil.logger.error(f"redis操作失败: {e}")
+        return False
+
+
+class TokenCache:
+    """
+    已验签令牌的进程内缓存: 令牌 SHA-256 摘要 -> (exp, jti, JwtPayload)
+    - 条目在令牌 exp 时过期, 容量超出上限时淘汰最久未使用的条目
+    - 只缓存验签与解码结果, 撤销状态每次仍需检查
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[int, str | None, JwtPayload]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, key: bytes) -> tuple[str | None, JwtPayload] | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= _now_ts():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1], entry[2]
 
-    raise ConnectionError("redis连接失败")
+    def put(self, key: bytes, exp_ts: int, jti: str | None, payload: JwtPayload) -> None:
+        self._entries[key] = (exp_ts, jti, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries),
+                "revoked_jtis": len(_REVOKED_JTIS)}
+
+
+_token_cache = TokenCache(settings.jwt.TOKEN_CACHE_MAX_ENTRIES)
+register_metrics("token_cache", _token_cache.stats)
 
 
 class JwtUtil:
@@ -135,19 +283,24 @@ class JwtUtil:
         return payload, None
 
     @staticmethod
-    def validate_access_token(token: str) -> Optional[JwtPayload]:
+    async def validate_access_token(token: str) -> Optional[JwtPayload]:
         payload = JwtUtil.decode_token(token, expected_type="access")
         if not payload:
             return None
         jti = payload.get("jti")
         if not isinstance(jti, str):
             return None
-        if is_token_revoked(jti):
+        if await is_token_revoked(jti):
             return None
         return JwtPayload(**payload)
 
     @staticmethod
-    def revoke_token(token: str) -> bool:
+    async def revoke_token(token: str) -> bool:
+        """
+        撤销令牌直到其过期, 并发的撤销合并为一次 Redis 管道写入
+
+        :return: 令牌有效且已撤销时返回 True
+        """
         payload = JwtUtil.decode_token(token)
         if not payload:
             return False
@@ -155,7 +308,7 @@ class JwtUtil:
         exp = payload.get("exp")
         if not isinstance(jti, str) or not isinstance(exp, int):
             return False
-        _register_jti_revocation(jti, exp)
+        await _register_jti_revocation(jti, exp)
         return True
 
     @staticmethod
@@ -165,24 +318,37 @@ class JwtUtil:
         return access, refresh
 
     @staticmethod
-    def refresh_token_pair(refresh_token: str) -> Optional[tuple[str, str]]:
+    async def refresh_token_pair(refresh_token: str) -> Optional[tuple[str, str]]:
+        """
+        刷新令牌轮换: 旧刷新令牌撤销后签发新的令牌对, 已撤销的刷新令牌不能再次使用
+        - 撤销与检查是同一个原子操作, 同一刷新令牌的并发重放只有一个能换到新的令牌对
+        """
         payload = JwtUtil.decode_token(refresh_token, expected_type="refresh")
         if not payload:
             return None
-        JwtUtil.revoke_token(refresh_token)
+        jti = payload.get("jti")
+        if not isinstance(jti, str) or not await _claim_jti(jti, payload["exp"]):
+            return None
         base = JwtPayload(**payload)
         return JwtUtil.issue_token_pair(base)
 
     @staticmethod
     async def get_payload(token: str) -> JwtPayload | None:
-        # 解码令牌
-        payload, reason = JwtUtil.decode_with_reason(token, expected_type="access")
-        if reason:
-            JwtUtil.logger.info(f"decode token {token} with reason {reason}")
-        if not payload:
+        key = TokenCache.digest(token)
+        cached = _token_cache.get(key)
+        if cached is not None:
+            jti, jwt_payload = cached
+        else:
+            # 解码令牌
+            payload, reason = JwtUtil.decode_with_reason(token, expected_type="access")
+            if reason:
+                JwtUtil.logger.info(f"decode token {token} with reason {reason}")
+            if not payload:
+                return None
+            jti = payload.get("jti") if isinstance(payload.get("jti"), str) else None
+            jwt_payload = JwtPayload(**payload)
+            _token_cache.put(key, payload["exp"], jti, jwt_payload)
+        if jti and await is_token_revoked(jti):
             return None
-        jti = payload.get("jti")
-        if isinstance(jti, str) and await is_token_revoked(jti):
-            return None
-        return JwtPayload(**payload)
+        return jwt_payload
 
@@ -1,16 +1,70 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, TypeVar
+
 from argon2 import PasswordHasher
-import argon2
 from argon2.exceptions import VerifyMismatchError, VerificationError, InvalidHash
 
-argon2.DEFAULT_MEMORY_COST
-# 参数说明（可按实际硬件/安全需求调节）:
-# RFC_9106_LOW_MEMORY默认参数
+from app.core import settings
+from app.handler.exception_handlers import ServiceBusyException
+from app.utils.metrics import register_metrics
+
+T = TypeVar("T")
+
+# 参数说明（可按实际硬件/安全需求调节, 推荐用 scripts/tune_argon2.py 在部署机上测出后写入配置）:
+# 默认值为 RFC_9106_LOW_MEMORY 参数
 # - time_cost: 迭代次数（更高更慢更安全）3
 # - memory_cost: 使用内存 KB（例如 64*1024 = 65536 KB = 64 MB）
 # - parallelism: 并行线程数 4
 # - hash_len: 输出哈希长度（字节） 32
 # - salt_len: 盐长度（字节）16
-pw_hasher = PasswordHasher()
+# 调整参数后, 旧哈希在用户下次登录时经 verify_and_upgrade 透明升级为新参数
+pw_hasher = PasswordHasher(
+    time_cost=settings.password.ARGON2_TIME_COST,
+    memory_cost=settings.password.ARGON2_MEMORY_COST,
+    parallelism=settings.password.ARGON2_PARALLELISM,
+)
+
+# argon2 运算在线程池中执行(argon2-cffi 计算期间释放 GIL), 避免阻塞事件循环
+_executor = ThreadPoolExecutor(max_workers=settings.password.WORKERS, thread_name_prefix="argon2")
+_pool_stats = {"pending": 0, "rejected": 0}
+_pool_lock = threading.Lock()
+register_metrics("password_pool", lambda: {**_pool_stats, "workers": settings.password.WORKERS,
+                                           "max_pending": settings.password.MAX_PENDING})
+
+
+async def _run_in_pool(fn: Callable[..., T], *args) -> T:
+    """
+    在密码线程池中执行, 排队 + 执行中的任务数达到上限时立即抛出 ServiceBusyException(503)
+    - pending 在线程池任务结束(或排队中被取消)时才减少: 等待方被取消(如客户端断开)时,
+      已开始的 argon2 运算仍占用线程, 不能提前释放名额
+    """
+    with _pool_lock:
+        if _pool_stats["pending"] >= settings.password.MAX_PENDING:
+            _pool_stats["rejected"] += 1
+            raise ServiceBusyException()
+        _pool_stats["pending"] += 1
+    try:
+        future = _executor.submit(fn, *args)
+    except BaseException:
+        _release_slot()
+        raise
+    future.add_done_callback(_release_slot)
+    return await asyncio.wrap_future(future)
+
+
+def _release_slot(_: Future | None = None) -> None:
+    # 完成回调在线程池线程中执行, 与事件循环中的计数共用一把锁
+    with _pool_lock:
+        _pool_stats["pending"] -= 1
+
+
+def shutdown_password_pool() -> None:
+    """关闭密码线程池(应用关闭时调用)"""
+    _executor.shutdown(wait=False, cancel_futures=True)
+
+
 class PasswordUtil:
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -70,3 +124,12 @@ class PasswordUtil:
             return True, PasswordUtil.get_password_hash(plain_password)
         return True, None
 
+    @staticmethod
+    async def get_password_hash_async(password: str) -> str:
+        """get_password_hash 的异步版本, 在密码线程池中执行"""
+        return await _run_in_pool(PasswordUtil.get_password_hash, password)
+
+    @staticmethod
+    async def verify_and_upgrade_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """verify_and_upgrade 的异步版本, 在密码线程池中执行"""
+        return await _run_in_pool(PasswordUtil.verify_and_upgrade, plain_password, hashed_password)
@@ -0,0 +1,14 @@
+from typing import Any, Callable
+
+# 进程内指标源注册表: 名称 -> 返回当前指标快照的函数
+_METRIC_SOURCES: dict[str, Callable[[], dict[str, Any]]] = {}
+
+
+def register_metrics(name: str, source: Callable[[], dict[str, Any]]) -> None:
+    """注册一个指标源, 重复注册同名指标源会覆盖旧的"""
+    _METRIC_SOURCES[name] = source
+
+
+def collect_metrics() -> dict[str, dict[str, Any]]:
+    """收集当前 worker 所有已注册指标源的快照"""
+    return {name: source() for name, source in _METRIC_SOURCES.items()}
@@ -0,0 +1,22 @@
+import base64
+import binascii
+from datetime import datetime
+
+from app.handler.exception_handlers import InvalidCursorException
+
+
+def encode_cursor(create_time: datetime, id: int) -> str:
+    """将排序键 (create_time, id) 编码为不透明的分页游标"""
+    raw = f"{create_time.isoformat()}|{id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """解析分页游标, 格式非法时抛出 InvalidCursorException"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        create_time, id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(create_time), int(id)
+    except (ValueError, UnicodeError, binascii.Error):
+        raise InvalidCursorException()
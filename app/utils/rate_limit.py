@@ -0,0 +1,184 @@
+import hashlib
+import ipaddress
+import math
+import time
+import uuid
+from collections import OrderedDict
+from typing import Sequence
+
+from fastapi import Request
+from redis.exceptions import RedisError
+from starlette.datastructures import Headers
+from starlette.types import Scope
+
+from app.core import settings
+from app.db.redis import RedisClientManager
+from app.handler.exception_handlers import TooManyRequestsException
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 多键滑动窗口(ZSET, 成员为每次请求, 分值为毫秒时间戳), 所有键都未超限时才记录本次请求
+# KEYS: 各限流键; ARGV[1]: 窗口(毫秒), ARGV[2]: 本次请求成员, ARGV[3..]: 与 KEYS 一一对应的次数上限
+# 返回 0 表示放行, 否则返回需要等待的毫秒数
+_SLIDING_WINDOW_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local window = tonumber(ARGV[1])
+local wait = 0
+for i, key in ipairs(KEYS) do
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= tonumber(ARGV[i + 2]) then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        wait = math.max(wait, tonumber(oldest[2]) + window - now)
+    end
+end
+if wait > 0 then
+    return wait
+end
+for _, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[2])
+    redis.call('PEXPIRE', key, window)
+end
+return 0
+"""
+
+
+# 令牌桶(Hash: tokens, ts), 按经过的时间补充令牌后尝试取走一个
+# KEYS[1]: 桶键; ARGV[1]: 每秒补充的令牌数, ARGV[2]: 桶容量
+# 返回 {是否放行, 剩余令牌数(字符串, 保留小数)}
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+return {allowed, tostring(tokens)}
+"""
+
+
+class LocalTokenBuckets:
+    """进程内令牌桶, Redis 不可用时兜底(此时预算按 worker 计算), 按最久未使用淘汰"""
+
+    def __init__(self, max_buckets: int):
+        self.max_buckets = max_buckets
+        # key -> (tokens, 上次更新的 monotonic 时间)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def take(self, key: str, rate: float, burst: int) -> tuple[bool, float]:
+        now = time.monotonic()
+        tokens, ts = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - ts) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+        return allowed, tokens
+
+
+_local_buckets = LocalTokenBuckets(settings.rate_limit.LOCAL_MAX_BUCKETS)
+
+
+async def token_bucket_take(key: str, rate: float, burst: int) -> tuple[bool, float]:
+    """
+    从令牌桶取走一个令牌, 一次 Redis 往返; Redis 不可用时使用进程内令牌桶
+
+    :return: (是否放行, 剩余令牌数)
+    """
+    try:
+        allowed, tokens = await RedisClientManager.get_client().eval(_TOKEN_BUCKET_LUA, 1, key, rate, burst)
+        return bool(allowed), float(tokens)
+    except (RedisError, RuntimeError) as e:
+        logger.debug(f"令牌桶 {key} 退回进程内计数: {e}")
+        return _local_buckets.take(key, rate, burst)
+
+
+IPNetwork = ipaddress.IPv4Network | ipaddress.IPv6Network
+
+_trusted_proxies: tuple[IPNetwork, ...] = tuple(
+    ipaddress.ip_network(entry, strict=False) for entry in settings.app.TRUSTED_PROXIES)
+
+
+def _is_trusted_proxy(ip: ipaddress.IPv4Address | ipaddress.IPv6Address, trusted: Sequence[IPNetwork]) -> bool:
+    return any(ip in network for network in trusted)
+
+
+def resolve_client_ip(scope: Scope, trusted: Sequence[IPNetwork] | None = None) -> str:
+    """
+    解析客户端 IP
+    - 直连地址不是可信代理(APP_TRUSTED_PROXIES)时直接使用直连地址, X-Forwarded-For 可由客户端伪造
+    - 否则沿 X-Forwarded-For 自右向左跳过可信代理, 取第一个不可信的地址; 遇到无法解析的地址时
+      停止, 使用最后一个可信代理的地址
+
+    :param trusted: 可信代理网段, 默认取 APP_TRUSTED_PROXIES
+    """
+    trusted = _trusted_proxies if trusted is None else trusted
+    client = scope.get("client")
+    peer = client[0] if client else "unknown"
+    try:
+        current = ipaddress.ip_address(peer)
+    except ValueError:
+        return peer
+    if not _is_trusted_proxy(current, trusted):
+        return peer
+    hops = [hop.strip() for value in Headers(scope=scope).getlist("x-forwarded-for") for hop in value.split(",")]
+    for hop in reversed(hops):
+        try:
+            current = ipaddress.ip_address(hop)
+        except ValueError:
+            break
+        if not _is_trusted_proxy(current, trusted):
+            break
+    return str(current)
+
+
+def get_client_ip(request: Request) -> str:
+    return resolve_client_ip(request.scope)
+
+
+async def sliding_window_hit(limits: dict[str, int], window_seconds: int) -> int:
+    """
+    在滑动窗口内为每个键记录一次请求
+
+    :param limits: 限流键 -> 窗口内允许的次数
+    :return: 0 表示放行, 否则为需要等待的秒数(向上取整); Redis 不可用时放行
+    """
+    try:
+        wait_ms = await RedisClientManager.get_client().eval(
+            _SLIDING_WINDOW_LUA, len(limits), *limits,
+            window_seconds * 1000, uuid.uuid4().hex, *limits.values(),
+        )
+    except (RedisError, RuntimeError) as e:
+        logger.warning(f"限流检查失败, 本次放行: {e}")
+        return 0
+    return math.ceil(int(wait_ms) / 1000)
+
+
+async def throttle_login(username: str, client_ip: str) -> None:
+    """
+    登录限流: 按用户名与客户端 IP 分别计数, 任一超限即抛出 TooManyRequestsException(429 + Retry-After)
+    - 在密码校验之前执行, 撞库请求不会消耗数据库查询与 argon2 计算
+    """
+    cfg = settings.rate_limit
+    # 用户名来自请求体, 取摘要作为键, 避免超长或特殊字符
+    user_digest = hashlib.sha256(username.strip().lower().encode()).hexdigest()[:32]
+    retry_after = await sliding_window_hit({
+        f"{cfg.LOGIN_KEY_PREFIX}user:{user_digest}": cfg.LOGIN_MAX_PER_USERNAME,
+        f"{cfg.LOGIN_KEY_PREFIX}ip:{client_ip}": cfg.LOGIN_MAX_PER_IP,
+    }, cfg.LOGIN_WINDOW_SECONDS)
+    if retry_after:
+        logger.warning(f"登录尝试过于频繁 ip={client_ip}, {retry_after} 秒后可重试")
+        raise TooManyRequestsException(retry_after)
@@ -7,20 +7,25 @@ from app.api.v1.user import users_router
 from app.utils.logger import setup_logging
 from app.handler.exception_handlers import register_exception_handlers
 from app.middleware.auth_middleware import AuthMiddleware
+from app.middleware.rate_limit_middleware import RateLimitMiddleware
 from app.core.lifespan import lifespan
+from app.api.routing import FastJSONResponse
 from fastapi.openapi.utils import get_openapi
 
 
 # 初始化日志
 setup_logging()
 
-app = FastAPI(lifespan=lifespan)
+# 默认响应类: pydantic-core 直接序列化为 bytes
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # 注册全局异常处理器
 register_exception_handlers(app)
 
 # 注册鉴权中间件
 app.add_middleware(AuthMiddleware)
+# 注册限流中间件(后注册的在外层, 先于鉴权执行)
+app.add_middleware(RateLimitMiddleware)
 
 # origins = [
 #     "http://localhost",
@@ -0,0 +1,147 @@
+"""
+鉴权中间件基准测试: 原 BaseHTTPMiddleware 实现 vs 纯 ASGI 实现
+
+直接以 ASGI 调用驱动一个最小应用, 不经过网络与服务器, 只衡量中间件本身的开销;
+令牌撤销检查使用本地镜像(模拟失效广播已订阅), 不依赖 Redis:
+    python scripts/bench_auth_middleware.py --requests 20000
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Iterable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+
+from app.core import BizCode, BizMsg
+from app.db.invalidation import InvalidationBus
+from app.middleware.auth_middleware import AuthMiddleware
+from app.model import Result
+from app.model.orm.field_enum import Role
+from app.utils.auth_utils import JwtUtil
+from app.utils.user_context import UserContext, clear_user_context, get_user_context, set_user_context
+
+
+def _starts_with(path: str, prefixes: Iterable[str]) -> bool:
+    return any(path.startswith(p) for p in prefixes)
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    """优化前的实现(日志级别除外), 作为对照组"""
+
+    def __init__(self, app) -> None:
+        super().__init__(app)
+        self.admin_prefixes = ["/api/v1/admin"]
+        self.protected_prefixes = ["/api/v1/users/bloguser", "/api/v1/auth/logout", "/api/v1/auth/password"]
+        self.protected_post_prefixes = ["/api/v1/users/comment"]
+        self.public_paths = ["/api/v1/auth/login", "/api/v1/auth/refresh"]
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        path = request.url.path
+        if path in self.public_paths:
+            return await call_next(request)
+        require_admin = _starts_with(path, self.admin_prefixes)
+        require_user = _starts_with(path, self.protected_prefixes)
+        if request.method.upper() == "POST" and _starts_with(path, self.protected_post_prefixes):
+            require_user = True
+        if not require_admin and not require_user:
+            return await call_next(request)
+        auth = request.headers.get("Authorization")
+        if not auth:
+            return JSONResponse(status_code=401, content=Result.failure(
+                msg=BizMsg.TOKEN_REQUIRED, code=BizCode.TOKEN_REQUIRED).model_dump())
+        token = auth.split(" ", 1)[1].strip() if auth.startswith("Bearer ") else auth
+        payload = await JwtUtil.get_payload(token)
+        if not payload:
+            return JSONResponse(status_code=401, content=Result.failure(
+                msg=BizMsg.TOKEN_INVALID, code=BizCode.TOKEN_INVALID).model_dump())
+        if require_admin and payload.role not in [Role.ADMIN.value, Role.SUPER.value]:
+            return JSONResponse(content=Result.failure(msg=BizMsg.FORBIDDEN, code=BizCode.FORBIDDEN).model_dump(),
+                                status_code=403)
+        set_user_context(UserContext(user_id=payload.user_id, username=payload.username,
+                                     role=payload.role, token=token))
+        try:
+            return await call_next(request)
+        finally:
+            clear_user_context()
+
+
+async def _endpoint(request: Request) -> Response:
+    ctx = get_user_context()
+    return PlainTextResponse(ctx.username if ctx else "anonymous")
+
+
+def _build_app(middleware_cls) -> Starlette:
+    app = Starlette(routes=[
+        Route("/api/v1/admin/articles", _endpoint),
+        Route("/api/v1/user/articles", _endpoint),
+    ])
+    app.add_middleware(middleware_cls)
+    return app
+
+
+async def _call(app, path: str, headers: list[tuple[bytes, bytes]]) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": headers, "client": ("127.0.0.1", 12345), "server": ("127.0.0.1", 8000),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def _bench(app, path: str, headers, requests: int) -> tuple[float, float]:
+    # 预热: 构建中间件栈, 填充令牌缓存
+    for _ in range(200):
+        await _call(app, path, headers)
+    samples = []
+    for _ in range(requests):
+        begin = time.perf_counter()
+        await _call(app, path, headers)
+        samples.append((time.perf_counter() - begin) * 1_000_000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    # 视为失效广播已订阅: 撤销检查只查本地镜像
+    InvalidationBus._healthy = True
+    token = JwtUtil.create_access_token({"user_id": 1, "username": "bench", "role": Role.ADMIN.value})
+    auth_headers = [(b"authorization", f"Bearer {token}".encode())]
+    cases = [
+        ("admin (token)", "/api/v1/admin/articles", auth_headers),
+        ("admin (no token)", "/api/v1/admin/articles", []),
+        ("public", "/api/v1/user/articles", []),
+    ]
+    apps = {"BaseHTTPMiddleware": _build_app(LegacyAuthMiddleware), "pure ASGI": _build_app(AuthMiddleware)}
+    print(f"{'case':<18} | {'middleware':<18} | {'p50 (us)':>9} | {'p99 (us)':>9}")
+    for name, path, headers in cases:
+        for label, app in apps.items():
+            p50, p99 = await _bench(app, path, headers, args.requests)
+            print(f"{name:<18} | {label:<18} | {p50:>9.1f} | {p99:>9.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""
+/articles/pagination 响应序列化基准测试: FastAPI 默认流程 vs ResultRoute + FastJSONResponse
+
+以真实的接口函数构建两个应用, PostService 替换为返回固定分页数据的桩, 不依赖数据库与 Redis;
+直接以 ASGI 调用驱动, 只衡量校验与序列化本身的开销, 并确认两者输出的 JSON 一致:
+    python scripts/bench_json_response.py --requests 3000 --size 10
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+from app.api.routing import FastJSONResponse, ResultRoute
+from app.api.v1.user import ArticleController
+from app.model.common import PaginatedResponse
+from app.services.post import get_post_service
+
+
+class _StubPostService:
+    def __init__(self, size: int):
+        now = datetime(2025, 1, 1, 12, 0, 0)
+        # 与 PostMapper.paginate_cards 返回的行结构一致
+        self.rows = [{
+            "id": i, "title": f"文章标题 {i}", "summary": "摘要" * 40, "author_name": "cattle",
+            "tag_names": "Python,FastAPI,Redis", "category_names": "后端,性能",
+            "create_time": now - timedelta(days=i), "update_time": now, "view_count": 1000 + i,
+            "like_count": i, "category_ids": "1,2",
+        } for i in range(size)]
+
+    async def paginated_card_info(self, page, size, category_id=None, tag_id=None):
+        return PaginatedResponse(total=100, records=self.rows, current=page, size=size)
+
+
+def _build_app(route_class, response_class, size: int) -> FastAPI:
+    router = APIRouter(prefix="/articles", route_class=route_class)
+    route = next(r for r in ArticleController.router.routes if r.path == "/articles/pagination")
+    router.add_api_route("/pagination", ArticleController.paginated_article_cards,
+                         response_model=route.response_model, methods=["GET"])
+    app = FastAPI(default_response_class=response_class)
+    app.include_router(router, prefix="/api/v1")
+    service = _StubPostService(size)
+    app.dependency_overrides[get_post_service] = lambda: service
+    return app
+
+
+async def _call(app, query: bytes) -> bytes:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/api/v1/articles/pagination", "raw_path": b"/api/v1/articles/pagination",
+        "root_path": "", "query_string": query, "headers": [], "client": ("127.0.0.1", 12345),
+        "server": ("127.0.0.1", 8000),
+    }
+    body = bytearray()
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return bytes(body)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--size", type=int, default=10, help="每页文章数")
+    args = parser.parse_args()
+
+    query = f"page=1&size={args.size}".encode()
+    apps = {
+        "APIRoute + JSONResponse": _build_app(APIRoute, JSONResponse, args.size),
+        "ResultRoute + FastJSONResponse": _build_app(ResultRoute, FastJSONResponse, args.size),
+    }
+    bodies = {label: await _call(app, query) for label, app in apps.items()}
+    baseline, optimized = (json.loads(b) for b in bodies.values())
+    assert baseline == optimized, "两种实现的响应内容不一致"
+
+    print(f"{'implementation':<32} | {'req/s':>9} | {'mean (us)':>10} | {'body (bytes)':>12}")
+    for label, app in apps.items():
+        for _ in range(200):
+            await _call(app, query)
+        begin = time.perf_counter()
+        for _ in range(args.requests):
+            await _call(app, query)
+        elapsed = time.perf_counter() - begin
+        print(f"{label:<32} | {args.requests / elapsed:>9.0f} | {elapsed / args.requests * 1e6:>10.1f} | "
+              f"{len(bodies[label]):>12}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
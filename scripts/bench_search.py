@@ -0,0 +1,93 @@
+"""
+全文检索基准测试: 生成合成中文语料, 全量构建索引后测量查询延迟
+
+字符按 Zipf 分布从常用汉字中抽取, 高频二元组几乎出现在每篇文章中, 覆盖倒排截断的最坏情况;
+查询取自随机文章正文的片段(2~8 字, 部分夹带英文词), 与读者的实际输入相近:
+    python scripts/bench_search.py --docs 20000 --doc-chars 1500 --queries 2000
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.search import SearchDocument, SearchEngine
+
+# 常用汉字区间内随机取 3000 个字作为字表
+_CHARS = [chr(c) for c in random.Random(7).sample(range(0x4E00, 0x9FA5), 3000)]
+_WORDS = ["python", "fastapi", "redis", "mysql", "docker", "linux", "asyncio", "pydantic", "nginx", "git"]
+
+
+def _corpus(n_docs: int, doc_chars: int, seed: int) -> list[SearchDocument]:
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(_CHARS))]
+    cum_weights = [0.0] * len(weights)
+    total = 0.0
+    for i, w in enumerate(weights):
+        total += w
+        cum_weights[i] = total
+
+    def text(n: int) -> str:
+        chars = rng.choices(_CHARS, cum_weights=cum_weights, k=n)
+        # 每 40 字左右插入一个英文词与标点
+        for i in range(0, n, 40):
+            chars[i] = f" {rng.choice(_WORDS)}，"
+        return "".join(chars)
+
+    return [SearchDocument(post_id=i + 1, title=text(12), summary=text(60), body=text(doc_chars))
+            for i in range(n_docs)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--doc-chars", type=int, default=1500, help="每篇正文字数")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--index", type=Path, help="索引文件路径, 已存在时跳过构建(须使用相同的语料参数)")
+    args = parser.parse_args()
+
+    begin = time.perf_counter()
+    documents = _corpus(args.docs, args.doc_chars, args.seed)
+    print(f"生成语料: {args.docs} 篇, 耗时 {time.perf_counter() - begin:.1f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = SearchEngine(args.index or Path(tmp) / "posts.idx")
+        if not engine.path.exists():
+            begin = time.perf_counter()
+            engine.rebuild(iter(documents))
+            print(f"构建索引: 耗时 {time.perf_counter() - begin:.1f}s")
+
+        begin = time.perf_counter()
+        engine = SearchEngine(engine.path)
+        engine.load()
+        stats = engine.stats()
+        print(f"mmap 加载: {(time.perf_counter() - begin) * 1000:.2f}ms, {stats['terms']} 个词项, "
+              f"{stats['index_bytes'] / 1024 / 1024:.1f} MiB")
+
+        rng = random.Random(args.seed + 1)
+        queries = []
+        for _ in range(args.queries):
+            body = rng.choice(documents).body
+            start = rng.randrange(len(body) - 8)
+            query = body[start:start + rng.randint(2, 8)]
+            if rng.random() < 0.2:
+                query = f"{rng.choice(_WORDS)} {query}"
+            queries.append(query)
+
+        samples = []
+        for query in queries:
+            begin = time.perf_counter()
+            engine.search(query, 10)
+            samples.append((time.perf_counter() - begin) * 1000)
+        samples.sort()
+        print(f"查询 {len(samples)} 次: p50 {statistics.median(samples):.2f}ms, "
+              f"p99 {samples[int(len(samples) * 0.99) - 1]:.2f}ms, max {samples[-1]:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+argon2 参数调优: 在部署机器上测量候选 (time_cost, memory_cost, parallelism) 的哈希耗时与峰值内存,
+选出单次哈希 p50 不超过目标耗时、且计算强度(time_cost * memory_cost)最高的一组参数
+
+每组候选在独立子进程中测量, 峰值内存取子进程 ru_maxrss 的增量;
+选中的参数可直接写入 env 文件, 已有用户的哈希在下次登录时经 verify_and_upgrade 透明升级:
+    python scripts/tune_argon2.py --target-ms 50 --env-file .env
+"""
+import argparse
+import itertools
+import os
+import re
+import resource
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from argon2 import PasswordHasher
+
+ENV_KEYS = {
+    "time_cost": "PASSWORD_ARGON2_TIME_COST",
+    "memory_cost": "PASSWORD_ARGON2_MEMORY_COST",
+    "parallelism": "PASSWORD_ARGON2_PARALLELISM",
+}
+
+
+def _measure(time_cost: int, memory_cost: int, parallelism: int, rounds: int) -> tuple[float, float, float]:
+    """在子进程中执行: 返回 (p50 毫秒, 最大耗时毫秒, 峰值内存增量 MiB)"""
+    hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    baseline_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    samples = []
+    for i in range(rounds):
+        begin = time.perf_counter()
+        hasher.hash(f"tune-password-{i}")
+        samples.append((time.perf_counter() - begin) * 1000)
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return statistics.median(samples), max(samples), (peak_kib - baseline_kib) / 1024
+
+
+def _write_env(env_file: Path, params: dict[str, int]) -> None:
+    """更新 env 文件中的 argon2 参数, 不存在的键追加到文件末尾"""
+    text = env_file.read_text(encoding="utf-8") if env_file.exists() else ""
+    for name, key in ENV_KEYS.items():
+        line = f"{key}={params[name]}"
+        pattern = re.compile(rf"^{key}=.*$", re.MULTILINE)
+        if pattern.search(text):
+            text = pattern.sub(line, text)
+        else:
+            text = text + ("" if not text or text.endswith("\n") else "\n") + line + "\n"
+    env_file.write_text(text, encoding="utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=50, help="单次哈希 p50 耗时上限(毫秒)")
+    parser.add_argument("--min-memory-mib", type=int, default=19, help="memory_cost 下限(MiB), 默认取 OWASP 最低推荐值")
+    parser.add_argument("--max-memory-mib", type=int, default=256, help="memory_cost 上限(MiB)")
+    parser.add_argument("--time-costs", default="1,2,3,4,6")
+    parser.add_argument("--parallelism", default=f"1,2,{min(os.cpu_count() or 1, 4)}")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--env-file", type=Path, help="将选中的参数写入该 env 文件")
+    args = parser.parse_args()
+
+    memory_mib = [m for m in (19, 32, 46, 64, 96, 128, 192, 256) if args.min_memory_mib <= m <= args.max_memory_mib]
+    time_costs = sorted({int(t) for t in args.time_costs.split(",")})
+    parallelisms = sorted({int(p) for p in args.parallelism.split(",")})
+
+    print(f"{'t':>3} {'m (MiB)':>8} {'p':>3} | {'p50 (ms)':>9} {'max (ms)':>9} {'peak RSS (MiB)':>15}")
+    best: dict[str, int] | None = None
+    # 每组候选使用全新子进程, 峰值内存互不影响
+    with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as pool:
+        for m, p in itertools.product(memory_mib, parallelisms):
+            for t in time_costs:
+                p50, worst, peak = pool.submit(_measure, t, m * 1024, p, args.rounds).result()
+                fits = p50 <= args.target_ms
+                print(f"{t:>3} {m:>8} {p:>3} | {p50:>9.1f} {worst:>9.1f} {peak:>15.1f}"
+                      f"{'' if fits else '  (over target)'}")
+                if not fits:
+                    # 同一 (m, p) 下 time_cost 越大越慢, 跳过该组剩余的 time_cost, 继续测下一组 (m, p)
+                    break
+                if best is None or t * m > best["time_cost"] * best["memory_cost"] // 1024:
+                    best = {"time_cost": t, "memory_cost": m * 1024, "parallelism": p}
+
+    if best is None:
+        print(f"没有候选参数满足 p50 <= {args.target_ms}ms, 请放宽目标耗时或降低内存下限")
+        return
+    print(f"选中: time_cost={best['time_cost']} memory_cost={best['memory_cost']} (KiB) "
+          f"parallelism={best['parallelism']}")
+    if args.env_file:
+        _write_env(args.env_file, best)
+        print(f"已写入 {args.env_file}, 重启服务后生效, 已有用户在下次登录时自动升级哈希")
+
+
+if __name__ == "__main__":
+    main()
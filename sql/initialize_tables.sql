@@ -1,6 +1,7 @@
 -- -----------------------------------------------------
 -- Drop existing tables (in reverse dependency order)
 -- -----------------------------------------------------
+DROP TABLE IF EXISTS `counter_batches`;
 DROP TABLE IF EXISTS `likes`;
 DROP TABLE IF EXISTS `comments`;
 DROP TABLE IF EXISTS `post_tags`;
@@ -78,7 +79,8 @@ CREATE TABLE `posts` (
   `create_time` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
   `update_time` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
   PRIMARY KEY (`id`),
-  INDEX `fk_posts_users_idx` (`author_id` ASC)
+  INDEX `fk_posts_users_idx` (`author_id` ASC),
+  INDEX `idx_posts_create_time_id` (`create_time` DESC, `id` DESC)
 );
 
 -- -----------------------------------------------------
@@ -106,6 +108,31 @@ CREATE TABLE `post_tags` (
 );
 
 
+-- -----------------------------------------------------
+-- Create Table `likes` (点赞流水, 同一访客对同一文章只记一次)
+-- -----------------------------------------------------
+CREATE TABLE `likes` (
+  `id` INT NOT NULL AUTO_INCREMENT,
+  `post_id` INT NOT NULL,
+  `voter` VARCHAR(64) NOT NULL COMMENT "点赞者标识: u:<user_id> 或 ip:<ip>",
+  `user_id` INT NULL,
+  `create_time` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id`),
+  UNIQUE INDEX `uq_likes_post_voter` (`post_id` ASC, `voter` ASC)
+);
+
+
+-- -----------------------------------------------------
+-- Create Table `counter_batches` (已写回的阅读数批次, 防止同一批次重复累加)
+-- -----------------------------------------------------
+CREATE TABLE `counter_batches` (
+  `id` VARCHAR(64) NOT NULL,
+  `create_time` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id`),
+  INDEX `ix_counter_batches_create_time` (`create_time` ASC)
+);
+
+
 CREATE TABLE `timeline` (
   `id` INT NOT NULL AUTO_INCREMENT,
   `date` DATE NOT NULL COMMENT "事件日期",
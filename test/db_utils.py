@@ -0,0 +1,26 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.model import Base
+from app.model.orm.models import Post
+from app.repository.post import PostMapper
+
+
+def run_with_session(test):
+    """在内存 sqlite 上建表并以一个会话执行 test(session, mapper)"""
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        try:
+            async with async_sessionmaker(bind=engine, expire_on_commit=False)() as session:
+                await test(session, PostMapper())
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+def make_post(post_id: int, **fields) -> Post:
+    return Post(id=post_id, title=f"post {post_id}", content_file_path=f"{post_id}.md", author_id=1, **fields)
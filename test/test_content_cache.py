@@ -0,0 +1,35 @@
+from app.services.post import ContentCache
+
+
+def test_hit_requires_same_mtime_and_size():
+    cache = ContentCache(max_bytes=100)
+    cache.put("/blogs/a.md", mtime_ns=1, size=5, content="hello")
+    assert cache.get("/blogs/a.md", mtime_ns=1, size=5) == "hello"
+    # 文件被改写后 mtime/size 变化, 视为未命中
+    assert cache.get("/blogs/a.md", mtime_ns=2, size=5) is None
+    assert cache.get("/blogs/a.md", mtime_ns=1, size=6) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = ContentCache(max_bytes=10)
+    cache.put("a", 1, 4, "aaaa")
+    cache.put("b", 1, 4, "bbbb")
+    # 访问 a, 使 b 成为最久未使用
+    assert cache.get("a", 1, 4) == "aaaa"
+    cache.put("c", 1, 4, "cccc")
+    assert cache.get("b", 1, 4) is None
+    assert cache.get("a", 1, 4) == "aaaa"
+    assert cache.get("c", 1, 4) == "cccc"
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] == 8
+
+
+def test_oversized_content_is_not_cached():
+    cache = ContentCache(max_bytes=4)
+    cache.put("a", 1, 3, "aaa")
+    cache.put("big", 1, 5, "bbbbb")
+    assert cache.get("big", 1, 5) is None
+    assert cache.get("a", 1, 3) == "aaa"
@@ -0,0 +1,29 @@
+import asyncio
+import threading
+
+from app.utils import cryptpwd
+
+
+def test_cancelled_waiter_keeps_slot_until_job_finishes():
+    async def run():
+        started, release = threading.Event(), threading.Event()
+
+        def slow_job():
+            started.set()
+            release.wait(5)
+            return "done"
+
+        task = asyncio.create_task(cryptpwd._run_in_pool(slow_job))
+        await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        # 等待方已取消, 但 argon2 运算仍在线程中执行, 名额不能提前释放
+        assert cryptpwd._pool_stats["pending"] == 1
+        release.set()
+        for _ in range(100):
+            if cryptpwd._pool_stats["pending"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert cryptpwd._pool_stats["pending"] == 0
+
+    asyncio.run(run())
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import timedelta
 from app.utils.auth_utils import JwtUtil
 
@@ -20,18 +21,103 @@ def test_refresh_token_issue():
     assert decoded["type"] == "refresh"
 
 def test_token_revoke_logout():
-    payload = {"user_id": "123"}
+    payload = {"user_id": "123", "username": "alice", "role": "user"}
     token = JwtUtil.create_access_token(payload, expires_delta=timedelta(minutes=1))
     # 未撤销时验证通过
-    assert JwtUtil.validate_access_token(token) is not None
+    assert asyncio.run(JwtUtil.validate_access_token(token)) is not None
     # 撤销令牌
-    assert JwtUtil.revoke_token(token) is True
+    assert asyncio.run(JwtUtil.revoke_token(token)) is True
     # 被撤销后验证失败
-    assert JwtUtil.validate_access_token(token) is None
+    assert asyncio.run(JwtUtil.validate_access_token(token)) is None
 
 def test_expired_token_invalid():
     payload = {"user_id": "123"}
     # 直接生成过期令牌（过去 1 秒）
     token = JwtUtil.create_access_token(payload, expires_delta=timedelta(seconds=-1))
     assert JwtUtil.decode_token(token) is None
-    assert JwtUtil.validate_access_token(token) is None
+    assert asyncio.run(JwtUtil.validate_access_token(token)) is None
+
+def test_revoked_event_rejects_cached_token():
+    from app.utils.auth_utils import _on_revoked_event
+
+    payload = {"user_id": "123", "username": "alice", "role": "user"}
+    token = JwtUtil.create_access_token(payload, expires_delta=timedelta(minutes=1))
+    decoded = JwtUtil.decode_token(token)
+    # 首次解码后进入令牌缓存
+    assert asyncio.run(JwtUtil.get_payload(token)) is not None
+    # 其他 worker 广播的撤销事件写入本地撤销镜像, 缓存中的令牌随即失效
+    _on_revoked_event({"jti": decoded["jti"], "exp": decoded["exp"]})
+    assert asyncio.run(JwtUtil.get_payload(token)) is None
+
+def test_refresh_rotation_rejects_reused_token():
+    payload = {"user_id": "123", "username": "alice", "role": "user"}
+    refresh = JwtUtil.create_refresh_token(payload, expires_delta=timedelta(minutes=2))
+    assert asyncio.run(JwtUtil.refresh_token_pair(refresh)) is not None
+    # 轮换后旧刷新令牌已撤销, 不能再次换取令牌
+    assert asyncio.run(JwtUtil.refresh_token_pair(refresh)) is None
+
+def test_concurrent_refresh_replays_issue_one_pair(monkeypatch):
+    import fakeredis
+    from app.db.redis import RedisClientManager
+    from app.utils import auth_utils
+
+    payload = {"user_id": "123", "username": "alice", "role": "user"}
+    refresh = JwtUtil.create_refresh_token(payload, expires_delta=timedelta(minutes=2))
+
+    async def run():
+        client = fakeredis.FakeAsyncRedis(decode_responses=True)
+        monkeypatch.setattr(RedisClientManager, "_redis_client", client)
+        try:
+            results = await asyncio.gather(*(JwtUtil.refresh_token_pair(refresh) for _ in range(5)))
+            assert sum(result is not None for result in results) == 1
+            # 其他 worker 的本地撤销镜像中没有该 jti, 仍由 Redis 的 SET NX 拒绝重放
+            monkeypatch.setattr(auth_utils, "_REVOKED_JTIS", {})
+            assert await JwtUtil.refresh_token_pair(refresh) is None
+            jti = JwtUtil.decode_token(refresh)["jti"]
+            assert 0 < await client.ttl(f"{auth_utils.settings.jwt.JWT_REVOKE_PREFIX}{jti}") <= 120
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+
+def test_middleware_rejects_revoked_token():
+    from starlette.applications import Starlette
+    from starlette.responses import PlainTextResponse
+    from starlette.routing import Route
+    from starlette.testclient import TestClient
+    from app.middleware.auth_middleware import AuthMiddleware
+
+    app = Starlette(routes=[Route("/api/v1/admin/ping", lambda request: PlainTextResponse("ok"))])
+    app.add_middleware(AuthMiddleware)
+    token = JwtUtil.create_access_token({"user_id": 1, "username": "admin", "role": "ADMIN"},
+                                        expires_delta=timedelta(minutes=1))
+    headers = {"Authorization": f"Bearer {token}"}
+    with TestClient(app) as client:
+        assert client.get("/api/v1/admin/ping", headers=headers).status_code == 200
+        # 并发的撤销合并为一次 Redis 管道写入
+        async def revoke_concurrently():
+            return await asyncio.gather(*(JwtUtil.revoke_token(token) for _ in range(3)))
+        assert asyncio.run(revoke_concurrently()) == [True, True, True]
+        assert client.get("/api/v1/admin/ping", headers=headers).status_code == 401
+
+def test_middleware_optional_user_on_likes():
+    from starlette.applications import Starlette
+    from starlette.responses import PlainTextResponse
+    from starlette.routing import Route
+    from starlette.testclient import TestClient
+    from app.middleware.auth_middleware import AuthMiddleware
+    from app.utils.user_context import get_user_context
+
+    def whoami(request):
+        ctx = get_user_context()
+        return PlainTextResponse(str(ctx.user_id) if ctx else "anonymous")
+
+    app = Starlette(routes=[Route("/api/v1/articles/1/likes", whoami, methods=["POST"])])
+    app.add_middleware(AuthMiddleware)
+    token = JwtUtil.create_access_token({"user_id": 7, "username": "alice", "role": "USER"},
+                                        expires_delta=timedelta(minutes=1))
+    with TestClient(app) as client:
+        # 携带有效令牌时按用户识别, 未携带或令牌无效时按匿名访客处理而不是拒绝
+        assert client.post("/api/v1/articles/1/likes", headers={"Authorization": f"Bearer {token}"}).text == "7"
+        assert client.post("/api/v1/articles/1/likes").text == "anonymous"
+        assert client.post("/api/v1/articles/1/likes", headers={"Authorization": "Bearer bad"}).text == "anonymous"
@@ -0,0 +1,86 @@
+import base64
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, select
+
+from app.handler.exception_handlers import InvalidCursorException
+from app.model.orm.models import Post, PostCategory, PostTag
+from app.utils.pagination import decode_cursor, encode_cursor
+from test.db_utils import make_post, run_with_session
+
+
+def test_counter_batch_applied_once():
+    async def test(session, mapper):
+        session.add_all([make_post(1), make_post(2)])
+        await session.commit()
+        assert await mapper.add_counter_deltas(session, "view_count", {1: 3, 2: 1}, "batch-1") == 2
+        # 上次提交成功但未能删除 Redis 快照时, 以同一批次号重试不会重复累加
+        assert await mapper.add_counter_deltas(session, "view_count", {1: 3, 2: 1}, "batch-1") == 0
+        await mapper.add_counter_deltas(session, "view_count", {1: 1}, "batch-2")
+        counts = dict((await session.execute(select(Post.id, Post.view_count))).all())
+        assert counts == {1: 4, 2: 1}
+
+    run_with_session(test)
+
+
+def test_cursor_round_trip_and_rejects_malformed():
+    create_time = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(create_time, 42)) == (create_time, 42)
+    for cursor in ("", "not-base64!", encode_cursor(create_time, 42)[:-3] + "@@@", "游标",
+                   base64.urlsafe_b64encode(b"2024-05-01|abc").decode()):
+        with pytest.raises(InvalidCursorException):
+            decode_cursor(cursor)
+
+
+def test_keyset_pages_split_equal_create_time_and_keep_tag_filter():
+    async def test(session, mapper):
+        same = datetime(2024, 1, 1)
+        session.add_all([make_post(i, create_time=same) for i in range(1, 6)] + [make_post(6, create_time=datetime(2024, 1, 2))])
+        session.add_all([PostTag(post_id=i, tag_id=1) for i in (1, 2, 4, 6)])
+        await session.commit()
+        # create_time 相同时按 id 倒序继续翻页, 不遗漏也不重复
+        ids, after = [], None
+        while True:
+            rows, after = await mapper.paginate_cards_after(session, 2, after)
+            ids += [row["id"] for row in rows]
+            if after is None:
+                break
+        assert ids == [6, 5, 4, 3, 2, 1]
+        rows, after = await mapper.paginate_cards_after(session, 2, None, tag_id=1)
+        assert [row["id"] for row in rows] == [6, 4]
+        rows, after = await mapper.paginate_cards_after(session, 2, after, tag_id=1)
+        assert [row["id"] for row in rows] == [2, 1] and after is None
+
+    run_with_session(test)
+
+
+
+def test_sync_relations_writes_only_the_difference():
+    async def test(session, mapper):
+        session.add_all([make_post(1), PostCategory(post_id=1, category_id=1), PostCategory(post_id=1, category_id=2),
+                         PostTag(post_id=1, tag_id=5), PostTag(post_id=2, tag_id=5)])
+        await session.commit()
+        writes = []
+
+        def record(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith(("INSERT", "DELETE")):
+                writes.append(statement.split()[0].upper())
+
+        event.listen(session.bind.sync_engine, "before_cursor_execute", record)
+        assert await mapper.sync_categories(session, 1, [2, 3, 3]) == ({3}, {1})
+        assert writes == ["DELETE", "INSERT"]
+        # 无变化时不执行写操作
+        writes.clear()
+        assert await mapper.sync_categories(session, 1, [3, 2]) == (set(), set())
+        assert await mapper.sync_tags(session, 1, [5]) == (set(), set())
+        assert writes == []
+        assert await mapper.sync_tags(session, 1, []) == (set(), {5})
+        assert writes == ["DELETE"]
+
+        categories = (await session.execute(select(PostCategory.post_id, PostCategory.category_id))).all()
+        assert sorted(categories) == [(1, 2), (1, 3)]
+        # 其他文章的关联不受影响
+        assert (await session.execute(select(PostTag.post_id, PostTag.tag_id))).all() == [(2, 5)]
+
+    run_with_session(test)
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app.core import path_conf
+from app.handler.exception_handlers import ArticleExistsException
+from app.model.dto.post import PostCreate, PostUpdate
+from app.model.orm.models import Post, PostCategory, PostTag
+from app.services import post as post_service
+from test.db_utils import run_with_session
+
+
+@pytest.fixture
+def blog_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(path_conf, "BLOG_DIR", tmp_path)
+    monkeypatch.setattr(post_service, "publish_post_changes", lambda ids: asyncio.sleep(0))
+    return tmp_path
+
+
+async def _failing_commit():
+    raise RuntimeError("commit failed")
+
+
+def test_create_post_keeps_existing_body_and_cleans_up_on_failed_commit(blog_dir, monkeypatch):
+    async def test(session, mapper):
+        service = post_service.PostService(session, mapper, None, None)
+        await service.create_post(PostCreate(title="hello", content="first"))
+        # 同名文章不会覆盖已有正文, 也不会写入数据库记录
+        with pytest.raises(ArticleExistsException):
+            await service.create_post(PostCreate(title="hello", content="second"))
+        assert (blog_dir / "hello.md").read_text(encoding="utf-8") == "first"
+        assert (await session.execute(select(Post.id))).scalars().all() == [1]
+
+        with monkeypatch.context() as patch, pytest.raises(RuntimeError):
+            patch.setattr(session, "commit", _failing_commit)
+            await service.create_post(PostCreate(title="world", content="body"))
+        assert not (blog_dir / "world.md").exists()
+
+    run_with_session(test)
+
+
+def test_update_post_replaces_body_only_after_commit(blog_dir, monkeypatch):
+    async def test(session, mapper):
+        service = post_service.PostService(session, mapper, None, None)
+        post_id = await service.create_post(PostCreate(title="hello", content="first"))
+        await service.update_post(post_id, PostUpdate(content="second"))
+        assert await service.get_content(post_id) == "second"
+
+        # 提交失败时原正文与元信息都不变, 也不留下临时文件
+        with monkeypatch.context() as patch, pytest.raises(RuntimeError):
+            patch.setattr(session, "commit", _failing_commit)
+            await service.update_post(post_id, PostUpdate(title="renamed", content="third"))
+        assert await service.get_content(post_id) == "second"
+        assert (await session.get(Post, post_id)).title == "hello"
+        assert [path.name for path in blog_dir.iterdir()] == ["hello.md"]
+
+    run_with_session(test)
+
+
+def test_update_post_keeps_relations_that_were_not_sent(blog_dir):
+    async def test(session, mapper):
+        service = post_service.PostService(session, mapper, None, None)
+        post_id = await service.create_post(PostCreate(title="hello", content="body", category_ids=[1], tag_ids=[7, 8]))
+        # 只修改标题时不改动分类与标签关联
+        await service.update_post(post_id, PostUpdate(title="renamed"))
+        await service.update_post(post_id, PostUpdate(tag_ids=[8, 9]))
+        assert (await session.execute(select(PostCategory.category_id))).scalars().all() == [1]
+        assert sorted((await session.execute(select(PostTag.tag_id))).scalars()) == [8, 9]
+
+    run_with_session(test)
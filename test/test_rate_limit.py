@@ -0,0 +1,187 @@
+import asyncio
+import ipaddress
+
+import fakeredis
+import httpx
+from fastapi import FastAPI, Request
+from starlette.responses import PlainTextResponse
+
+from app.core import settings
+from app.core._settings import RouteBudget
+from app.db.redis import RedisClientManager
+from app.handler.exception_handlers import register_exception_handlers
+from app.middleware.rate_limit_middleware import RateLimitMiddleware
+from app.utils import rate_limit
+from app.utils.rate_limit import (LocalTokenBuckets, get_client_ip, resolve_client_ip, sliding_window_hit,
+                                  throttle_login, token_bucket_take)
+
+
+def _with_fake_redis(monkeypatch, test):
+    """以 fakeredis(含 Lua 支持)替换 Redis 客户端执行 test(client)"""
+    async def run():
+        client = fakeredis.FakeAsyncRedis(decode_responses=True)
+        monkeypatch.setattr(RedisClientManager, "_redis_client", client)
+        try:
+            await test(client)
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+
+
+def _scope(peer: str, forwarded: str | None = None) -> dict:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return {"type": "http", "client": (peer, 1234), "headers": headers}
+
+
+def test_client_ip_from_trusted_forwarded_for():
+    trusted = (ipaddress.ip_network("10.0.0.0/8"),)
+    # 直连地址不是可信代理时忽略 X-Forwarded-For(可被伪造)
+    assert resolve_client_ip(_scope("203.0.113.9", "1.2.3.4"), trusted) == "203.0.113.9"
+    # 自右向左跳过可信代理, 最左侧客户端自填的地址不予采信
+    assert resolve_client_ip(_scope("10.0.0.1", "1.2.3.4, 198.51.100.7, 10.0.0.2"), trusted) == "198.51.100.7"
+    # 无法解析的地址停止向左查找, 退回最后一个可信代理
+    assert resolve_client_ip(_scope("10.0.0.1", "198.51.100.7, garbage"), trusted) == "10.0.0.1"
+    assert resolve_client_ip(_scope("10.0.0.1"), trusted) == "10.0.0.1"
+
+
+def test_sliding_window_limits_all_keys_together(monkeypatch):
+    async def test(client):
+        limits = {"rl:user": 2, "rl:ip": 5}
+        assert await sliding_window_hit(limits, 60) == 0
+        assert await sliding_window_hit(limits, 60) == 0
+        # 任一键超限即拒绝, 等待时间为最早一次请求移出窗口所需的秒数
+        assert 0 < await sliding_window_hit(limits, 60) <= 60
+        # 被拒绝的请求不计入任何键
+        assert await client.zcard("rl:ip") == 2
+        # 窗口之外的旧记录先被清理, 不占用次数
+        await client.delete("rl:user")
+        await client.zadd("rl:user", {"old-1": 0, "old-2": 1})
+        assert await sliding_window_hit(limits, 60) == 0
+        assert await client.zcard("rl:user") == 1
+
+    _with_fake_redis(monkeypatch, test)
+
+
+def test_login_throttle_returns_429_with_retry_after(monkeypatch):
+    monkeypatch.setattr(settings.rate_limit, "LOGIN_MAX_PER_USERNAME", 2)
+    app = FastAPI()
+    register_exception_handlers(app)
+
+    @app.post("/login/{username}")
+    async def login(username: str, request: Request):
+        await throttle_login(username, get_client_ip(request))
+        return {"ok": True}
+
+    async def test(client):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            assert (await http.post("/login/alice")).status_code == 200
+            # 用户名不区分大小写与首尾空白
+            assert (await http.post("/login/ALICE")).status_code == 200
+            response = await http.post("/login/alice")
+            assert response.status_code == 429
+            assert 0 < int(response.headers["Retry-After"]) <= settings.rate_limit.LOGIN_WINDOW_SECONDS
+            # 按用户名计数, 其他用户不受影响
+            assert (await http.post("/login/bob")).status_code == 200
+
+    _with_fake_redis(monkeypatch, test)
+
+
+def test_sliding_window_allows_when_redis_unavailable(monkeypatch):
+    monkeypatch.setattr(RedisClientManager, "_redis_client", None)
+    assert asyncio.run(sliding_window_hit({"rl:user": 1}, 60)) == 0
+
+
+def test_local_token_bucket_burst_refill_and_eviction(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    buckets = LocalTokenBuckets(max_buckets=2)
+    # 新桶装满 burst 个令牌, 取完后拒绝
+    assert [buckets.take("a", rate=2, burst=3)[0] for _ in range(4)] == [True, True, True, False]
+    # 按经过的时间补充, 不超过桶容量
+    now[0] += 0.5
+    assert buckets.take("a", rate=2, burst=3) == (True, 0)
+    now[0] += 60
+    assert buckets.take("a", rate=2, burst=3) == (True, 2)
+    # 超出桶数上限时淘汰最久未使用的桶, 被淘汰的桶重新装满
+    buckets.take("b", rate=2, burst=3)
+    buckets.take("c", rate=2, burst=3)
+    assert buckets.take("a", rate=2, burst=3) == (True, 2)
+
+
+def test_redis_token_bucket_burst_and_refill(monkeypatch):
+    async def test(client):
+        assert [(await token_bucket_take("bucket", 1, 2))[0] for _ in range(3)] == [True, True, False]
+        # 将上次更新时间提前 1.5 秒, 模拟时间流逝: 补充 1.5 个令牌, 取走 1 个
+        await client.hset("bucket", "ts", float(await client.hget("bucket", "ts")) - 1.5)
+        allowed, tokens = await token_bucket_take("bucket", 1, 2)
+        assert allowed and 0.4 < tokens < 0.6
+        # 过期时间为补满所需时间 + 1 秒
+        assert 0 < await client.pttl("bucket") <= 3000
+
+    _with_fake_redis(monkeypatch, test)
+
+
+def test_middleware_headers_429_and_local_fallback(monkeypatch):
+    # Redis 未初始化: 退回进程内令牌桶; 按可信代理转发的客户端 IP 分别计数
+    monkeypatch.setattr(RedisClientManager, "_redis_client", None)
+    monkeypatch.setattr(rate_limit, "_local_buckets", LocalTokenBuckets(100))
+    monkeypatch.setattr(rate_limit, "_trusted_proxies", (ipaddress.ip_network("127.0.0.1/32"),))
+
+    async def ping(scope, receive, send):
+        await PlainTextResponse("ok")(scope, receive, send)
+
+    app = RateLimitMiddleware(ping, budgets={"/api": RouteBudget(rate=0.5, burst=2)})
+
+    async def run():
+        transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 1234))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            alice = {"X-Forwarded-For": "198.51.100.1"}
+            first = await http.get("/api/ping", headers=alice)
+            assert first.status_code == 200
+            assert first.headers["RateLimit-Limit"] == "2"
+            assert first.headers["RateLimit-Remaining"] == "1"
+            assert first.headers["RateLimit-Reset"] == "2"
+            assert (await http.get("/api/ping", headers=alice)).status_code == 200
+            limited = await http.get("/api/ping", headers=alice)
+            assert limited.status_code == 429
+            assert limited.headers["Retry-After"] == "2"
+            assert limited.headers["RateLimit-Remaining"] == "0"
+            # 其他客户端不受影响, 未匹配任何前缀的路径不限流
+            assert (await http.get("/api/ping", headers={"X-Forwarded-For": "198.51.100.2"})).status_code == 200
+            assert "RateLimit-Limit" not in (await http.get("/health")).headers
+
+    asyncio.run(run())
+
+
+def test_middleware_prefixes_match_whole_path_segments(monkeypatch):
+    monkeypatch.setattr(RedisClientManager, "_redis_client", None)
+    monkeypatch.setattr(rate_limit, "_local_buckets", LocalTokenBuckets(100))
+
+    async def ping(scope, receive, send):
+        await PlainTextResponse("ok")(scope, receive, send)
+
+    app = RateLimitMiddleware(ping, budgets={
+        "/api/v1": RouteBudget(rate=1, burst=40),
+        "/api/v1/admin": RouteBudget(rate=1, burst=60),
+        "/static/": RouteBudget(rate=1, burst=5),
+    })
+
+    async def run():
+        transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 1234))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            # RateLimit-Limit 即命中前缀的桶容量
+            limits = {path: (await http.get(path)).headers.get("RateLimit-Limit")
+                      for path in ("/api/v1/admin", "/api/v1/admin/posts", "/api/v1/administrator", "/api/v1",
+                                   "/api/v1xyz", "/static/app.js")}
+        assert limits == {
+            "/api/v1/admin": "60",
+            "/api/v1/admin/posts": "60",
+            "/api/v1/administrator": "40",
+            "/api/v1": "40",
+            "/api/v1xyz": None,
+            "/static/app.js": "5",
+        }
+
+    asyncio.run(run())
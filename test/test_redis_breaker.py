@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+from redis.exceptions import ConnectionError, ResponseError, TimeoutError
+
+from app.core import settings
+from app.db import redis as redis_module
+from app.db.redis import CircuitBreaker, RedisUnavailableError, _guarded
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=60)
+    monkeypatch.setattr(redis_module, "breaker", breaker)
+    return breaker
+
+
+def _call(result=None, error: BaseException | None = None, delay: float = 0):
+    async def call():
+        if delay:
+            await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+    return call
+
+
+def _expire_cooldown(breaker: CircuitBreaker) -> None:
+    breaker.opened_at -= breaker.cooldown_seconds
+
+
+def test_opens_at_threshold_and_rejects(breaker):
+    async def run():
+        with pytest.raises(ConnectionError):
+            await _guarded(_call(error=ConnectionError()))
+        assert breaker.state == CircuitBreaker.CLOSED
+        with pytest.raises(ConnectionError):
+            await _guarded(_call(error=ConnectionError()))
+        assert breaker.state == CircuitBreaker.OPEN and breaker.is_open
+        # 打开期间不执行调用, 直接拒绝
+        with pytest.raises(RedisUnavailableError):
+            await _guarded(_call(error=AssertionError("should not run")))
+        assert breaker.stats()["rejected"] == 1
+
+    asyncio.run(run())
+
+
+def test_half_open_allows_exactly_one_probe(breaker):
+    async def run():
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await _guarded(_call(error=ConnectionError()))
+        _expire_cooldown(breaker)
+        probe = asyncio.create_task(_guarded(_call("pong", delay=0.01)))
+        await asyncio.sleep(0)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        # 探测进行中, 其余调用被拒绝
+        with pytest.raises(RedisUnavailableError):
+            await _guarded(_call("pong"))
+        assert await probe == "pong"
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert await _guarded(_call("pong")) == "pong"
+
+        # 探测失败时重新打开
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await _guarded(_call(error=ConnectionError()))
+        _expire_cooldown(breaker)
+        with pytest.raises(ConnectionError):
+            await _guarded(_call(error=ConnectionError()))
+        assert breaker.is_open
+
+    asyncio.run(run())
+
+
+def test_cancelled_probe_releases_slot(breaker):
+    async def run():
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await _guarded(_call(error=ConnectionError()))
+        _expire_cooldown(breaker)
+        probe = asyncio.create_task(_guarded(_call("pong", delay=10)))
+        await asyncio.sleep(0)
+        probe.cancel()
+        await asyncio.gather(probe, return_exceptions=True)
+        # 被取消的探测不计成功或失败, 下一个调用可以重新探测
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert await _guarded(_call("pong")) == "pong"
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(run())
+
+
+def test_command_errors_do_not_count_as_failures(breaker):
+    async def run():
+        with pytest.raises(ConnectionError):
+            await _guarded(_call(error=ConnectionError()))
+        for _ in range(3):
+            with pytest.raises(ResponseError):
+                await _guarded(_call(error=ResponseError("ERR script error")))
+        assert breaker.state == CircuitBreaker.CLOSED and breaker.failures == 0
+
+    asyncio.run(run())
+
+
+def test_timeout_records_failure(breaker, monkeypatch):
+    monkeypatch.setattr(settings.redis, "COMMAND_TIMEOUT_SECONDS", 0.01)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(TimeoutError):
+                await _guarded(_call("pong", delay=1))
+        assert breaker.is_open
+
+    asyncio.run(run())
@@ -0,0 +1,26 @@
+from app.services.related import compute_related
+
+
+def test_compute_related_ranks_by_jaccard():
+    features = {
+        1: {"t:1", "t:2", "c:1"},
+        2: {"t:1", "t:2", "c:1"},
+        3: {"t:1", "c:2"},
+        4: {"t:3"},
+        5: {"t:1", "t:2", "t:4", "c:1"},
+    }
+    related = compute_related(features, top_k=2, max_feature_posts=100)
+    assert related[1] == [2, 5]
+    # 相似度相同时 id 较大的靠前
+    assert related[3] == [2, 1]
+    assert 4 not in related
+
+
+def test_compute_related_hot_features_still_counted():
+    # c:1 包含全部文章, 不参与候选生成, 但仍计入相似度并用于补足候选
+    features = {i: {"c:1"} for i in range(1, 6)}
+    features[1] |= {"t:1"}
+    features[2] |= {"t:1"}
+    related = compute_related(features, top_k=3, max_feature_posts=3)
+    assert related[1] == [2, 5, 4]
+    assert related[3] == [5, 4, 2]
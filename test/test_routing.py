@@ -0,0 +1,41 @@
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.api.routing import FastJSONResponse, ResultRoute
+from app.model import Result
+from app.model.common import PaginatedResponse
+
+
+class _UserVO(BaseModel):
+    id: int
+    username: str
+
+
+def _build_client() -> TestClient:
+    router = APIRouter(prefix="/users", route_class=ResultRoute)
+
+    @router.get("", response_model=Result[PaginatedResponse[_UserVO]])
+    async def list_users():
+        rows = [{"id": 1, "username": "alice", "password_hash": "secret"}]
+        return Result.success(PaginatedResponse(total=1, current=1, size=10, records=rows))
+
+    @router.post("", response_model=Result[_UserVO], status_code=201)
+    async def create_user():
+        return Result.success({"id": 2, "username": "bob"})
+
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.include_router(router, prefix="/api/v1")
+    return TestClient(app)
+
+
+def test_result_route_filters_by_response_model():
+    client = _build_client()
+    resp = client.get("/api/v1/users")
+    assert resp.status_code == 200
+    # response_model 之外的字段不会出现在响应中
+    assert resp.json()["data"]["records"] == [{"id": 1, "username": "alice"}]
+
+    resp = client.post("/api/v1/users")
+    assert resp.status_code == 201
+    assert resp.json() == {"code": 200, "msg": "success", "data": {"id": 2, "username": "bob"}}
@@ -0,0 +1,99 @@
+from app.search import SearchDocument, SearchEngine, TitleIndex, compact_text, make_snippet, tokenize
+
+
+def test_tokenize_cjk_bigrams_and_words():
+    assert tokenize("异步 IO 与 FastAPI") == ["异步", "io", "与", "fastapi"]
+    assert tokenize("数据库连接池") == ["数据", "据库", "库连", "连接", "接池"]
+
+
+def test_search_ranks_title_matches_first(tmp_path):
+    engine = SearchEngine(tmp_path / "posts.idx")
+    engine.rebuild(iter([
+        SearchDocument(post_id=1, title="Redis 缓存", summary="", body="数据库连接池的配置"),
+        SearchDocument(post_id=2, title="连接池调优", summary="数据库连接池", body="连接池大小与超时"),
+        SearchDocument(post_id=3, title="FastAPI 入门", summary="", body="路由与依赖注入"),
+    ]))
+    total, hits = engine.search("连接池", 10)
+    assert total == 2
+    assert [post_id for post_id, _ in hits] == [2, 1]
+    # 单字查询扩展为以该字开头的二元组
+    assert [post_id for post_id, _ in engine.search("缓", 10)[1]] == [1]
+    assert engine.search("kubernetes", 10) == (0, [])
+
+
+def test_delta_updates_and_merge(tmp_path):
+    engine = SearchEngine(tmp_path / "posts.idx")
+    docs = [
+        SearchDocument(post_id=1, title="Redis 缓存", summary="", body="缓存穿透"),
+        SearchDocument(post_id=2, title="连接池调优", summary="", body="数据库连接池"),
+    ]
+    engine.rebuild(iter(docs))
+    engine.upsert(SearchDocument(post_id=1, title="连接池与缓存", summary="", body=""))
+    engine.remove(2)
+    engine.upsert(SearchDocument(post_id=3, title="异步连接池", summary="", body=""))
+    assert sorted(post_id for post_id, _ in engine.search("连接池", 10)[1]) == [1, 3]
+    assert engine.search("穿透", 10) == (0, [])
+
+    # 重建期间的写入在切换到新基础索引后仍然保留
+    since = engine.seq
+    index = engine.build(iter([docs[0]]))
+    engine.upsert(SearchDocument(post_id=4, title="连接池监控", summary="", body=""))
+    engine.install(index, since)
+    assert engine.unmerged == 2
+    assert [post_id for post_id, _ in engine.search("监控", 10)[1]] == [4]
+    assert [post_id for post_id, _ in engine.search("穿透", 10)[1]] == [1]
+
+
+def test_snippet_highlights_best_window():
+    text = compact_text("开头的介绍文字。" * 10 + "调整数据库<连接池>大小, 配合 Redis 缓存。" + "结尾" * 40)
+    snippet = make_snippet(text, tokenize("连接池 redis"), 40)
+    assert snippet.startswith("…") and snippet.endswith("…")
+    assert "<mark>连接池</mark>&gt;" in snippet
+    assert "<mark>Redis</mark>" in snippet
+    assert make_snippet("没有命中", tokenize("redis"), 40) == "没有命中"
+
+
+def test_title_index_fuzzy_lookup():
+    titles = TitleIndex()
+    titles.load([(1, "FastAPI 依赖注入详解"), (2, "Redis 缓存穿透与雪崩"), (3, "Redis Cluster 运维")])
+    # 错拼、大小写与标题中间的一段都能命中, 完整包含查询的排在前面
+    assert [post_id for post_id, _ in titles.search("fastpai", 10, 0.3)] == [1]
+    assert [post_id for post_id, _ in titles.search("redis 缓存", 10, 0.3)][0] == 2
+    assert [post_id for post_id, _ in titles.search("缓存", 10, 0.3)] == [2]
+    titles.put(2, "MySQL 索引优化")
+    titles.remove(3)
+    assert titles.search("redis", 10, 0.3) == []
+
+
+def test_follower_reloads_index_built_by_lock_holder(tmp_path, monkeypatch):
+    import asyncio
+
+    import fakeredis
+
+    from app.db.redis import RedisClientManager
+    from app.services.search import SearchIndexer
+
+    docs = [SearchDocument(post_id=1, title="Redis 缓存", summary="", body="缓存穿透")]
+
+    async def run():
+        monkeypatch.setattr(RedisClientManager, "_redis_client", fakeredis.FakeAsyncRedis(decode_responses=True))
+        leader, follower = (SearchIndexer(SearchEngine(tmp_path / "posts.idx"), TitleIndex()) for _ in range(2))
+        builds = []
+
+        async def rebuild(indexer):
+            builds.append(indexer)
+            indexer.engine.rebuild(iter(docs))
+
+        for indexer in (leader, follower):
+            monkeypatch.setattr(indexer, "rebuild", lambda indexer=indexer: rebuild(indexer))
+        # 跟随者在索引构建之前已写入过增量; 两个 worker 共用一把合并锁
+        follower.engine.upsert(SearchDocument(post_id=2, title="连接池调优", summary="", body=""))
+        follower._applied.append((0.0, follower.engine.seq))
+        await leader.merge()
+        await follower.merge()
+        assert builds == [leader]
+        # 跟随者加载文件, 文件构建前写入的增量已包含在内, 被丢弃
+        assert follower.engine.ready and follower.engine.unmerged == 0
+        assert [post_id for post_id, _ in follower.engine.search("穿透", 10)[1]] == [1]
+
+    asyncio.run(run())
@@ -0,0 +1,121 @@
+import asyncio
+
+import fakeredis
+
+from app.core import settings
+from app.db.generation import TableGenerations
+from app.db.redis import RedisClientManager
+from app.services.base import LocalCache, cached
+
+
+def test_local_cache_expires_and_evicts():
+    cache = LocalCache(max_entries=2)
+    cache.set("a", None, ttl=60)
+    # 缓存值为 None 也算命中
+    assert cache.get("a") == (True, None)
+    cache.set("b", 1, ttl=-1)
+    assert cache.get("b") == (False, None)
+    cache.set("c", 2, ttl=60)
+    cache.set("d", 3, ttl=60)
+    assert cache.get("a") == (False, None)
+    assert len(cache) == 2
+
+
+class _Service:
+    def __init__(self):
+        self.calls = 0
+
+    @cached("test:single_flight", list[int])
+    async def load(self, n: int) -> list[int]:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return list(range(n))
+
+
+def test_concurrent_misses_share_one_load():
+    # 未初始化 Redis 时直接回源, 并发请求只回源一次, 之后命中进程内缓存
+    async def run():
+        service = _Service()
+        results = await asyncio.gather(*[service.load(3) for _ in range(5)])
+        assert results == [[0, 1, 2]] * 5
+        assert await service.load(3) == [0, 1, 2]
+        return service.calls
+
+    assert asyncio.run(run()) == 1
+
+
+class _TableService:
+    def __init__(self):
+        self.calls = 0
+
+    @cached("test:generation", int, depends_on=("test_table",))
+    async def load(self) -> int:
+        self.calls += 1
+        return self.calls
+
+
+def test_table_bump_invalidates_local_entry():
+    # 未初始化 Redis 时表记为待补发, 依赖该表的进程内缓存不再命中
+    async def run():
+        service = _TableService()
+        assert await service.load() == 1
+        assert await service.load() == 1
+        await TableGenerations.bump(("test_table",))
+        assert await service.load() == 2
+
+    asyncio.run(run())
+
+
+class _OutageService:
+    def __init__(self):
+        self.calls = 0
+
+    @cached("test:outage", int, depends_on=("outage_table",))
+    async def load(self) -> int:
+        self.calls += 1
+        return self.calls
+
+
+def test_generations_recover_after_outage_and_redis_reset(monkeypatch):
+    for name, value in (("_local", {}), ("_dirty", set()), ("_remote_epoch", None), ("_epoch", 0)):
+        monkeypatch.setattr(TableGenerations, name, value)
+    key = settings.cache.GENERATION_KEY
+
+    async def remote_bump(client) -> None:
+        # 其他 worker 的写入: 递增 Redis 中的版本号并广播
+        epoch = await client.hget(key, TableGenerations.EPOCH_FIELD)
+        generation = await client.hincrby(key, "outage_table", 1)
+        TableGenerations._on_event({"table": "outage_table", "generation": generation, "epoch": epoch})
+
+    async def run():
+        client = fakeredis.FakeAsyncRedis(decode_responses=True)
+        monkeypatch.setattr(RedisClientManager, "_redis_client", client)
+        service = _OutageService()
+        assert await service.load() == 1
+        await TableGenerations.bump(("outage_table",))
+        assert await service.load() == 2
+
+        # Redis 不可用期间的写入: 不自行递增版本号, 之后的读取都不命中进程内缓存
+        monkeypatch.setattr(RedisClientManager, "_redis_client", None)
+        assert not await TableGenerations.bump(("outage_table",))
+        assert await service.load() == 3
+        assert await service.load() == 4
+
+        # 恢复后补发递增, Redis 中写入前的条目随之过期
+        monkeypatch.setattr(RedisClientManager, "_redis_client", client)
+        assert await service.load() == 5
+        assert int(await client.hget(key, "outage_table")) == 2
+        assert await service.load() == 5
+
+        # 其他 worker 递增出的版本号与本进程此前见过的相同也不会被忽略
+        await remote_bump(client)
+        assert await service.load() == 6
+
+        # Redis 丢失版本号 hash 后从头计数, 新纪元的广播同样使进程内条目失效
+        await client.flushall()
+        await client.hset(key, TableGenerations.EPOCH_FIELD, "restarted")
+        await remote_bump(client)
+        assert await service.load() == 7
+        assert await service.load() == 7
+
+    asyncio.run(run())